@@ -0,0 +1,49 @@
+import unittest
+from random import seed
+
+import numpy as np
+
+from openmdao.drivers.latinhypercube_driver import _rand_latin_hypercube, \
+    _LHC_Individual, _mmlhs
+
+
+def _loop_mmphi(doe, q, p):
+    """ The Morris-Mitchell criterion, computed one pair of points at a time
+    as it was before it was vectorized. Kept for comparison."""
+    distdict = {}
+    n = doe.shape[0]
+    for i in range(1, n):
+        nrm = np.linalg.norm(doe[i] - doe[:i], ord=p, axis=1)
+        for j in range(0, i):
+            distdict[nrm[j]] = distdict.get(nrm[j], 0) + 1
+
+    return sum(J * (d ** (-q)) for d, J in distdict.items()) ** (1.0 / q)
+
+
+class BM(unittest.TestCase):
+    """Optimized Latin hypercubes with many samples"""
+
+    def setUp(self):
+        seed(11)
+        self.doe = _rand_latin_hypercube(2000, 10)
+
+    def benchmark_mmphi_2000(self):
+        _LHC_Individual(self.doe, q=2, p=1).mmphi()
+
+    def benchmark_mmphi_2000_loop(self):
+        _loop_mmphi(self.doe, 2, 1)
+
+    def benchmark_mmlhs_2000(self):
+        _mmlhs(_LHC_Individual(self.doe, q=2, p=1), population=5, generations=1)
+
+    def benchmark_mmlhs_2000_loop(self):
+        # Every offspring evaluated from scratch, as before.
+        best_phi = _loop_mmphi(self.doe, 2, 1)
+        x_best = _LHC_Individual(self.doe, q=2, p=1)
+        for it in range(1):
+            for offspring in range(5):
+                x_try = x_best.perturb(1)
+                phi_try = _loop_mmphi(x_try.doe, 2, 1)
+                if phi_try < best_phi:
+                    best_phi = phi_try
+                    x_best = x_try
@@ -0,0 +1,77 @@
+from __future__ import print_function
+import unittest
+import time
+
+import numpy as np
+
+from openmdao.api import Problem, Group, Component, IndepVarComp
+
+
+class Pick(Component):
+    """Takes a couple of entries of a big source array."""
+
+    def __init__(self, size):
+        super(Pick, self).__init__()
+        self.add_param('x', np.zeros(size))
+        self.add_output('y', 0.0)
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        unknowns['y'] = np.sum(params['x'])
+
+
+def _build(ncomps, size=2):
+    """A model where every component takes size entries of a big source
+    array through src_indices that can't be turned into slices."""
+    prob = Problem(root=Group())
+    root = prob.root
+    n = ncomps * size
+    root.add('src', IndepVarComp('x', np.arange(n, dtype=float)))
+
+    for i in range(ncomps):
+        root.add('c%d' % i, Pick(size))
+        idxs = n - 1 - (i + np.arange(size) * ncomps)
+        root.connect('src.x', 'c%d.x' % i, src_indices=idxs)
+
+    prob.setup(check=False)
+    return prob
+
+
+class BM(unittest.TestCase):
+    """Data transfers for models with many src_indices connections."""
+
+    def _transfers(self, ncomps, ntransfers=200):
+        prob = _build(ncomps)
+        root = prob.root
+
+        start = time.time()
+        for i in range(ntransfers):
+            root._transfer_data()
+        elapsed = time.time() - start
+
+        print("%d connections: %.1f transfers/sec" % (ncomps,
+                                                      ntransfers / elapsed))
+
+    def _rev_transfers(self, ncomps, ntransfers=200):
+        prob = _build(ncomps)
+        root = prob.root
+        root.dpmat[None].vec[:] = 1.0
+
+        start = time.time()
+        for i in range(ntransfers):
+            root._transfer_data(mode='rev', deriv=True)
+        elapsed = time.time() - start
+
+        print("%d connections: %.1f rev transfers/sec" % (ncomps,
+                                                          ntransfers / elapsed))
+
+    def benchmark_transfer_1K(self):
+        self._transfers(1000)
+
+    def benchmark_transfer_5K(self):
+        self._transfers(5000)
+
+    def benchmark_rev_transfer_1K(self):
+        self._rev_transfers(1000)
+
+    def benchmark_rev_transfer_5K(self):
+        self._rev_transfers(5000)
@@ -77,6 +77,33 @@ class MPITests(MPITestCase):
         self.assertEqual(diff, set([5])) # job 5 should have failed
 
 
+    def test_chunks(self):
+
+        ncases = 10
+
+        cases = [([i], {'option': 'foo%d'%i}) for i in range(ncases)]
+        tofind = set(range(ncases))
+        found = set()
+        stats = {}
+
+        results = concurrent_eval_lb(funct, cases, comm, broadcast=True,
+                                     chunk_size=3, stats=stats)
+
+        self.assertEqual(len(results), 10)
+        for r in results:
+            if r[0] is not None:
+                found.add(r[0][0])
+            else:
+                self.assertTrue('Job 5 had an (intentional) error!' in r[1])
+        diff = tofind-found
+        self.assertEqual(diff, set([5])) # job 5 should have failed
+
+        if comm is None or comm.rank == 0:
+            self.assertEqual(sum(s['cases'] for s in stats.values()), 10)
+        else:
+            self.assertEqual(stats, {})
+
+
 
 if __name__ == '__main__':
     from openmdao.test.mpi_util import mpirun_tests
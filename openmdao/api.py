@@ -42,6 +42,7 @@ from openmdao.drivers.case_driver import CaseDriver
 from openmdao.recorders.base_recorder import BaseRecorder
 from openmdao.recorders.dump_recorder import DumpRecorder
 from openmdao.recorders.sqlite_recorder import SqliteRecorder
+from openmdao.recorders.sqlite_column_recorder import SqliteColumnRecorder
 from openmdao.recorders.inmem_recorder import InMemoryRecorder
 from openmdao.recorders.case_reader import CaseReader
 
@@ -3,14 +3,15 @@
 import math
 import cmath
 import re
+from keyword import iskeyword
 
 import numpy
 from numpy import ndarray, complex, imag
 
-from six import string_types
+from six import string_types, exec_
 
 from openmdao.core.component import Component
-from openmdao.util.array_util import array_idx_iter
+from openmdao.core.vec_wrapper import VecWrapper
 from collections import OrderedDict
 
 # regex to check for variable names.
@@ -54,6 +55,12 @@ class ExecComp(Component):
     units : dict, optional
         A mapping of variable names to their units.
 
+    vectorize : bool, optional
+        Set to True if every variable has the same shape and the expressions
+        are elementwise, so that each output entry only depends on the same
+        entry of each param. The Jacobian is then diagonal and is computed
+        with a single complex step per param.
+
     \*\*kwargs : dict of named args
         Initial values of variables can be set by setting a named
         arg with the var name.
@@ -108,7 +115,8 @@ class ExecComp(Component):
     initialized with a size 10 float array of ones.
     """
 
-    def __init__(self, exprs, inits=None, units=None, **kwargs):
+    def __init__(self, exprs, inits=None, units=None, vectorize=False,
+                 **kwargs):
         super(ExecComp, self).__init__()
 
         # if complex step is used for derivatives, this is the stepsize
@@ -157,6 +165,15 @@ class ExecComp(Component):
             else:
                 self.add_param(var, val, **units_kwarg)
 
+        self._vectorize = vectorize
+        if vectorize:
+            shapes = set(numpy.shape(kwargs.get(var, 0.0)) for var in allvars)
+            if len(shapes) > 1:
+                raise RuntimeError("ExecComp with vectorize=True requires all "
+                                   "variables in the expressions %s to have "
+                                   "the same shape, but found shapes %s." %
+                                   (exprs, sorted(shapes)))
+
         # need to exclude any non-pbo unknowns (like case_rank in ExecComp4Test)
         self._non_pbo_unknowns = [u for u in self._init_unknowns_dict
                                       if u in allvars]
@@ -173,26 +190,83 @@ class ExecComp(Component):
 
         self._colon_names = { n for n in allvars if ':' in n }
 
-        self._codes = self._compile_exprs(exprs)
+        # Every variable is passed to the compiled function by position,
+        # outputs included since an expression may assign into part of one.
+        self._args = [n for n in sorted(allvars) if not iskeyword(n)]
+        self._outs = [n for n in self._args if n in outs]
+        self._func = self._compile_exprs(exprs)
+
+        # Accessor functions for the last params and unknowns we ran with.
+        self._bound = None
+
+        if vectorize:
+            for out in self._outs:
+                size = numpy.size(kwargs.get(out, 0.0))
+                for arg in self._args:
+                    if arg not in outs:
+                        self.declare_partials(out, arg,
+                                              rows=numpy.arange(size),
+                                              cols=numpy.arange(size))
 
     def _compile_exprs(self, exprs):
+        """ Compiles all of the expressions into a single function that takes
+        the variables in self._args positionally and returns the values of
+        the outputs in self._outs."""
         exprs = exprs[:]
         for i in range(len(exprs)):
             for n in self._colon_names:
                 exprs[i] = exprs[i].replace(n, self._from_colons[n])
 
-        return [compile(expr, expr, 'exec') for expr in exprs]
+        src = ["def _exec_comp(%s):" % ', '.join(self._from_colons[n]
+                                                 for n in self._args)]
+        src.extend("    %s" % expr.strip() for expr in exprs)
+        src.append("    return (%s,)" % ', '.join(self._from_colons[n]
+                                                  for n in self._outs))
+
+        scope = {}
+        exec_(compile('\n'.join(src), '; '.join(exprs), 'exec'), _expr_dict, scope)
+        return scope['_exec_comp']
 
     def __getstate__(self):
         """ Returns state as a dict. """
         state = self.__dict__.copy()
-        del state['_codes']
+        del state['_func']
+        state['_bound'] = None
         return state
 
     def __setstate__(self, state):
         """ Restore state from `state`. """
         self.__dict__.update(state)
-        self._codes = self._compile_exprs(self._exprs)
+        self._func = self._compile_exprs(self._exprs)
+
+    def _bind(self, params, unknowns):
+        """ Returns lists of getters for self._args and setters for
+        self._outs. For our own vectors, these are the accessor functions,
+        which skip the name lookups on every call."""
+        bound = self._bound
+        if bound is not None and bound[0] is params and bound[1] is unknowns:
+            return bound[2], bound[3]
+
+        if isinstance(params, VecWrapper) and isinstance(unknowns, VecWrapper):
+            getters = []
+            for name in self._args:
+                if name in unknowns:
+                    getters.append(unknowns._dat[name].get)
+                else:
+                    getters.append(params._dat[name].get)
+            setters = [unknowns._dat[name].set for name in self._outs]
+
+            self._bound = (params, unknowns, getters, setters)
+            return getters, setters
+
+        # Some other dict-like object, so we have to go through it.
+        getters = []
+        for name in self._args:
+            vec = unknowns if name in unknowns else params
+            getters.append(lambda vec=vec, name=name: vec[name])
+        setters = [lambda val, name=name: unknowns.__setitem__(name, val)
+                   for name in self._outs]
+        return getters, setters
 
     def solve_nonlinear(self, params, unknowns, resids):
         """
@@ -209,8 +283,10 @@ class ExecComp(Component):
         resids : `VecWrapper`, optional
             `VecWrapper` containing residuals. (r)
         """
-        for expr in self._codes:
-            exec(expr, _expr_dict, _UPDict(unknowns, params, self._to_colons))
+        getters, setters = self._bind(params, unknowns)
+        vals = self._func(*[get() for get in getters])
+        for setter, val in zip(setters, vals):
+            setter(val)
 
     def linearize(self, params, unknowns, resids):
         """
@@ -240,130 +316,91 @@ class ExecComp(Component):
         J = OrderedDict()
         non_pbo_unknowns = self._non_pbo_unknowns
 
-        for param in params:
+        getters, _ = self._bind(params, unknowns)
+        args = [get() for get in getters]
+
+        # Complex copies of everything the expressions read. Outputs are
+        # copied fresh for each evaluation in case an expression assigns into
+        # part of one.
+        cargs = []
+        out_idxs = []
+        for i, (name, val) in enumerate(zip(self._args, args)):
+            if name in unknowns:
+                out_idxs.append(i)
+            if isinstance(val, ndarray):
+                cargs.append(numpy.asarray(val, complex))
+            elif isinstance(val, (float, int, numpy.number)):
+                cargs.append(complex(val))
+            else:
+                cargs.append(val)
+
+        def run():
+            for i in out_idxs:
+                cargs[i] = numpy.array(args[i], complex) \
+                    if isinstance(args[i], ndarray) else complex(args[i])
+            return dict(zip(self._outs, self._func(*cargs)))
 
-            pwrap = _TmpDict(params)
+        for i, param in enumerate(self._args):
+            if param not in params or param in unknowns:
+                continue
 
-            pval = params[param]
+            pval = cargs[i]
             if isinstance(pval, ndarray):
-                # replace the param array with a complex copy
-                pwrap[param] = numpy.asarray(pval, complex)
-                idx_iter = array_idx_iter(pwrap[param].shape)
-                psize = pval.size
-            else:
-                pwrap[param] = complex(pval)
-                idx_iter = (None,)
+                flat = pval.reshape(-1)
+                psize = flat.size
+            elif isinstance(pval, complex):
+                flat = None
                 psize = 1
+            else:
+                # not something we can differentiate
+                continue
 
-            for i, idx in enumerate(idx_iter):
-                # set a complex param value
-                if idx is None:
-                    pwrap[param] += step
+            # All entries at once when the Jacobian is diagonal.
+            if self._vectorize:
+                if flat is None:
+                    cargs[i] = pval + step
                 else:
-                    pwrap[param][idx] += step
+                    flat += step
 
-                uwrap = _TmpDict(unknowns, complex=True)
+                uvals = run()
+
+                if flat is None:
+                    cargs[i] = pval
+                else:
+                    flat -= step
+
+                for u in non_pbo_unknowns:
+                    J[(u, param)] = imag(numpy.asarray(uvals[u]).reshape(-1) /
+                                         self.complex_stepsize)
+                continue
+
+            for j in range(psize):
+                # set a complex param value
+                if flat is None:
+                    cargs[i] = pval + step
+                else:
+                    flat[j] += step
 
                 # solve with complex param value
-                self.solve_nonlinear(pwrap, uwrap, resids)
+                uvals = run()
 
                 for u in non_pbo_unknowns:
-                    jval = numpy.atleast_1d(imag(uwrap[u] / self.complex_stepsize))
+                    jval = numpy.atleast_1d(imag(uvals[u] / self.complex_stepsize))
                     if (u, param) not in J: # create the dict entry
                         J[(u, param)] = numpy.zeros((jval.size, psize))
 
                     # set the column in the Jacobian entry
-                    J[(u, param)][:, i] = jval.flat
+                    J[(u, param)][:, j] = jval.flat
 
                 # restore old param value
-                if idx is None:
-                    pwrap[param] -= step
+                if flat is None:
+                    cargs[i] = pval
                 else:
-                    pwrap[param][idx] -= step
+                    flat[j] -= step
 
         return J
 
 
-class _TmpDict(object):
-    """
-    A wrapper for a dictionary that will allow getting of values
-    from its inner dict unless those values get modified via
-    __setitem__.  After values have been modified they are managed
-    thereafter by the wrapper.  This protects the inner dict from
-    modification.
-
-    Args
-    ----
-    inner : dict-like
-        The dictionary to be wrapped.
-
-    complex : bool, optional
-        If True, return a complex version of values from __getitem__
-    """
-    def __init__(self, inner, complex=False):
-        self._inner = inner
-        self._changed = {}
-        self._complex = complex
-
-    def __getitem__(self, name):
-        if name in self._changed:
-            return self._changed[name]
-        elif self._complex:
-            val = self._inner[name]
-            if isinstance(val, ndarray):
-                self._changed[name] = numpy.asarray(val, dtype=complex)
-            else:
-                self._changed[name] = complex(val)
-            return self._changed[name]
-        else:
-            return self._inner[name]
-
-    def __setitem__(self, name, value):
-        self._changed[name] = value
-
-    def __contains__(self, name):
-        return name in self._inner or name in self._changed
-
-    def __getattr__(self, name):
-        return getattr(self._inner, name)
-
-
-class _UPDict(object):
-    """
-    A dict-like wrapper for the unknowns and params
-    objects.  Items are first looked for in the unknowns
-    and then the params.
-
-    Args
-    ----
-    unknowns : dict-like
-        The unknowns object to be wrapped.
-
-    params : dict-like
-        The params object to be wrapped.
-    """
-    def __init__(self, unknowns, params, to_colons):
-        self._unknowns = unknowns
-        self._params = params
-        self._to_colons = to_colons
-
-    def __getitem__(self, name):
-        name = self._to_colons[name]
-        try:
-            return self._unknowns[name]
-        except KeyError:
-            return self._params[name]
-
-    def __setitem__(self, name, value):
-        name = self._to_colons[name]
-        if name in self._unknowns:
-            self._unknowns[name] = value
-        elif name in self._params:
-            self._params[name] = value
-        else:
-            self._unknowns[name] # will raise KeyError
-
-
 def _import_functs(mod, dct, names=None):
     """
     Maps attributes attrs from the given module into the given dict.
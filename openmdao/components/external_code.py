@@ -1,6 +1,11 @@
 
 import sys
 import os
+import shutil
+import tempfile
+import time
+import hashlib
+from collections import OrderedDict, deque
 
 import numpy.distutils
 from numpy.distutils.exec_command import find_executable
@@ -69,7 +74,25 @@ class ExternalCode(Component):
     options['fail_hard'] :  bool(True)
         Behavior on error returned from code, either raise a 'hard' error (RuntimeError) if True
         or a 'soft' error (AnalysisError) if False.
-
+    options['cache_results'] :  bool(False)
+        If True, successful runs are memoized on a hash of the command, environment
+        variables, stdin and the contents of the external input files. A later run
+        with identical inputs restores the recorded output files instead of
+        executing the command. All generated inputs and parsed outputs must be
+        listed in external_input_files and external_output_files.
+    options['cache_size'] :  int(100)
+        Maximum number of runs kept when cache_results is True. The least
+        recently used run is discarded first.
+    options['max_concurrent'] :  int(1)
+        Maximum number of processes run at the same time by run_batch. When
+        greater than one, finite differencing this component evaluates all of
+        the steps as a single batch. This requires write_inputs and read_outputs
+        to be overridden.
+
+    Subclasses that generate input files and parse output files should do so by
+    overriding write_inputs and read_outputs, which are called before and after
+    the command is executed. Both are called with the working directory set to
+    a separate scratch directory for each case evaluated by run_batch.
 
     """
 
@@ -94,6 +117,12 @@ class ExternalCode(Component):
             desc='(optional) list of input file names to check the existence of after solve_nonlinear')
         self.options.add_option('fail_hard', True,
             desc="If True, external code errors raise a 'hard' exception (RuntimeError).  Otherwise raise a 'soft' exception (AnalysisError).")
+        self.options.add_option('cache_results', False,
+            desc='If True, skip runs whose command, environment and input file contents match a previous successful run and restore its output files instead')
+        self.options.add_option('cache_size', 100, lower=1,
+            desc='Maximum number of runs kept when cache_results is True')
+        self.options.add_option('max_concurrent', 1, lower=1,
+            desc='Maximum number of processes run at the same time by run_batch. Finite difference steps are evaluated as one batch when greater than 1')
 
         # Outputs of the run of the component or items that will not work with the OptionsDictionary
         self.return_code = 0 # Return code from the command
@@ -101,6 +130,12 @@ class ExternalCode(Component):
         self.stdout = None
         self.stderr = "error.out"
 
+        # resolved executable paths, keyed on (program, PATH)
+        self._exec_paths = {}
+
+        # output files of previous runs, keyed on a hash of their inputs
+        self._results_cache = OrderedDict()
+
     def check_setup(self, out_stream=sys.stdout):
         """Write a report to the given stream indicating any potential problems found
         with the current configuration of this ``Problem``.
@@ -116,7 +151,7 @@ class ExternalCode(Component):
             out_stream.write( "The command cannot be empty")
         else:
             program_to_execute = self.options['command'][0]
-            command_full_path = find_executable( program_to_execute )
+            command_full_path = self._find_executable(program_to_execute)
 
             if not command_full_path:
                 out_stream.write("The command to be executed, '%s', "
@@ -145,45 +180,371 @@ class ExternalCode(Component):
         return_code = None
 
         try:
+            self.write_inputs(params, unknowns)
+
             missing = self._check_for_files(self.options['external_input_files'])
             if missing:
                 raise err_class("The following input files are missing: %s"
                                 % sorted(missing))
-            return_code, error_msg = self._execute_local()
-
-            if return_code is None:
-                raise AnalysisError('Timed out after %s sec.' %
-                                     self.options['timeout'])
-
-            elif return_code:
-                if isinstance(self.stderr, str):
-                    if os.path.exists(self.stderr):
-                        stderrfile = open(self.stderr, 'r')
-                        error_desc = stderrfile.read()
-                        stderrfile.close()
-                        err_fragment = "\nError Output:\n%s" % error_desc
-                    else:
-                        err_fragment = "\n[stderr %r missing]" % self.stderr
-                else:
-                    err_fragment = error_msg
 
-                raise err_class('return_code = %d%s' % (return_code,
-                                                        err_fragment))
+            cache_key = self._cache_key() if self.options['cache_results'] else None
+            if cache_key is not None and cache_key in self._results_cache:
+                self._restore_outputs(cache_key)
+                return_code = 0
+            else:
+                return_code, error_msg = self._execute_local()
+                self._check_run(return_code, error_msg, err_class)
 
-            missing = self._check_for_files(self.options['external_output_files'])
-            if missing:
-                raise err_class("The following output files are missing: %s"
-                                % sorted(missing))
+                if cache_key is not None:
+                    self._store_outputs(cache_key)
+
+            self.read_outputs(params, unknowns)
 
         finally:
             self.return_code = -999999 if return_code is None else return_code
 
+    def write_inputs(self, params, unknowns):
+        """
+        Writes the input files for the external code. Called in the
+        working directory of the run, before the command is executed.
+        The default does nothing.
+
+        Args
+        ----
+        params : `VecWrapper`
+            `VecWrapper` containing parameters. (p)
+
+        unknowns : `VecWrapper`
+            `VecWrapper` containing outputs and states. (u)
+        """
+        pass
+
+    def read_outputs(self, params, unknowns):
+        """
+        Parses the output files of the external code into `unknowns`.
+        Called in the working directory of the run, after the command
+        has completed successfully. The default does nothing.
+
+        Args
+        ----
+        params : `VecWrapper`
+            `VecWrapper` containing parameters. (p)
+
+        unknowns : `VecWrapper`
+            `VecWrapper` containing outputs and states. (u)
+        """
+        pass
+
+    def _check_run(self, return_code, error_msg, err_class):
+        """ Raise an error if a run timed out, failed, or left output files
+        missing. Paths are relative to the current directory. """
+        if return_code is None:
+            raise AnalysisError('Timed out after %s sec.' %
+                                 self.options['timeout'])
+
+        elif return_code:
+            if isinstance(self.stderr, str):
+                if os.path.exists(self.stderr):
+                    stderrfile = open(self.stderr, 'r')
+                    error_desc = stderrfile.read()
+                    stderrfile.close()
+                    err_fragment = "\nError Output:\n%s" % error_desc
+                else:
+                    err_fragment = "\n[stderr %r missing]" % self.stderr
+            else:
+                err_fragment = error_msg
+
+            raise err_class('return_code = %d%s' % (return_code,
+                                                    err_fragment))
+
+        missing = self._check_for_files(self.options['external_output_files'])
+        if missing:
+            raise err_class("The following output files are missing: %s"
+                            % sorted(missing))
+
+    def run_batch(self, params, unknowns, cases):
+        """
+        Evaluates the external code for several sets of params, running up to
+        options['max_concurrent'] processes at the same time. Each case is
+        run in its own scratch directory, which gets a copy of the
+        external_input_files found in the current directory before
+        write_inputs is called there.
+
+        Args
+        ----
+        params : `VecWrapper`
+            `VecWrapper` containing parameters. (p)
+
+        unknowns : `VecWrapper`
+            `VecWrapper` containing outputs and states. (u)
+
+        cases : list of dict
+            Each case maps param names to the values to evaluate. Params
+            that aren't in a case keep their current values.
+
+        Returns
+        -------
+        list of ndarray
+            The unknowns vector after read_outputs, for each case. `params`
+            and `unknowns` are left unchanged.
+        """
+        if not self.options['command']:
+            raise ValueError('Empty command list')
+
+        if self.options['fail_hard']:
+            err_class = RuntimeError
+        else:
+            err_class = AnalysisError
+
+        command = self._shell_command()
+        timeout = self.options['timeout']
+        max_concurrent = self.options['max_concurrent']
+
+        saved_p = {}
+        for case in cases:
+            for name in case:
+                if name not in saved_p:
+                    saved_p[name] = params._dat[name].val.copy()
+        saved_u = unknowns.vec.copy()
+
+        startdir = os.getcwd()
+        scratch = tempfile.mkdtemp(prefix='extcode-batch-')
+        copies = [path for path in self.options['external_input_files']
+                  if not os.path.isabs(path) and os.path.exists(path)]
+        if isinstance(self.stdin, str) and self.stdin != self.DEV_NULL and \
+           self.stdin not in copies and os.path.exists(self.stdin):
+            copies.append(self.stdin)
+
+        results = [None] * len(cases)
+        waiting = deque(range(len(cases)))
+        running = []
+
+        def set_case(i):
+            for name, val in iteritems(saved_p):
+                params._dat[name].val[:] = cases[i].get(name, val)
+            unknowns.vec[:] = saved_u
+
+        def finish(i, casedir, cache_key):
+            os.chdir(casedir)
+            try:
+                if cache_key is not None:
+                    self._store_outputs(cache_key)
+                set_case(i)
+                self.read_outputs(params, unknowns)
+                results[i] = unknowns.vec.copy()
+            finally:
+                os.chdir(startdir)
+
+        try:
+            while waiting or running:
+
+                # Generate the inputs and launch cases until we're at capacity.
+                while waiting and len(running) < max_concurrent:
+                    i = waiting.popleft()
+                    casedir = os.path.join(scratch, str(i))
+                    os.mkdir(casedir)
+                    for path in copies:
+                        dest = os.path.join(casedir, path)
+                        if not os.path.isdir(os.path.dirname(dest)):
+                            os.makedirs(os.path.dirname(dest))
+                        shutil.copy(path, dest)
+
+                    os.chdir(casedir)
+                    try:
+                        set_case(i)
+                        self.write_inputs(params, unknowns)
+
+                        missing = self._check_for_files(self.options['external_input_files'])
+                        if missing:
+                            raise err_class("The following input files are missing: %s"
+                                            % sorted(missing))
+
+                        if self.options['cache_results']:
+                            cache_key = self._cache_key()
+                            if cache_key in self._results_cache:
+                                self._restore_outputs(cache_key)
+                                finish(i, casedir, None)
+                                continue
+                        else:
+                            cache_key = None
+
+                        proc = ShellProc(command, self.stdin, self.stdout,
+                                         self.stderr, self.options['env_vars'])
+                    finally:
+                        os.chdir(startdir)
+
+                    deadline = time.time() + timeout if timeout > 0 else None
+                    running.append((i, casedir, cache_key, proc, deadline))
+
+                # Wait for at least one of the running cases to complete.
+                done = []
+                delay = 0.0005
+                while running:
+                    now = time.time()
+                    done = [run for run in running if run[3].poll() is not None
+                            or (run[4] is not None and now > run[4])]
+                    if done:
+                        break
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.05)
+
+                for run in done:
+                    running.remove(run)
+                    i, casedir, cache_key, proc, deadline = run
+
+                    return_code = proc.poll()
+                    if return_code is None:
+                        proc.terminate()
+                        error_msg = 'Timed out'
+                    else:
+                        error_msg = proc.error_message(return_code)
+                    proc.close_files()
+
+                    os.chdir(casedir)
+                    try:
+                        self._check_run(return_code, error_msg, err_class)
+                    finally:
+                        os.chdir(startdir)
+
+                    finish(i, casedir, cache_key)
+
+        finally:
+            for run in running:
+                proc = run[3]
+                if proc.poll() is None:
+                    proc.terminate()
+                proc.close_files()
+
+            os.chdir(startdir)
+            for name, val in iteritems(saved_p):
+                params._dat[name].val[:] = val
+            unknowns.vec[:] = saved_u
+            shutil.rmtree(scratch, ignore_errors=True)
+
+        return results
+
+    def _fd_evaluate(self, steps, run_model, params, unknowns, resids, resultvec):
+        """ Evaluates the finite difference steps with a single call to
+        run_batch when options['max_concurrent'] is greater than 1.
+        See System._fd_evaluate for the arguments. """
+        if not self._can_batch(steps, params, resids, resultvec):
+            return super(ExternalCode, self)._fd_evaluate(steps, run_model, params,
+                                                          unknowns, resids, resultvec)
+
+        # Step a copy of each param the same way the sequential evaluation
+        # steps the param itself.
+        stepped = {}
+        cases = []
+        for inputs, key, idx, delta, fdtype in steps:
+            if key not in stepped:
+                stepped[key] = params._dat[key].val.copy()
+            val = stepped[key]
+            val[idx] += delta
+            cases.append({key: val.copy()})
+            val[idx] -= delta
+
+        outputs = self.run_batch(params, unknowns, cases)
+
+        def results():
+            for u_vec in outputs:
+                # the residuals of apply_nonlinear for an explicit component
+                resids.vec[:] = -unknowns.vec
+                resids.vec[:] += u_vec
+                resids._scale_values()
+                yield resids.vec
+
+        return results()
+
+    def _can_batch(self, steps, params, resids, resultvec):
+        """ Returns True if the finite difference steps can be evaluated
+        by run_batch. """
+        if self.options['max_concurrent'] < 2 or resultvec is not resids:
+            return False
+
+        # The inputs have to be generated separately from the run.
+        for name in ('write_inputs', 'read_outputs'):
+            if getattr(type(self), name) == getattr(ExternalCode, name):
+                return False
+
+        # An implicit component computes its own residuals.
+        if type(self).apply_nonlinear != Component.apply_nonlinear:
+            return False
+
+        return all(fdtype == 'fd' and inputs is params
+                   for inputs, key, idx, delta, fdtype in steps)
+
     def _check_for_files(self, files):
         """ Check that specified files exist. """
         return [path for path in files if not os.path.exists(path)]
 
-    def _execute_local(self):
-        """ Run command. """
+    def _find_executable(self, program):
+        """ Return the full path to `program`, looking it up only once. """
+        key = (program, os.environ.get('PATH'))
+        try:
+            return self._exec_paths[key]
+        except KeyError:
+            pass
+
+        # suppress message from find_executable function, we'll handle it
+        numpy.distutils.log.set_verbosity(-1)
+
+        path = find_executable(program)
+        if path:
+            self._exec_paths[key] = path
+        return path
+
+    def _output_paths(self):
+        """ Return the files written by a run that are restored from the cache. """
+        paths = list(self.options['external_output_files'])
+        for stream in (self.stdout, self.stderr):
+            if isinstance(stream, str) and stream not in paths:
+                paths.append(stream)
+        return paths
+
+    def _cache_key(self):
+        """ Return a hash of everything that determines the result of a run. """
+        sha = hashlib.sha1()
+        sha.update(repr(self.options['command']).encode('utf-8'))
+        sha.update(repr(sorted(iteritems(self.options['env_vars']))).encode('utf-8'))
+
+        inputs = list(self.options['external_input_files'])
+        if isinstance(self.stdin, str) and self.stdin != self.DEV_NULL:
+            inputs.append(self.stdin)
+
+        for path in inputs:
+            sha.update(path.encode('utf-8'))
+            with open(path, 'rb') as f:
+                sha.update(f.read())
+
+        return sha.hexdigest()
+
+    def _store_outputs(self, key):
+        """ Record the output files of the run that just completed. """
+        outputs = []
+        for path in self._output_paths():
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    outputs.append((path, f.read()))
+
+        self._results_cache[key] = outputs
+        while len(self._results_cache) > self.options['cache_size']:
+            self._results_cache.popitem(last=False)
+
+    def _restore_outputs(self, key):
+        """ Rewrite the output files recorded for a previous identical run. """
+        outputs = self._results_cache.pop(key)
+        self._results_cache[key] = outputs  # most recently used
+        for path, data in outputs:
+            with open(path, 'wb') as f:
+                f.write(data)
+
+    def clear_cache(self):
+        """ Discard all results memoized when options['cache_results'] is True. """
+        self._results_cache.clear()
+
+    def _shell_command(self):
+        """ Return the command to give to ShellProc, after checking that
+        the executable exists. """
 
         # check to make sure command exists
         if isinstance(self.options['command'], str):
@@ -191,10 +552,7 @@ class ExternalCode(Component):
         else:
             program_to_execute = self.options['command'][0]
 
-        # suppress message from find_executable function, we'll handle it
-        numpy.distutils.log.set_verbosity(-1)
-
-        command_full_path = find_executable( program_to_execute )
+        command_full_path = self._find_executable(program_to_execute)
         if not command_full_path:
             raise ValueError("The command to be executed, '%s', cannot be found" % program_to_execute)
 
@@ -202,8 +560,13 @@ class ExternalCode(Component):
         if sys.platform == 'win32':
             command_for_shell_proc = ['cmd.exe', '/c' ] + command_for_shell_proc
 
+        return command_for_shell_proc
+
+    def _execute_local(self):
+        """ Run command. """
+
         self._process = \
-            ShellProc(command_for_shell_proc, self.stdin,
+            ShellProc(self._shell_command(), self.stdin,
                       self.stdout, self.stderr, self.options['env_vars'])
 
         try:
@@ -1,10 +1,14 @@
 """ Metamodel provides basic Meta Modeling capability."""
 
+import os
 import sys
+import hashlib
 import numpy as np
 from copy import deepcopy
+from six.moves import cPickle as pickle
 
 from openmdao.core.component import Component, _NotSet
+from openmdao.surrogate_models.surrogate_model import _type_name
 from six import iteritems
 
 
@@ -16,6 +20,18 @@ class MetaModel(Component):
 
     For a Float variable, the training data is an array of length m.
 
+    With `vec_size` > 1, every param and output gets a leading dimension of
+    that size, so that many points are evaluated together. Each surrogate is
+    then called once with all of the points, and the partials are
+    block-diagonal. Surrogates must accept an (n_points, n_inputs) array in
+    `predict` and `linearize` to be used this way. The training data still
+    holds values at single points.
+
+    Args
+    ----
+    vec_size : int, optional
+        Number of points evaluated at once. Default is 1.
+
     Options
     -------
     deriv_options['type'] :  str('user')
@@ -49,9 +65,14 @@ class MetaModel(Component):
         Set to True if you want linearize to be called even though you are using FD.
     """
 
-    def __init__(self):
+    def __init__(self, vec_size=1):
         super(MetaModel, self).__init__()
 
+        if vec_size < 1:
+            raise ValueError("MetaModel: vec_size must be at least 1, but is %s."
+                             % vec_size)
+        self.vec_size = vec_size
+
         # This surrogate will be used for all outputs that don't have
         # a specific surrogate assigned to them
         self.default_surrogate = None
@@ -64,13 +85,21 @@ class MetaModel(Component):
         self.train = True
         self._training_input = np.zeros(0)
         self._training_output = {}
+        self._input_buffer = None
+        self._output_buffers = {}
 
         # When set to False (default), the metamodel retrains with the new
         # dataset whenever the training data values are changed. When set to
         # True, the new data is appended to the old data and all of the data
-        # is used to train.
+        # is used to train. Surrogates that support `update` are updated with
+        # the new points instead.
         self.warm_restart = False
 
+        # When set to the name of a directory, trained surrogates are saved
+        # there, keyed on a hash of the training data and the surrogate
+        # settings, and loaded on later runs instead of being trained again.
+        self.cache_dir = None
+
         # keeps track of which sur_<name> slots are full
         self._surrogate_overrides = set()
 
@@ -86,7 +115,7 @@ class MetaModel(Component):
             Name of the input.
 
         val : float or ndarray or object
-            Initial value for the input.
+            Initial value for the input, at a single point if vec_size > 1.
 
         training_data : float or ndarray
             training data for this variable. Optional, can be set
@@ -95,10 +124,11 @@ class MetaModel(Component):
         if training_data is None:
             training_data = []
 
-        super(MetaModel, self).add_param(name, val, **kwargs)
+        super(MetaModel, self).add_param(name, self._vectorize(name, 'param', val, kwargs),
+                                         **kwargs)
         super(MetaModel, self).add_param('train:'+name, val=training_data, pass_by_obj=True)
 
-        input_size = self._init_params_dict[name]['size']
+        input_size = self._init_params_dict[name]['size'] // self.vec_size
 
         self._surrogate_param_names.append((name, input_size))
         self._input_size += input_size
@@ -114,7 +144,8 @@ class MetaModel(Component):
 
         val : float or ndarray
             Initial value for the output. While the value is overwritten during
-            execution, it is useful for infering size.
+            execution, it is useful for infering size. This is the value at a
+            single point if vec_size > 1.
 
         training_data : float or ndarray
             training data for this variable. Optional, can be set
@@ -123,13 +154,17 @@ class MetaModel(Component):
         if training_data is None:
             training_data = []
 
-        super(MetaModel, self).add_output(name, val, **kwargs)
+        super(MetaModel, self).add_output(name, self._vectorize(name, 'output', val, kwargs),
+                                          **kwargs)
         super(MetaModel, self).add_param('train:'+name, val=training_data, pass_by_obj=True)
 
         try:
             output_shape = self._init_unknowns_dict[name]['shape']
         except KeyError: #then its some kind of object, and just assume scalar training data
             output_shape = 1
+        else:
+            if self.vec_size > 1:
+                output_shape = output_shape[1:] or 1
 
         self._surrogate_output_names.append((name, output_shape))
         self._training_output[name] = np.zeros(0)
@@ -139,6 +174,17 @@ class MetaModel(Component):
         else:
             self._init_unknowns_dict[name]['default_surrogate'] = True
 
+    def _vectorize(self, name, var_type, val, kwargs):
+        """ Returns the value of a variable with a leading vec_size dimension,
+        given its value at a single point."""
+        if self.vec_size == 1:
+            return val
+
+        shape = kwargs.pop('shape', None)
+        self._check_val(name, var_type, val, shape)
+        val = self._get_initial_val(val, shape)
+        return np.array(np.broadcast_to(val, (self.vec_size,) + np.shape(val)))
+
     def _setup_variables(self):
         """Returns our params and unknowns dictionaries,
         re-keyed to use absolute variable names.
@@ -147,6 +193,18 @@ class MetaModel(Component):
         that use the default surrogate.
 
         """
+        # The partials of each point only depend on its own inputs.
+        vec_size = self.vec_size
+        if vec_size > 1:
+            for uname, shape in self._surrogate_output_names:
+                out_size = int(np.prod(shape))
+                for pname, sz in self._surrogate_param_names:
+                    points, outs, ins = np.indices((vec_size, out_size, sz))
+                    self._set_sparsity(uname, pname,
+                                       (points*out_size + outs).ravel(),
+                                       (points*sz + ins).ravel(),
+                                       (vec_size*out_size, vec_size*sz))
+
         # create an instance of the default surrogate for outputs that
         # did not have a surrogate specified
         if self.default_surrogate is not None:
@@ -210,7 +268,10 @@ class MetaModel(Component):
         for name, shape in self._surrogate_output_names:
             surrogate = self._init_unknowns_dict[name].get('surrogate')
             if surrogate:
-                unknowns[name] = surrogate.predict(inputs)
+                predicted = surrogate.predict(inputs)
+                if self.vec_size > 1:
+                    predicted = np.reshape(predicted, unknowns[name].shape)
+                unknowns[name] = predicted
             else:
                 raise RuntimeError("Metamodel '%s': No surrogate specified for output '%s'"
                                    % (self.pathname, name))
@@ -221,9 +282,13 @@ class MetaModel(Component):
         """
 
         array_real = True
+        vec_size = self.vec_size
 
         if out is None:
-            inputs = np.zeros(self._input_size)
+            if vec_size > 1:
+                inputs = np.zeros((vec_size, self._input_size))
+            else:
+                inputs = np.zeros(self._input_size)
         else:
             inputs = out
 
@@ -236,7 +301,11 @@ class MetaModel(Component):
                 if array_real and np.issubdtype(val.dtype, complex):
                     array_real = False
                     inputs = inputs.astype(complex)
-                inputs[idx:idx + sz] = val.flat
+                if vec_size > 1:
+                    # One row per point
+                    inputs[:, idx:idx + sz] = val.reshape((vec_size, sz))
+                else:
+                    inputs[idx:idx + sz] = val.flat
                 idx += sz
             else:
                 inputs[idx] = val
@@ -273,6 +342,16 @@ class MetaModel(Component):
             surrogate = self._init_unknowns_dict[uname].get('surrogate')
             sjac = surrogate.linearize(inputs)
 
+            if self.vec_size > 1:
+                # Values of the block-diagonal partials, in the order of
+                # their declared sparsity.
+                sjac = np.reshape(sjac, (self.vec_size, -1, self._input_size))
+                idx = 0
+                for pname, sz in self._surrogate_param_names:
+                    jac[(uname, pname)] = sjac[:, :, idx:idx+sz].ravel()
+                    idx += sz
+                continue
+
             idx = 0
             for pname, sz in self._surrogate_param_names:
                 jac[(uname, pname)] = sjac[:, idx:idx+sz]
@@ -308,14 +387,15 @@ class MetaModel(Component):
 
         if self.warm_restart:
             num_old_pts = self._training_input.shape[0]
-            inputs = np.zeros((num_sample + num_old_pts, self._input_size))
-            if num_old_pts > 0:
-                inputs[:num_old_pts, :] = self._training_input
-            new_input = inputs[num_old_pts:, :]
-
         else:
-            inputs = np.zeros((num_sample, self._input_size))
-            new_input = inputs
+            num_old_pts = 0
+
+        # The training data lives at the start of buffers that grow
+        # geometrically, so appending a few points doesn't copy all of them.
+        self._input_buffer = _grow(self._input_buffer, num_old_pts, num_sample,
+                                   self._input_size)
+        inputs = self._input_buffer[:num_old_pts + num_sample]
+        new_input = inputs[num_old_pts:, :]
 
         self._training_input = inputs
 
@@ -338,17 +418,12 @@ class MetaModel(Component):
             if num_sample > 0:
                 output_size = np.prod(shape)
 
-                if self.warm_restart:
-                    outputs = np.zeros((num_sample + num_old_pts,
-                                        output_size))
-                    if num_old_pts > 0:
-                        outputs[:num_old_pts, :] = self._training_output[name]
-                    self._training_output[name] = outputs
-                    new_output = outputs[num_old_pts:, :]
-                else:
-                    outputs = np.zeros((num_sample, output_size))
-                    self._training_output[name] = outputs
-                    new_output = outputs
+                buf = _grow(self._output_buffers.get(name), num_old_pts,
+                            num_sample, output_size)
+                self._output_buffers[name] = buf
+                outputs = buf[:num_old_pts + num_sample]
+                self._training_output[name] = outputs
+                new_output = outputs[num_old_pts:, :]
 
                 val = self.params['train:' + name]
 
@@ -362,10 +437,45 @@ class MetaModel(Component):
 
             surrogate = self._init_unknowns_dict[name].get('surrogate')
             if surrogate is not None:
-                surrogate.train(self._training_input, self._training_output[name])
+                # Only new points were added, so try to update the surrogate
+                # instead of training it again.
+                if num_old_pts > 0 and surrogate.trained:
+                    if num_sample == 0 or surrogate.update(new_input, new_output):
+                        continue
+                if self.cache_dir is None:
+                    surrogate.train(self._training_input, self._training_output[name])
+                else:
+                    self._train_cached(surrogate, self._training_input,
+                                       self._training_output[name])
 
         self.train = False
 
+    def _train_cached(self, surrogate, x, y):
+        """ Loads the trained surrogate from the cache directory, or trains it
+        and saves it there."""
+        filename = os.path.join(self.cache_dir, _cache_key(surrogate, x, y) + '.pkl')
+
+        if os.path.exists(filename):
+            try:
+                surrogate.load(filename)
+                return
+            except (EOFError, ValueError, pickle.UnpicklingError):
+                # Damaged or stale entry, so replace it.
+                pass
+
+        surrogate.train(x, y)
+
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        # Write to a temporary file first, so that a run that is killed never
+        # leaves a partial entry behind.
+        tmp_name = '%s.%d.tmp' % (filename, os.getpid())
+        surrogate.save(tmp_name)
+        if os.path.exists(filename):
+            os.remove(filename)
+        os.rename(tmp_name, filename)
+
     def _get_fd_params(self):
         """
         Get the list of parameters that are needed to perform a
@@ -391,3 +501,29 @@ class MetaModel(Component):
         """
         return [k for k, acc in iteritems(self.unknowns._dat)
                    if not (acc.pbo or k.startswith('train'))]
+
+
+def _cache_key(surrogate, x, y):
+    """ Returns a hex digest of the type and settings of the surrogate and
+    of its training data."""
+    sha = hashlib.sha1()
+    sha.update(_type_name(surrogate).encode('utf-8'))
+    sha.update(pickle.dumps(sorted(iteritems(surrogate._options())), protocol=2))
+    for data in (x, y):
+        data = np.ascontiguousarray(data)
+        sha.update(('%s%s' % (data.dtype.str, data.shape)).encode('utf-8'))
+        sha.update(data.tobytes())
+    return sha.hexdigest()
+
+
+def _grow(buf, num_old, num_new, width):
+    """ Returns a buffer with room for num_old + num_new rows that starts
+    with the first num_old rows of buf. Its size at least doubles when it
+    has to be reallocated."""
+    num = num_old + num_new
+    if buf is None or buf.shape[0] < num or buf.shape[1] != width:
+        new_buf = np.zeros((max(num, 2*num_old), width))
+        if num_old > 0:
+            new_buf[:num_old] = buf[:num_old]
+        buf = new_buf
+    return buf
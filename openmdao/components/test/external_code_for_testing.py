@@ -11,6 +11,8 @@ def main():
                     action="store_true", default=False)
     parser.add_argument("-d", "--delay", type=float,
                     help="time in seconds to delay")
+    parser.add_argument("-s", "--square",
+                    help="Write the squares of the numbers in this file to the file")
 
     args = parser.parse_args()
 
@@ -23,6 +25,10 @@ def main():
         out.write("test data\n")
         if args.write_test_env_var:
             out.write("%s\n" % os.environ['TEST_ENV_VAR'])
+        if args.square:
+            with open(args.square, 'r') as inp:
+                for line in inp:
+                    out.write("%.16g\n" % float(line)**2)
 
     return 0
 
@@ -301,5 +301,60 @@ class TestExecComp(unittest.TestCase):
         assert_rel_error(self, data['comp'][('foo:y','x')]['rel error'][1], 0.0, 1e-5)
         assert_rel_error(self, data['comp'][('foo:y','x')]['rel error'][2], 0.0, 1e-5)
 
+    def test_multiple_exprs_chained(self):
+        prob = Problem(root=Group())
+        C1 = prob.root.add('C1', ExecComp(['y = 2.0*x', 'z = y + x'], x=3.0))
+        prob.setup(check=False)
+        prob.run()
+
+        assert_rel_error(self, C1.unknowns['y'], 6.0, 1e-15)
+        assert_rel_error(self, C1.unknowns['z'], 9.0, 1e-15)
+
+        J = C1.linearize(C1.params, C1.unknowns, C1.resids)
+        assert_rel_error(self, J['z', 'x'], np.array([[3.0]]), 1e-15)
+
+    def test_vectorize(self):
+        n = 5
+        x = np.linspace(0.5, 2.5, n)
+        for vectorize in (False, True):
+            prob = Problem(root=Group())
+            prob.root.add('p', IndepVarComp('x', x))
+            comp = prob.root.add('comp', ExecComp(['y = sin(x)*z + x**2', 'w = 3.0*z'],
+                                                  x=np.zeros(n), y=np.zeros(n),
+                                                  z=np.ones(n), w=np.zeros(n),
+                                                  vectorize=vectorize))
+            prob.root.connect('p.x', 'comp.x')
+            prob.setup(check=False)
+            prob.run()
+
+            J = prob.calc_gradient(['p.x'], ['comp.y'], return_format='dict')
+            assert_rel_error(self, J['comp.y']['p.x'], np.diag(np.cos(x) + 2*x), 1e-10)
+
+            data = prob.check_partial_derivatives(out_stream=None)
+            for key in [('y', 'x'), ('w', 'x')]:
+                assert_rel_error(self, data['comp'][key]['abs error'][0], 0.0, 1e-5)
+
+        jac = comp._jacobian_cache
+        self.assertEqual(jac['y', 'x'].nnz, n)
+        assert_rel_error(self, jac['w', 'z'].toarray(), 3.0*np.eye(n), 1e-15)
+
+    def test_vectorize_bad_shapes(self):
+        with self.assertRaises(RuntimeError) as cm:
+            ExecComp('y = sum(x)', x=np.zeros(3), vectorize=True)
+        self.assertEqual(str(cm.exception),
+                         "ExecComp with vectorize=True requires all variables "
+                         "in the expressions ['y = sum(x)'] to have the same "
+                         "shape, but found shapes [(), (3,)].")
+
+    def test_pickle(self):
+        import pickle
+        prob = Problem(root=Group())
+        comp = prob.root.add('comp', ExecComp('foo:y = 2.0*x + 1.0', x=3.0))
+        prob.setup(check=False)
+        prob.run()
+
+        comp2 = pickle.loads(pickle.dumps(comp))
+        self.assertEqual(comp2._func(0.0, 4.0), (9.0,))
+
 if __name__ == "__main__":
     unittest.main()
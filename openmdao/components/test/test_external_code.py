@@ -7,8 +7,11 @@ import tempfile
 import shutil
 import pkg_resources
 
-from openmdao.api import Problem, Group, ExternalCode, AnalysisError
+import numpy as np
+
+from openmdao.api import Problem, Group, ExternalCode, AnalysisError, IndepVarComp
 from openmdao.components.external_code import STDOUT
+from openmdao.test.util import assert_rel_error
 
 DIRECTORY = os.path.dirname((os.path.abspath(__file__)))
 
@@ -17,6 +20,33 @@ class ExternalCodeForTesting(ExternalCode):
         super(ExternalCodeForTesting, self).__init__()
 
 
+class SquareExternalCode(ExternalCode):
+    """ y = x**2, computed by the external code from a generated input file. """
+
+    def __init__(self):
+        super(SquareExternalCode, self).__init__()
+
+        self.add_param('x', np.array([1.0, 2.0, 3.0]))
+        self.add_output('y', np.zeros(3))
+
+        self.options['command'] = ['python', 'external_code_for_testing.py',
+                                   'square.out', '--square', 'square.in']
+        self.options['external_input_files'] = ['external_code_for_testing.py', 'square.in']
+        self.options['external_output_files'] = ['square.out']
+
+        self.deriv_options['type'] = 'fd'
+
+    def write_inputs(self, params, unknowns):
+        with open('square.in', 'w') as f:
+            for x in params['x']:
+                f.write('%.16g\n' % x)
+
+    def read_outputs(self, params, unknowns):
+        with open('square.out', 'r') as f:
+            lines = f.readlines()[1:]
+        unknowns['y'] = np.array([float(line) for line in lines])
+
+
 class TestExternalCode(unittest.TestCase):
 
     def setUp(self):
@@ -153,6 +183,158 @@ class TestExternalCode(unittest.TestCase):
         self.assertTrue('SOME_ENV_VAR_VALUE' in file_contents,
                         "'SOME_ENV_VAR_VALUE' missing from '%s'" % file_contents)
 
+    def test_exec_path_cached(self):
+        self.extcode.options['command'] = ['python', 'external_code_for_testing.py', 'external_code_output.txt']
+
+        self.top.setup(check=False)
+        self.top.run()
+        self.assertEqual(len(self.extcode._exec_paths), 1)
+
+        path = list(self.extcode._exec_paths.values())[0]
+        self.top.run()
+        self.assertEqual(list(self.extcode._exec_paths.values()), [path])
+
+    def test_cache_results(self):
+        self.extcode.options['command'] = ['python', 'external_code_for_testing.py', 'external_code_output.txt']
+        self.extcode.options['external_input_files'] = ['external_code_for_testing.py', 'inputs.txt']
+        self.extcode.options['external_output_files'] = ['external_code_output.txt',]
+        self.extcode.options['cache_results'] = True
+        self.extcode.options['cache_size'] = 1
+
+        nruns = []
+        execute_local = self.extcode._execute_local
+        def counting_execute():
+            nruns.append(1)
+            return execute_local()
+        self.extcode._execute_local = counting_execute
+
+        with open('inputs.txt', 'w') as f:
+            f.write('x = 1\n')
+
+        self.top.setup(check=False)
+        self.top.run()
+        self.assertEqual(len(nruns), 1)
+
+        # identical inputs restore the recorded output instead of running
+        os.remove('external_code_output.txt')
+        self.top.run()
+        self.assertEqual(len(nruns), 1)
+        self.assertEqual(self.extcode.return_code, 0)
+        with open('external_code_output.txt', 'r') as out:
+            self.assertEqual(out.read(), 'test data\n')
+
+        # changed inputs run the command again
+        with open('inputs.txt', 'w') as f:
+            f.write('x = 2\n')
+        self.top.run()
+        self.assertEqual(len(nruns), 2)
+
+        # cache_size of 1 evicted the first run
+        with open('inputs.txt', 'w') as f:
+            f.write('x = 1\n')
+        self.top.run()
+        self.assertEqual(len(nruns), 3)
+
+        self.extcode.clear_cache()
+        self.top.run()
+        self.assertEqual(len(nruns), 4)
+
+
+
+class TestExternalCodeBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.startdir = os.getcwd()
+        self.tempdir = tempfile.mkdtemp(prefix='test_extcode-')
+        os.chdir(self.tempdir)
+        shutil.copy(os.path.join(DIRECTORY, 'external_code_for_testing.py'),
+                    os.path.join(self.tempdir, 'external_code_for_testing.py'))
+
+        self.top = Problem()
+        self.top.root = Group()
+        self.top.root.add('p', IndepVarComp('x', np.array([1.0, 2.0, 3.0])))
+        self.extcode = self.top.root.add('extcode', SquareExternalCode())
+        self.top.root.connect('p.x', 'extcode.x')
+
+    def tearDown(self):
+        os.chdir(self.startdir)
+        if not os.environ.get('OPENMDAO_KEEPDIRS', False):
+            try:
+                shutil.rmtree(self.tempdir)
+            except OSError:
+                pass
+
+    def test_run_batch(self):
+        self.extcode.options['max_concurrent'] = 2
+
+        self.top.setup(check=False)
+        self.top.run()
+        assert_rel_error(self, self.top['extcode.y'], np.array([1.0, 4.0, 9.0]), 1e-15)
+
+        cases = [{'x': np.array([1.0, 1.0, 1.0])},
+                 {'x': np.array([2.0, 3.0, 4.0])},
+                 {'x': np.array([-1.0, 0.5, 0.0])}]
+        ext = self.extcode
+        results = ext.run_batch(ext.params, ext.unknowns, cases)
+
+        ydat = ext.unknowns._dat['y']
+        for case, result in zip(cases, results):
+            assert_rel_error(self, result[ydat.slice[0]:ydat.slice[1]], case['x']**2, 1e-15)
+
+        # params and unknowns are left as they were
+        assert_rel_error(self, ext.params['x'], np.array([1.0, 2.0, 3.0]), 1e-15)
+        assert_rel_error(self, ext.unknowns['y'], np.array([1.0, 4.0, 9.0]), 1e-15)
+
+        # each case ran in its own scratch directory
+        with open('square.in', 'r') as f:
+            self.assertEqual(f.read(), '1\n2\n3\n')
+
+    def test_run_batch_error(self):
+        self.extcode.options['max_concurrent'] = 2
+        self.extcode.options['command'] = self.extcode.options['command'] + ['--delay', '-1']
+
+        self.top.setup(check=False)
+        ext = self.extcode
+        try:
+            ext.run_batch(ext.params, ext.unknowns, [{'x': np.ones(3)}])
+        except RuntimeError as exc:
+            self.assertTrue("delay must be >= 0" in str(exc),
+                            "expected 'delay must be >= 0' to be in '%s'" % str(exc))
+        else:
+            self.fail('Expected RuntimeError')
+
+    def test_batch_fd(self):
+        # colored, the three columns of the diagonal jacobian are one step
+        for coloring, nsteps in ((False, 3), (True, 1)):
+            for form in ('forward', 'backward', 'central'):
+                top = Problem()
+                top.root = Group()
+                top.root.add('p', IndepVarComp('x', np.array([1.0, 2.0, 3.0])))
+                extcode = top.root.add('extcode', SquareExternalCode())
+                top.root.connect('p.x', 'extcode.x')
+
+                batches = []
+                def counting_run_batch(params, unknowns, cases, run_batch=extcode.run_batch):
+                    batches.append(len(cases))
+                    return run_batch(params, unknowns, cases)
+                extcode.run_batch = counting_run_batch
+
+                extcode.options['max_concurrent'] = 4
+                extcode.deriv_options['form'] = form
+                extcode.deriv_options['coloring'] = coloring
+
+                top.setup(check=False)
+                top.run()
+
+                J = top.calc_gradient(['p.x'], ['extcode.y'], return_format='array')
+                assert_rel_error(self, J, np.diag([2.0, 4.0, 6.0]), 1e-5)
+                self.assertEqual(batches[-1], nsteps * (2 if form == 'central' else 1))
+
+                # same steps and differences as one process at a time
+                extcode.options['max_concurrent'] = 1
+                Jseq = top.calc_gradient(['p.x'], ['extcode.y'], return_format='array')
+                np.testing.assert_array_equal(J, Jseq)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import numpy as np
 import unittest
 
@@ -9,6 +12,16 @@ from six.moves import cStringIO
 from re import findall
 
 
+class CountingKriging(FloatKrigingSurrogate):
+    """ Counts the calls of `train`."""
+
+    num_trains = 0
+
+    def train(self, x, y):
+        CountingKriging.num_trains += 1
+        super(CountingKriging, self).train(x, y)
+
+
 class TestMetaModel(unittest.TestCase):
 
     def test_sin_metamodel(self):
@@ -232,6 +245,99 @@ class TestMetaModel(unittest.TestCase):
         assert_rel_error(self, prob['meta.y1'], 2.0, .00001)
         assert_rel_error(self, prob['meta.y2'], 4.0, .00001)
 
+    def test_warm_start_update(self):
+        # Surrogates that support it are updated with the new points.
+        meta = MetaModel()
+        meta.add_param('x', 0.)
+        meta.add_output('y', 0.)
+        meta.add_output('z', np.zeros(2), surrogate=FloatKrigingSurrogate())
+        meta.default_surrogate = ResponseSurface()
+        meta.warm_restart = True
+
+        prob = Problem(Group())
+        prob.root.add('meta', meta)
+        prob.setup(check=False)
+
+        x = np.linspace(0., 3., 10)
+        prob['meta.train:x'] = x[:6]
+        prob['meta.train:y'] = x[:6]**2
+        prob['meta.train:z'] = [np.array([np.sin(v), v]) for v in x[:6]]
+        prob.run()
+
+        surrogates = [prob.root.unknowns.metadata('meta.' + name)['surrogate']
+                      for name in ('y', 'z')]
+        counts = []
+        for surrogate in surrogates:
+            train = surrogate.train
+            count = {'train': 0}
+
+            def counted(inputs, outputs, train=train, count=count):
+                count['train'] += 1
+                return train(inputs, outputs)
+
+            surrogate.train = counted
+            counts.append(count)
+
+        for i in range(6, 10):
+            prob['meta.train:x'] = x[i:i+1]
+            prob['meta.train:y'] = x[i:i+1]**2
+            prob['meta.train:z'] = [np.array([np.sin(x[i]), x[i]])]
+            meta.train = True
+            prob['meta.x'] = x[i]
+            prob.run()
+            assert_rel_error(self, prob['meta.y'], x[i]**2, 1e-8)
+            assert_rel_error(self, prob['meta.z'], [np.sin(x[i]), x[i]], 1e-6)
+
+        self.assertEqual(counts, [{'train': 0}, {'train': 0}])
+        assert_rel_error(self, meta._training_input[:, 0], x, 0.)
+        self.assertEqual(surrogates[1].n_samples, 10)
+
+    def test_cache_dir(self):
+        tempdir = tempfile.mkdtemp(prefix='omdao-')
+        self.addCleanup(shutil.rmtree, tempdir)
+        cache_dir = os.path.join(tempdir, 'surrogates')
+
+        def run(y_train, nugget=10. * np.finfo(float).eps):
+            meta = MetaModel()
+            meta.add_param('x', 0.)
+            meta.add_output('y', 0.)
+            meta.default_surrogate = CountingKriging(nugget=nugget)
+            meta.cache_dir = cache_dir
+
+            prob = Problem(Group())
+            prob.root.add('meta', meta)
+            prob.setup(check=False)
+
+            prob['meta.train:x'] = [0., .25, .5, .75, 1.]
+            prob['meta.train:y'] = y_train
+            prob['meta.x'] = 0.4
+            prob.run()
+            return prob['meta.y']
+
+        CountingKriging.num_trains = 0
+        y = run([1., .5, .2, .6, 0.])
+        self.assertEqual(CountingKriging.num_trains, 1)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        # Same data and settings, so nothing is trained.
+        assert_rel_error(self, run([1., .5, .2, .6, 0.]), y, 1e-15)
+        self.assertEqual(CountingKriging.num_trains, 1)
+
+        # New data or settings need a new surrogate.
+        run([1., .5, .3, .6, 0.])
+        self.assertEqual(CountingKriging.num_trains, 2)
+        run([1., .5, .2, .6, 0.], nugget=1e-6)
+        self.assertEqual(CountingKriging.num_trains, 3)
+        self.assertEqual(len(os.listdir(cache_dir)), 3)
+
+        # A damaged entry is replaced.
+        for name in os.listdir(cache_dir):
+            with open(os.path.join(cache_dir, name), 'wb') as f:
+                f.write(b'junk')
+        assert_rel_error(self, run([1., .5, .2, .6, 0.]), y, 1e-15)
+        self.assertEqual(CountingKriging.num_trains, 4)
+        self.assertEqual(len(os.listdir(cache_dir)), 3)
+
     def test_vector_inputs(self):
 
         meta = MetaModel()
@@ -402,5 +508,67 @@ class TestMetaModel(unittest.TestCase):
             abs_error = float(match)
             self.assertTrue(abs_error < 1.e-6)
 
+    def test_vec_size(self):
+        x_train = np.array([[0., 0.], [1., 0.], [0., 1.], [1., 1.],
+                            [.5, .5], [.5, 0.], [0., .5], [1., .5], [.5, 1.]])
+        y_train = np.column_stack([np.sin(x_train[:, 0]) + x_train[:, 1]**2,
+                                   x_train[:, 0]*x_train[:, 1]])
+        points = np.array([[.1, .2], [.4, .9], [.75, .3]])
+
+        def build(vec_size, surrogate):
+            meta = MetaModel(vec_size=vec_size)
+            meta.add_param('x', 0.)
+            meta.add_param('w', np.zeros(1))
+            meta.add_output('y', np.zeros(2))
+            meta.add_output('z', 0., surrogate=ResponseSurface())
+            meta.default_surrogate = surrogate
+
+            prob = Problem(Group())
+            prob.root.add('meta', meta, promotes=['x', 'w'])
+            prob.root.add('p', IndepVarComp([('x', np.zeros(vec_size) if vec_size > 1 else 0.),
+                                             ('w', np.zeros((vec_size, 1)) if vec_size > 1 else np.zeros(1))]),
+                          promotes=['x', 'w'])
+            prob.setup(check=False)
+
+            prob['meta.train:x'] = x_train[:, 0]
+            prob['meta.train:w'] = x_train[:, 1:]
+            prob['meta.train:y'] = y_train
+            prob['meta.train:z'] = y_train[:, 1]
+            return prob
+
+        for surrogate in (ResponseSurface(), KrigingSurrogate()):
+            prob = build(3, surrogate)
+            self.assertEqual(prob['meta.x'].shape, (3,))
+            self.assertEqual(prob['meta.w'].shape, (3, 1))
+            self.assertEqual(prob['meta.y'].shape, (3, 2))
+
+            prob['x'] = points[:, 0]
+            prob['w'] = points[:, 1:]
+            prob.run()
+
+            # Same as evaluating one point at a time.
+            single = build(1, surrogate)
+            for i, point in enumerate(points):
+                single['x'] = point[0]
+                single['w'] = point[1:]
+                single.run()
+                assert_rel_error(self, prob['meta.y'][i], single['meta.y'], 1e-10)
+                assert_rel_error(self, prob['meta.z'][i], single['meta.z'], 1e-10)
+
+            data = prob.check_partial_derivatives(out_stream=None,
+                                                  global_options={'check_type': 'cs'})
+            for key, val in data['meta'].items():
+                assert_rel_error(self, val['J_fwd'], val['J_fd'], 1e-6)
+
+            J = data['meta'][('y', 'x')]['J_fwd']
+            self.assertEqual(J.shape, (6, 3))
+            assert_rel_error(self, J[2:, 0], np.zeros(4), 1e-15)
+
+    def test_vec_size_error(self):
+        with self.assertRaises(ValueError) as cm:
+            MetaModel(vec_size=0)
+        self.assertEqual(str(cm.exception),
+                         "MetaModel: vec_size must be at least 1, but is 0.")
+
 if __name__ == "__main__":
     unittest.main()
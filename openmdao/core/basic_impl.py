@@ -63,7 +63,7 @@ class BasicImpl(object):
     @staticmethod
     def create_data_xfer(src_vec, tgt_vec,
                          src_idxs, tgt_idxs, vec_conns, byobj_conns,
-                         mode, sysdata):
+                         mode, sysdata, unit_conv=None):
         """
         Create an object for performing data transfer between source
         and target vectors.
@@ -99,10 +99,14 @@ class BasicImpl(object):
             The `SysData` object for the Group that will contain the new
             `DataTransfer` object.
 
+        unit_conv : tuple of arrays, optional
+            Indices into tgt_vec of the params that need a unit conversion,
+            with the scale and offset of each one.
+
         Returns
         -------
         `DataTransfer`
             A `DataTransfer` object.
         """
         return DataTransfer(src_idxs, tgt_idxs, vec_conns, byobj_conns, mode,
-                            sysdata)
+                            sysdata, unit_conv=unit_conv)
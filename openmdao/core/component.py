@@ -11,15 +11,17 @@ from itertools import chain
 from six import iteritems, itervalues
 
 import numpy as np
+from scipy.sparse import issparse
 
 from openmdao.core.basic_impl import BasicImpl
-from openmdao.core.system import System
+from openmdao.core.system import System, _alloc_sparse_jac, _sparse_fd_columns
 from openmdao.core.mpi_wrap import MPI
 from openmdao.core.vec_wrapper import _ByObjWrapper
 from openmdao.core.vec_wrapper_complex_step import ComplexStepSrcVecWrapper, \
                                                    ComplexStepTgtVecWrapper
 from openmdao.core.fileref import FileRef
 from openmdao.units.units import PhysicalQuantity
+from openmdao.util.coloring import color_columns
 from openmdao.util.type_util import is_differentiable
 
 # Object to represent default value for `add_output`.
@@ -72,6 +74,15 @@ class Component(System):
         in check_partial_derivatives"
     deriv_options['linearize'] : bool(False)
         Set to True if you want linearize to be called even though you are using FD.
+    deriv_options['coloring'] : bool(False)
+        Set to True to detect the sparsity of the partial derivatives during
+        setup, so that finite difference or complex step can perturb groups
+        of structurally orthogonal columns together.
+    deriv_options['multiple_rhs'] : bool(False)
+        Set to True if apply_linear and solve_linear can take several
+        right-hand sides at once. Each value in dparams, dunknowns and dresids
+        then has an extra last dimension with one entry per right-hand side.
+        Otherwise they are called once per right-hand side.
     """
 
     def __init__(self):
@@ -87,6 +98,20 @@ class Component(System):
         self._pbo_warns = []
         self._run_apply = False
 
+        self.deriv_options.add_option('coloring', False,
+                                      desc="Set to True to detect the sparsity of the "
+                                      "partial derivatives during setup, so that "
+                                      "finite difference or complex step can perturb "
+                                      "groups of structurally orthogonal columns together.",
+                                      lock_on_setup=True)
+        self.deriv_options.add_option('multiple_rhs', False,
+                                      desc="Set to True if apply_linear and "
+                                      "solve_linear can take several right-hand "
+                                      "sides at once. Each value in dparams, "
+                                      "dunknowns and dresids then has an extra "
+                                      "last dimension with one entry per "
+                                      "right-hand side.")
+
     def _get_initial_val(self, val, shape):
         """ Determines initial value based on starting val and shape."""
         if val is _NotSet:
@@ -294,6 +319,202 @@ class Component(System):
         meta['size'] = val.size
         meta['src_indices'] = src_indices
 
+    def declare_partials(self, of, wrt, rows=None, cols=None, sparsity=None):
+        """ Declares the sparsity structure of the derivative of an output or
+        state with respect to a param or state. Both variables must already
+        have been added.
+
+        Once declared, `linearize` may return the sub-jacobian for this pair
+        as a scipy.sparse matrix or as a flat array of the values at the
+        declared (rows, cols), in the same order. Finite difference and
+        complex step only perturb the columns that contain a nonzero.
+
+        Args
+        ----
+        of : string
+            Name of the output or state.
+
+        wrt : string
+            Name of the param or state.
+
+        rows : array of int, optional
+            Row indices of the nonzero entries.
+
+        cols : array of int, optional
+            Column indices of the nonzero entries.
+
+        sparsity : scipy.sparse matrix or ndarray, optional
+            Matrix whose nonzero entries define the structure. Use this
+            instead of rows and cols.
+        """
+        if self._post_setup_vars:
+            raise RuntimeError("%s: can't declare partials of '%s' wrt '%s' because "
+                               "setup has already been called." %
+                               (self.pathname, of, wrt))
+
+        umeta = self._init_unknowns_dict.get(of)
+        if umeta is None:
+            raise KeyError("%s: '%s' is not an output or state." % (self.pathname, of))
+
+        pmeta = self._init_params_dict.get(wrt)
+        if pmeta is None:
+            pmeta = self._init_unknowns_dict.get(wrt)
+            if pmeta is None or not pmeta.get('state'):
+                raise KeyError("%s: '%s' is not a param or state." % (self.pathname, wrt))
+
+        shape = (umeta['size'], pmeta['size'])
+
+        if sparsity is not None:
+            if rows is not None or cols is not None:
+                raise ValueError("%s: specify either rows and cols or sparsity "
+                                 "for the partials of '%s' wrt '%s', not both." %
+                                 (self.pathname, of, wrt))
+            if issparse(sparsity):
+                sparsity = sparsity.tocoo()
+                rows, cols = sparsity.row, sparsity.col
+            else:
+                rows, cols = np.nonzero(np.atleast_2d(sparsity))
+            if sparsity.shape != shape:
+                raise ValueError("%s: the sparsity of '%s' wrt '%s' should have "
+                                 "shape %s, but has shape %s." %
+                                 (self.pathname, of, wrt, shape, sparsity.shape))
+
+        elif rows is None or cols is None:
+            raise ValueError("%s: rows and cols or sparsity must be specified "
+                             "for the partials of '%s' wrt '%s'." %
+                             (self.pathname, of, wrt))
+
+        rows = np.asarray(rows, dtype=int).ravel()
+        cols = np.asarray(cols, dtype=int).ravel()
+
+        if rows.size != cols.size:
+            raise ValueError("%s: rows and cols for the partials of '%s' wrt '%s' "
+                             "must be the same size." % (self.pathname, of, wrt))
+
+        if rows.size and (rows.min() < 0 or rows.max() >= shape[0] or
+                          cols.min() < 0 or cols.max() >= shape[1]):
+            raise ValueError("%s: rows or cols for the partials of '%s' wrt '%s' "
+                             "are out of range for shape %s." %
+                             (self.pathname, of, wrt, shape))
+
+        if np.unique(cols * shape[0] + rows).size != rows.size:
+            raise ValueError("%s: rows and cols for the partials of '%s' wrt '%s' "
+                             "contain duplicate entries." % (self.pathname, of, wrt))
+
+        self._set_sparsity(of, wrt, rows, cols, shape)
+
+    def _set_sparsity(self, of, wrt, rows, cols, shape):
+        """ Stores the sparsity structure of a sub-jacobian, along with its
+        CSC representation."""
+
+        # Sort into CSC order.
+        order = np.lexsort((rows, cols))
+
+        indptr = np.zeros(shape[1] + 1, dtype=int)
+        np.cumsum(np.bincount(cols, minlength=shape[1]), out=indptr[1:])
+
+        self._partials_sparsity[of, wrt] = {
+            'rows': rows,
+            'cols': cols,
+            'shape': shape,
+            'order': order,
+            'indices': rows[order],
+            'indptr': indptr,
+        }
+
+    def _setup_fd_coloring(self):
+        """ Detects the sparsity of the partial derivatives that have not been
+        declared by finite differencing (or complex stepping) this component
+        once at a randomly perturbed point, and then colors the columns of
+        each param so that structurally orthogonal columns are perturbed
+        together from now on.
+
+        Returns
+        -------
+        tuple
+            Number of model evaluations per linearization with and without
+            coloring.
+        """
+        params, unknowns, resids = self.params, self.unknowns, self.resids
+        states = self.states
+        fd_unknowns = self._get_fd_unknowns()
+        wrts = [(n, unknowns if n in states else params)
+                for n in chain(self._get_fd_params(), states)]
+
+        # Evaluate at a random point near the initial values so that we don't
+        # miss derivatives that just happen to be zero there.
+        saved = [(vec, name, vec._dat[name].val.copy()) for name, vec in wrts]
+        saved_u = unknowns.vec.copy()
+        saved_r = resids.vec.copy()
+
+        rand = np.random.RandomState(0)
+        for vec, name, val in saved:
+            vec._dat[name].val += (np.abs(val) + 1.0) * 1e-3 * rand.uniform(-1, 1, val.shape)
+
+        self._fd_colorings = {}
+        try:
+            # Finite difference needs the base residuals.
+            self._sys_apply_nonlinear(params, unknowns, resids)
+
+            if self.deriv_options['type'] == 'cs':
+                jac = self.complex_step_jacobian(params, unknowns, resids)
+            else:
+                jac = self.fd_jacobian(params, unknowns, resids)
+        finally:
+            for vec, name, val in saved:
+                vec._dat[name].val[:] = val
+            unknowns.vec[:] = saved_u
+            resids.vec[:] = saved_r
+
+        sparsity = self._partials_sparsity
+        for key, J in iteritems(jac):
+            if key not in sparsity:
+                rows, cols = np.nonzero(J)
+                self._set_sparsity(key[0], key[1], rows, cols, J.shape)
+
+        n_before = n_after = 0
+        for p_name, vec in wrts:
+            p_size = vec._dat[p_name].meta['size']
+            n_before += p_size
+
+            # Stack the sparsity of every unknown wrt this param.
+            rows, cols, offsets = [], [], {}
+            offset = 0
+            for u_name in fd_unknowns:
+                meta = sparsity[u_name, p_name]
+                rows.append(meta['indices'] + offset)
+                cols.append(np.repeat(np.arange(p_size), np.diff(meta['indptr'])))
+                offsets[u_name] = offset
+                offset += meta['shape'][0]
+
+            if offset == 0:
+                continue
+
+            groups = color_columns(np.concatenate(rows), np.concatenate(cols),
+                                   (offset, p_size))
+            n_after += len(groups)
+
+            # For each group of columns, and each unknown, find the slots in
+            # the CSC data that it fills, the rows of the unknown that
+            # supply them, and the column (position in the group) they
+            # belong to.
+            coloring = []
+            for group in groups:
+                scatter = {}
+                for u_name in fd_unknowns:
+                    indptr = sparsity[u_name, p_name]['indptr']
+                    counts = indptr[group + 1] - indptr[group]
+                    slots = np.concatenate([np.arange(indptr[c], indptr[c+1])
+                                            for c in group])
+                    scatter[u_name] = (slots,
+                                       sparsity[u_name, p_name]['indices'][slots],
+                                       np.repeat(np.arange(len(group)), counts))
+                coloring.append((group, scatter))
+
+            self._fd_colorings[p_name] = coloring
+
+        return n_before, n_after
+
     def _check_varname(self, name):
         """ Verifies that a variable name is valid. Also checks for
         duplicates."""
@@ -722,6 +943,21 @@ class Component(System):
         for voi in vois:
             sol_vec[voi].vec[:] = -rhs_vec[voi].vec
 
+    def _multiple_rhs(self, method):
+        """
+        Returns True if the given linear method can run on derivative vectors
+        that hold a block of right-hand sides, either because it was left
+        to the default implementation or because deriv_options['multiple_rhs']
+        is set.
+
+        Args
+        ----
+        method : str
+            Either 'apply_linear' or 'solve_linear'.
+        """
+        return self.deriv_options['multiple_rhs'] or \
+            getattr(type(self), method) == getattr(Component, method)
+
     def dump(self, nest=0, out_stream=sys.stdout, verbose=False, dvecs=False,
              sizes=False):
         """
@@ -886,6 +1122,11 @@ class Component(System):
             step_size = option_overrides.get('check_step_size', step_size)
 
         jac = {}
+
+        # Derivative checks do the full complex step so that a wrong sparsity
+        # declaration is caught.
+        sparsity = {} if use_check else self._partials_sparsity
+
         csparams = ComplexStepTgtVecWrapper(params)
         csunknowns = ComplexStepSrcVecWrapper(unknowns)
         csresids = ComplexStepSrcVecWrapper(resids)
@@ -928,7 +1169,31 @@ class Component(System):
             # Size our Outputs
             for u_name in fd_unknowns:
                 u_size = np.size(unknowns[u_name])
-                jac[u_name, p_name] = np.zeros((u_size, p_size))
+                if (u_name, p_name) in sparsity:
+                    jac[u_name, p_name] = _alloc_sparse_jac(sparsity[u_name, p_name])
+                else:
+                    jac[u_name, p_name] = np.zeros((u_size, p_size))
+
+            # Only perturb the columns that have a declared nonzero.
+            if sparsity:
+                p_idxs = _sparse_fd_columns(sparsity, fd_unknowns, p_name, p_idxs)
+
+            # Step structurally orthogonal columns together.
+            if sparsity and p_name in self._fd_colorings:
+                for cols, scatter in self._fd_colorings[p_name]:
+
+                    stepvec.step_complex(cols, fdstep)
+                    self._sys_apply_nonlinear(csparams, csunknowns, csresids)
+
+                    stepvec.step_complex(cols, -fdstep)
+
+                    for u_name, (slots, rows, pos) in iteritems(scatter):
+                        J = jac.get((u_name, p_name))
+                        if J is not None:
+                            result = resultvec.flat(u_name)
+                            J.data[slots] = result.imag[rows]/fdstep
+
+                p_idxs = ()
 
             # apply Complex Step on each index in array
             for j, idx in enumerate(p_idxs):
@@ -940,7 +1205,12 @@ class Component(System):
 
                 for u_name in fd_unknowns:
                     result = resultvec.flat(u_name)
-                    jac[u_name, p_name][:, j] = result.imag/fdstep
+                    J = jac[u_name, p_name]
+                    if issparse(J):
+                        start, end = J.indptr[idx], J.indptr[idx+1]
+                        J.data[start:end] = result.imag[J.indices[start:end]]/fdstep
+                    else:
+                        J[:, j] = result.imag/fdstep
 
             # Need to clear this out because our next input might be a
             # different vector (state vs param)
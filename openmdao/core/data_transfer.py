@@ -8,6 +8,40 @@ from openmdao.util.array_util import to_slice
 from openmdao.core.mpi_wrap import MPI
 from openmdao.core.fileref import FileRef
 
+# Contiguous slices shorter than this are copied with the flat index arrays.
+_MIN_SLICE_SIZE = 64
+
+def _to_idx_array(idxs):
+    """Returns the indices of a slice or index array as an index array."""
+    if isinstance(idxs, slice):
+        return np.arange(idxs.start, idxs.stop, idxs.step)
+    return np.asarray(idxs)
+
+def convert_units_fwd(tgtvec, unit_conv, deriv=False):
+    """
+    Converts the units of the params in tgtvec that were just transferred
+    from their sources. Derivatives are only scaled.
+    """
+    idxs, scale, offset = unit_conv
+    if deriv:
+        if tgtvec.vec.ndim == 2:
+            scale = scale[:, np.newaxis]
+        tgtvec.vec[idxs] *= scale
+    else:
+        tgtvec.vec[idxs] = (tgtvec.vec[idxs] + offset) * scale
+    if tgtvec._probdata.in_complex_step:
+        tgtvec.imag_vec[idxs] *= scale
+
+def convert_units_rev(tgtvec, unit_conv):
+    """
+    Scales the derivatives of the params in tgtvec before they are added to
+    their sources.
+    """
+    idxs, scale, offset = unit_conv
+    if tgtvec.vec.ndim == 2:
+        scale = scale[:, np.newaxis]
+    tgtvec.vec[idxs] *= scale
+
 class DataTransfer(object):
     """
     An object that performs data transfer between a source vector and a
@@ -35,13 +69,19 @@ class DataTransfer(object):
 
     mode : str
         Either 'fwd' or 'rev', indicating a forward or reverse scatter.
+
+    unit_conv : tuple of arrays, optional
+        Indices into the target vector of the params that need a unit
+        conversion, with the scale and offset of each one. If given, the
+        conversions are applied during the transfer.
     """
 
     def __init__(self, src_idxs, tgt_idxs, vec_conns, byobj_conns, mode,
-                 sysdata):
+                 sysdata, unit_conv=None):
         self.vec_conns = vec_conns
         self.byobj_conns = byobj_conns
         self.sysdata = sysdata
+        self.unit_conv = unit_conv
 
         fwd = mode == 'fwd'
 
@@ -61,29 +101,51 @@ class DataTransfer(object):
             srcs = to_slice(isrcs)
             tgts = to_slice(itgts)
 
-            if not fwd and not isinstance(srcs, slice):
-                # check uniqueness of src_idxs to see if we can avoid
-                # calling np.add.at, which is slower than +=
-                src_unique = np.unique(srcs).size == srcs.size
-            else:
-                src_unique = True
-
             if scatters: # after the first iteration...
                 # try to combine smaller slices into a larger one
-                olds, oldt, sunique = scatters[-1]
+                olds, oldt = scatters[-1]
                 if isinstance(olds, slice) and isinstance(oldt, slice) and \
                      isinstance(srcs, slice) and isinstance(tgts, slice) and \
                      olds.stop == srcs.start and oldt.stop == tgts.start and \
                      olds.step == srcs.step and oldt.step == tgts.step:
                     news = slice(olds.start, srcs.stop, srcs.step)
                     newt = slice(oldt.start, tgts.stop, tgts.step)
-                    scatters[-1] = (news, newt, src_unique)
+                    scatters[-1] = (news, newt)
                 else:
-                    scatters.append((srcs, tgts, src_unique))
+                    scatters.append((srcs, tgts))
             else:
-                scatters.append((srcs, tgts, src_unique))
+                scatters.append((srcs, tgts))
+
+        # Only keep the large contiguous slices. Everything else is gathered
+        # into a single pair of flat index arrays, so a transfer does a
+        # handful of vectorized copies no matter how many connections it has.
+        self.slices = []
+        flat_srcs = []
+        flat_tgts = []
+        for srcs, tgts in scatters:
+            if isinstance(srcs, slice) and isinstance(tgts, slice) and \
+                    srcs.step == 1 and tgts.step == 1 and \
+                    srcs.stop - srcs.start >= _MIN_SLICE_SIZE:
+                self.slices.append((srcs, tgts))
+            else:
+                flat_srcs.append(_to_idx_array(srcs))
+                flat_tgts.append(_to_idx_array(tgts))
 
-        self.scatters = scatters
+        if flat_srcs:
+            self.flat_srcs = np.concatenate(flat_srcs)
+            self.flat_tgts = np.concatenate(flat_tgts)
+        else:
+            self.flat_srcs = self.flat_tgts = np.zeros(0, dtype=int)
+
+        # in reverse mode, derivatives from all of the targets of a source
+        # are added together. If a source shows up more than once in the flat
+        # indices, sum them with bincount, which is much faster than
+        # np.add.at.
+        self.rev_unique = None
+        if not fwd and self.flat_srcs.size:
+            unique, inverse = np.unique(self.flat_srcs, return_inverse=True)
+            if unique.size < self.flat_srcs.size:
+                self.rev_unique = (unique, inverse)
 
     def transfer(self, srcvec, tgtvec, mode='fwd', deriv=False):
         """
@@ -93,7 +155,8 @@ class DataTransfer(object):
         ----
         srcvec : `VecWrapper`
             Variables that are the source of the transfer in fwd mode and
-            the destination of the transfer in rev mode.
+            the destination of the transfer in rev mode. Derivative vectors
+            may hold a block of right-hand sides, one per column.
 
         tgtvec : `VecWrapper`
             Variables that are the destination of the transfer in fwd mode and
@@ -111,19 +174,38 @@ class DataTransfer(object):
             # in reverse mode, srcvec and tgtvec are switched. Note, we only
             # run in reverse for derivatives, and derivatives accumulate from
             # all targets. byobjs are never scattered in reverse
-            for isrcs, itgts, src_unique in self.scatters:
-                if src_unique:
-                    srcvec.vec[isrcs] += tgtvec.vec[itgts]
+            if self.unit_conv is not None:
+                convert_units_rev(tgtvec, self.unit_conv)
+
+            for isrcs, itgts in self.slices:
+                srcvec.vec[isrcs] += tgtvec.vec[itgts]
+
+            if self.rev_unique is not None:
+                unique, inverse = self.rev_unique
+                tgts = tgtvec.vec[self.flat_tgts]
+                if tgts.ndim == 2:
+                    # one right-hand side per column
+                    srcvec.vec[unique] += np.array([np.bincount(inverse, col,
+                                                                unique.size)
+                                                    for col in tgts.T]).T
                 else:
-                    np.add.at(srcvec.vec, isrcs, tgtvec.vec[itgts])
+                    srcvec.vec[unique] += np.bincount(inverse, tgts,
+                                                      unique.size)
+            elif self.flat_srcs.size:
+                srcvec.vec[self.flat_srcs] += tgtvec.vec[self.flat_tgts]
         else:
+            vecs = [(srcvec.vec, tgtvec.vec)]
             if tgtvec._probdata.in_complex_step:
-                for isrcs, itgts, _ in self.scatters:
-                    tgtvec.vec[itgts] = srcvec.vec[isrcs]
-                    tgtvec.imag_vec[itgts] = srcvec.imag_vec[isrcs]
-            else:
-                for isrcs, itgts, _ in self.scatters:
-                    tgtvec.vec[itgts] = srcvec.vec[isrcs]
+                vecs.append((srcvec.imag_vec, tgtvec.imag_vec))
+
+            for src, tgt in vecs:
+                for isrcs, itgts in self.slices:
+                    tgt[itgts] = src[isrcs]
+                if self.flat_srcs.size:
+                    tgt[self.flat_tgts] = src[self.flat_srcs]
+
+            if self.unit_conv is not None:
+                convert_units_fwd(tgtvec, self.unit_conv, deriv)
 
             # forward, include byobjs if not a deriv scatter
             if not deriv:
@@ -13,6 +13,7 @@ from collections import Iterable
 
 import numpy as np
 import networkx as nx
+from scipy.sparse import csc_matrix, issparse
 
 from openmdao.components.indep_var_comp import IndepVarComp
 from openmdao.core.component import Component
@@ -88,6 +89,8 @@ class Group(System):
         self._gs_outputs = None
         self._run_apply = True
         self._icache = {}
+        self._icache_src_idxs = {}
+        self._sparse_plans = {}
 
     def find_subsystem(self, name):
         """
@@ -938,6 +941,16 @@ class Group(System):
                 sol_vec[voi].vec[:] = -rhs_vec[voi].vec
                 return
 
+        # Solvers that take one right-hand side at a time solve each column
+        # of a block separately.
+        if not solver.supports['multiple_rhs']:
+            block_vois = [voi for voi in vois if self._block_size(voi)]
+            for voi in block_vois:
+                for _ in self._block_columns(voi):
+                    self.solve_linear(dumat, drmat, (voi,), mode=mode,
+                                      solver=solver, rel_inputs=rel_inputs)
+            vois = [voi for voi in vois if voi not in block_vois]
+
         # Solve Jacobian, df |-> du [fwd] or du |-> df [rev]
         rhs_buf = OrderedDict()
         for voi in vois:
@@ -994,14 +1007,16 @@ class Group(System):
             Jacobian by calling apply_linear with columns of identity. Select
             'assemble' to build the Jacobian by taking the calculated Jacobians in
             each component and placing them directly into a clean identity matrix.
+            Select 'sparse' to place the calculated Jacobians into a
+            scipy.sparse CSC matrix instead of a dense one.
 
         mult : function(None)
             Solver mult function to coordinate the matrix vector product
 
         Returns
         -------
-        ndarray : Jacobian Matrix. Note: if mode is 'rev', then the transpose
-        Jacobian is returned.
+        ndarray or scipy.sparse.csc_matrix : Jacobian Matrix. Note: if mode is
+        'rev', then the transpose Jacobian is returned.
 
         dict of tuples : Contains the location of each derivative in the Jacobian. The
         key is a tuple containing the component name string, and a tuple with the output
@@ -1024,68 +1039,113 @@ class Group(System):
             for i in range(n_edge):
                 partials[:, i] = mult(ident[:, i])
 
+        # Assemble the Jacobian into a sparse matrix. The sparsity structure
+        # is computed once and only the values are refreshed afterwards.
+        elif method == 'sparse':
+
+            icache = self._icache
+
+            plan = self._sparse_plans.get(mode)
+            data = None if plan is None else plan.fill()
+
+            if data is None:
+                plan = _SparseJacobianPlan(self, mode)
+                self._sparse_plans[mode] = plan
+                data = plan.fill()
+
+            partials = csc_matrix((data, plan.indices, plan.indptr),
+                                  shape=(n_edge, n_edge))
+
         # Assemble the Jacobian
         else:
 
             partials = -np.eye(n_edge)
             icache = self._icache
-            conn = self.connections
-            sys_prom_name = self._sysdata.to_prom_name
 
-            for sub in self.components(recurse=True):
+            for sub, key, J, loc, src_idxs in self._iter_jac_blocks():
+                o_start, o_end, i_start, i_end = loc
+
+                if issparse(J):
+                    J = J.toarray()
 
-                jac = sub._jacobian_cache
+                if mode=='fwd':
+                    partials[o_start:o_end, i_start:i_end] = J
+                else:
+                    partials[i_start:i_end, o_start:o_end] = J.T
+
+        return partials, icache
 
-                # This method won't work on components where apply_linear
-                # is overridden.
-                if jac is None:
-                    msg = "The 'assemble' jacobian_method is not supported when " + \
-                         "'apply_linear' is used on a component (%s)." % sub.pathname
-                    raise RuntimeError(msg)
+    def _iter_jac_blocks(self):
+        """ Iterate over the cached sub-Jacobians of every component in this
+        Group, yielding each one along with its location in our unknowns
+        vector.
 
-                sub_u = sub.unknowns
-                sub_name = sub.pathname
+        Yields
+        ------
+        `Component` : The component that owns the sub-Jacobian.
 
-                for key in jac:
-                    o_var, i_var = key
-                    key2 = (sub_name, key)
+        tuple : The (output, param) key of the sub-Jacobian.
 
-                    # We cache the location of each variable in our jacobian
-                    if key2 not in icache:
+        ndarray or scipy.sparse matrix : The sub-Jacobian for one (output,
+        param) pair.
 
-                        o_var_abs = '.'.join((sub_name, o_var))
-                        i_var_abs = '.'.join((sub_name, i_var))
-                        i_var_pro = sys_prom_name[i_var_abs]
-                        o_var_pro = sys_prom_name[o_var_abs]
+        tuple : starting row, ending row, starting column, ending column.
 
-                        # States are fine ...
-                        if i_var in sub.states:
-                            pass
+        ndarray or None : The src_indices of the param, if any.
+        """
+        u_vec = self.unknowns
+        icache = self._icache
+        conn = self.connections
+        sys_prom_name = self._sysdata.to_prom_name
 
-                        #... but inputs need to find their source.
-                        elif i_var_pro not in u_vec:
+        for sub in self.components(recurse=True):
 
-                            # Param is not relevant
-                            if i_var_abs not in conn:
-                                continue
+            jac = sub._jacobian_cache
 
-                            i_var_src = conn[i_var_abs][0]
-                            i_var_pro = sys_prom_name[i_var_src]
+            # This method won't work on components where apply_linear
+            # is overridden.
+            if jac is None:
+                msg = "The 'assemble' jacobian_method is not supported when " + \
+                     "'apply_linear' is used on a component (%s)." % sub.pathname
+                raise RuntimeError(msg)
 
-                        o_start, o_end = u_vec._dat[o_var_pro].slice
-                        i_start, i_end = u_vec._dat[i_var_pro].slice
+            sub_name = sub.pathname
 
-                        icache[key2] = (o_start, o_end, i_start, i_end)
+            for key in jac:
+                o_var, i_var = key
+                key2 = (sub_name, key)
 
-                    else:
-                        (o_start, o_end, i_start, i_end) = icache[key2]
+                # We cache the location of each variable in our jacobian
+                if key2 not in icache:
 
-                    if mode=='fwd':
-                        partials[o_start:o_end, i_start:i_end] = jac[o_var, i_var]
-                    else:
-                        partials[i_start:i_end, o_start:o_end] = jac[o_var, i_var].T
+                    o_var_abs = '.'.join((sub_name, o_var))
+                    i_var_abs = '.'.join((sub_name, i_var))
+                    i_var_pro = sys_prom_name[i_var_abs]
+                    o_var_pro = sys_prom_name[o_var_abs]
+                    src_idxs = None
 
-        return partials, icache
+                    # States are fine ...
+                    if i_var in sub.states:
+                        pass
+
+                    #... but inputs need to find their source.
+                    elif i_var_pro not in u_vec:
+
+                        # Param is not relevant
+                        if i_var_abs not in conn:
+                            continue
+
+                        i_var_src, src_idxs = conn[i_var_abs]
+                        i_var_pro = sys_prom_name[i_var_src]
+
+                    o_start, o_end = u_vec._dat[o_var_pro].slice
+                    i_start, i_end = u_vec._dat[i_var_pro].slice
+
+                    icache[key2] = (o_start, o_end, i_start, i_end)
+                    if src_idxs is not None:
+                        self._icache_src_idxs[key2] = np.asarray(src_idxs)
+
+                yield sub, key, jac[key], icache[key2], self._icache_src_idxs.get(key2)
 
     def set_order(self, new_order):
         """ Specifies a new execution order for this system. This should only
@@ -1526,6 +1586,7 @@ class Group(System):
         rev = 1
         modename = ['fwd', 'rev']
         xfer_dict = OrderedDict()
+        units_on_transfer = self._probdata.units_on_transfer
 
         for param in self.connections:
             if param not in my_params:
@@ -1549,8 +1610,8 @@ class Group(System):
             tgt_sys = nearest_child(self.pathname, param)
             src_sys = nearest_child(self.pathname, unknown)
             for sname, mode in ((tgt_sys, fwd), (src_sys, rev)):
-                src_idx_list, dest_idx_list, vec_conns, byobj_conns = \
-                    xfer_dict.setdefault((sname, mode), ([], [], [], []))
+                src_idx_list, dest_idx_list, vec_conns, byobj_conns, convs = \
+                    xfer_dict.setdefault((sname, mode), ([], [], [], [], []))
 
                 if 'pass_by_obj' in umeta and umeta['pass_by_obj']:
                     # rev is for derivs only, so no by_obj passing needed
@@ -1565,6 +1626,10 @@ class Group(System):
                     src_idx_list.append(sidxs)
                     dest_idx_list.append(didxs)
 
+                    if units_on_transfer and \
+                            'unit_conv' in self._params_dict[param]:
+                        convs.append(prelname)
+
         if alloc_derivs:
             uvec = self.dumat[var_of_interest]
             pvec = self.dpmat[var_of_interest]
@@ -1582,27 +1647,56 @@ class Group(System):
             full_tgts = []
             full_flats = []
             full_byobjs = []
-            for tup, (srcs, tgts, flats, byobjs) in iteritems(xfer_dict):
+            full_convs = []
+            for tup, (srcs, tgts, flats, byobjs, convs) in iteritems(xfer_dict):
                 tgt_sys, direction = tup
                 if mode == direction:
                     full_srcs.extend(srcs)
                     full_tgts.extend(tgts)
                     full_flats.extend(flats)
                     full_byobjs.extend(byobjs)
+                    full_convs.extend(convs)
 
                     if flats or byobjs:
                         # create a 'partial' scatter to each subsystem
                         self._data_xfer[(tgt_sys, modename[mode], var_of_interest)] = \
                             self._impl.create_data_xfer(uvec, pvec,
                                                         srcs, tgts, flats, byobjs,
-                                                        modename[mode], self._sysdata)
+                                                        modename[mode], self._sysdata,
+                                                        unit_conv=self._unit_conv_idxs(pvec, convs))
 
             # add a full scatter for the current direction
             self._data_xfer[('', modename[mode], var_of_interest)] = \
                 self._impl.create_data_xfer(uvec, pvec,
                                             full_srcs, full_tgts,
                                             full_flats, full_byobjs,
-                                            modename[mode], self._sysdata)
+                                            modename[mode], self._sysdata,
+                                            unit_conv=self._unit_conv_idxs(pvec, full_convs))
+
+    def _unit_conv_idxs(self, pvec, convs):
+        """
+        Returns the local indices into pvec of the named params, along with
+        the unit conversion scale and offset of each index, or None if none
+        of the params are local.
+        """
+        idxs = []
+        scales = []
+        offsets = []
+        for name in convs:
+            acc = pvec._dat[name]
+            if acc.slice is None:
+                continue
+            start, end = acc.slice
+            scale, offset = acc.meta['unit_conv']
+            idxs.append(np.arange(start, end))
+            scales.append(np.full(end - start, scale))
+            offsets.append(np.full(end - start, offset))
+
+        if not idxs:
+            return None
+
+        return (np.concatenate(idxs), np.concatenate(scales),
+                np.concatenate(offsets))
 
     def _transfer_data(self, target_sys='', mode='fwd', deriv=False,
                        var_of_interest=None):
@@ -1773,3 +1867,133 @@ class Group(System):
                     _dump(s, stream)
         else:
             _dump(self, stream)
+
+
+class _SparseJacobianPlan(object):
+    """ Scatter plan that maps the entries of every component sub-Jacobian in a
+    `Group` to the data array of a CSC matrix with a fixed sparsity structure.
+
+    Args
+    ----
+    group : `Group`
+        The `Group` whose Jacobian is being assembled.
+
+    mode : string
+        Derivative mode, can be 'fwd' or 'rev'.
+    """
+
+    def __init__(self, group, mode):
+        n_edge = group.unknowns.vec.size
+
+        self.blocks = []
+        self.subs = []
+        rows, cols = [], []
+        n_vals = 0
+
+        # Diagonal entries that are not overwritten by a state's own
+        # derivative block keep their -1.
+        diag = np.ones(n_edge, dtype=bool)
+
+        last = None
+        for sub, key, J, loc, src_idxs in group._iter_jac_blocks():
+            o_start, o_end, i_start, i_end = loc
+
+            if sub is not last:
+                self.subs.append((sub, len(sub._jacobian_cache)))
+                last = sub
+
+            o_idx = np.arange(o_start, o_end)
+            if src_idxs is None:
+                i_idx = np.arange(i_start, i_end)
+                if i_start == o_start:
+                    diag[o_start:o_end] = False
+            else:
+                i_idx = i_start + src_idxs
+
+            shape = (len(o_idx), len(i_idx))
+
+            # Sparse sub-Jacobians only contribute their stored entries.
+            if issparse(J):
+                if J.format not in ('csr', 'csc'):
+                    J = J.tocsr()
+                struct = (J.format, J.indices, J.indptr)
+
+                major = np.repeat(np.arange(len(J.indptr) - 1), np.diff(J.indptr))
+                if J.format == 'csr':
+                    rows.append(o_idx[major])
+                    cols.append(i_idx[J.indices])
+                else:
+                    rows.append(o_idx[J.indices])
+                    cols.append(i_idx[major])
+                size = J.nnz
+            else:
+                struct = None
+                rows.append(np.repeat(o_idx, shape[1]))
+                cols.append(np.tile(i_idx, shape[0]))
+                size = shape[0] * shape[1]
+
+            self.blocks.append((sub, key, n_vals, n_vals + size, shape, struct))
+            n_vals += size
+
+        ident = np.flatnonzero(diag)
+        rows.append(ident)
+        cols.append(ident)
+
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        if mode == 'rev':
+            rows, cols = cols, rows
+
+        # Sorting by column, then row gives CSC order. Duplicate entries
+        # (e.g., two params connected to the same source) share a slot.
+        uniq, self.inv = np.unique(cols * n_edge + rows, return_inverse=True)
+        self.nnz = len(uniq)
+        self.indices = uniq % n_edge
+        self.indptr = np.zeros(n_edge + 1, dtype=int)
+        np.cumsum(np.bincount(uniq // n_edge, minlength=n_edge),
+                  out=self.indptr[1:])
+
+        # Preallocated values. The identity entries never change.
+        self.vals = np.empty(n_vals + len(ident))
+        self.vals[n_vals:] = -1.0
+
+    def fill(self):
+        """ Gather the current component sub-Jacobians into the CSC data array.
+
+        Returns
+        -------
+        ndarray or None : The CSC data array, or None if the components'
+        Jacobians no longer match this plan and it needs to be rebuilt.
+        """
+        for sub, nkeys in self.subs:
+            jac = sub._jacobian_cache
+            if jac is None or len(jac) != nkeys:
+                return None
+
+        vals = self.vals
+        try:
+            for sub, key, start, end, shape, struct in self.blocks:
+                J = sub._jacobian_cache[key]
+
+                if struct is not None:
+                    fmt, indices, indptr = struct
+                    if not issparse(J):
+                        return None
+                    if J.format != fmt:
+                        J = J.asformat(fmt)
+                    if not (np.array_equal(J.indptr, indptr) and
+                            np.array_equal(J.indices, indices)):
+                        return None
+                    vals[start:end] = J.data
+
+                elif issparse(J):
+                    return None
+                elif J.shape == shape:
+                    vals[start:end] = J.ravel()
+                else:
+                    vals[start:end] = np.broadcast_to(J, shape).ravel()
+
+        except (KeyError, ValueError):
+            return None
+
+        return np.bincount(self.inv, weights=vals, minlength=self.nnz)
@@ -13,6 +13,7 @@ from petsc4py import PETSc
 
 from openmdao.core.vec_wrapper import SrcVecWrapper, TgtVecWrapper
 from openmdao.core.fileref import FileRef
+from openmdao.core.data_transfer import convert_units_fwd, convert_units_rev
 
 trace = os.environ.get('OPENMDAO_TRACE')
 if trace:  # pragma: no cover
@@ -80,7 +81,7 @@ class PetscImpl(object):
     @staticmethod
     def create_data_xfer(src_vec, tgt_vec,
                          src_idxs, tgt_idxs, vec_conns, byobj_conns, mode,
-                         sysdata):
+                         sysdata, unit_conv=None):
         """
         Create an object for performing data transfer between source
         and target vectors.
@@ -116,13 +117,18 @@ class PetscImpl(object):
             The `SysData` object for the Group that will contain the new
             `DataTransfer` object.
 
+        unit_conv : tuple of arrays, optional
+            Local indices into tgt_vec of the params that need a unit
+            conversion, with the scale and offset of each one.
+
         Returns
         -------
         `PetscDataTransfer`
             A `PetscDataTransfer` object.
         """
         return PetscDataTransfer(src_vec, tgt_vec, src_idxs, tgt_idxs,
-                                 vec_conns, byobj_conns, mode, sysdata)
+                                 vec_conns, byobj_conns, mode, sysdata,
+                                 unit_conv=unit_conv)
 
 
 class PetscSrcVecWrapper(SrcVecWrapper):
@@ -346,11 +352,18 @@ class PetscDataTransfer(object):
         The `SysData` object for the Group that will contain this
         `DataTransfer` object.
 
+    unit_conv : tuple of arrays, optional
+        Local indices into the target vector of the params that need a unit
+        conversion, with the scale and offset of each one. If given, the
+        conversions are applied during the transfer.
+
     """
 
     #@diff_mem
     def __init__(self, src_vec, tgt_vec,
-                 src_idxs, tgt_idxs, vec_conns, byobj_conns, mode, sysdata):
+                 src_idxs, tgt_idxs, vec_conns, byobj_conns, mode, sysdata,
+                 unit_conv=None):
+        self.unit_conv = unit_conv
 
         src_idxs = src_vec.merge_idxs(src_idxs)
         tgt_idxs = tgt_vec.merge_idxs(tgt_idxs)
@@ -423,6 +436,8 @@ class PetscDataTransfer(object):
                       (srcvec._sysdata.pathname, conns, self.src_idxs, self.tgt_idxs))
                 debug("%s:    srcvec = %s" % (tgtvec._sysdata.pathname,
                                               tgtvec.petsc_vec.array))
+            if self.unit_conv is not None:
+                convert_units_rev(tgtvec, self.unit_conv)
             self.scatter.scatter(tgtvec.petsc_vec, srcvec.petsc_vec, True, True)
             if trace:  # pragma: no cover
                 debug("%s:    tgtvec = %s (DONE)" % (srcvec._sysdata.pathname,
@@ -439,6 +454,8 @@ class PetscDataTransfer(object):
             if tgtvec._probdata.in_complex_step:
                 self.scatter.scatter(srcvec.imag_petsc_vec, tgtvec.imag_petsc_vec,
                                      False, False)
+            if self.unit_conv is not None:
+                convert_units_fwd(tgtvec, self.unit_conv, deriv)
 
             if trace:  # pragma: no cover
                 debug("%s:    tgtvec = %s (DONE)" % (tgtvec._sysdata.pathname,
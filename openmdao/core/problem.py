@@ -14,6 +14,7 @@ from six.moves import cStringIO
 
 import networkx as nx
 import numpy as np
+from scipy.sparse import issparse
 
 from openmdao.core.system import System
 from openmdao.core.group import Group
@@ -36,6 +37,7 @@ from openmdao.util.string_util import get_common_ancestor, nearest_child, name_r
 from openmdao.util.graph import plain_bfs, OrderedDigraph
 from openmdao.util.options import OptionsDictionary
 from openmdao.util.dict_util import _jac_to_flat_dict
+from openmdao.util.coloring import color_columns
 
 force_check = os.environ.get('OPENMDAO_FORCE_CHECK_SETUP')
 trace = os.environ.get('OPENMDAO_TRACE')
@@ -50,6 +52,7 @@ class _ProbData(object):
         self.in_complex_step = False
         self.precon_level = 0
         self.pathname = ''
+        self.units_on_transfer = False
 
 def _get_root_var(root, name):
     """
@@ -114,12 +117,20 @@ class Problem(object):
         If set to True, all numpy floating point errors raise exceptions and
         the variable locations that go to inf or nan are printed when they can
         be determined.
+
+    units_on_transfer : bool(False)
+        If set to True, unit conversions are applied to all converted params
+        at once when data is transferred, so that params are stored in their
+        own units and reading them doesn't allocate a converted copy. The
+        derivative transfers then apply the unit scale factors as well.
     """
 
-    def __init__(self, root=None, driver=None, impl=None, comm=None, debug=False):
+    def __init__(self, root=None, driver=None, impl=None, comm=None, debug=False,
+                 units_on_transfer=False):
         super(Problem, self).__init__()
         self.root = root
         self._probdata = _ProbData()
+        self._units_on_transfer = units_on_transfer
 
         if MPI:
             from openmdao.core.petsc_impl import PetscImpl
@@ -141,6 +152,14 @@ class Problem(object):
         self.pathname = ''
         self._parent_dir = None
 
+        # Evaluations per linearization before and after coloring, keyed on
+        # the pathname of each component that uses it.
+        self._fd_coloring = OrderedDict()
+
+        # Coloring of the total Jacobian used by calc_gradient to combine
+        # linear solves. See set_simul_coloring.
+        self._simul_coloring = None
+
         # Default numpy error behavior: we want to raise whenever we can, except for
         # underflow.
         if debug == True:
@@ -461,6 +480,7 @@ class Problem(object):
         tree_changed = False
 
         self._probdata = _ProbData()
+        self._probdata.units_on_transfer = self._units_on_transfer
 
         if isinstance(self.root.ln_solver, LinearGaussSeidel):
             self._probdata.top_lin_gs = True
@@ -656,6 +676,17 @@ class Problem(object):
 
         self._check_solvers()
 
+        # Any total Jacobian coloring was computed for the old model.
+        self._simul_coloring = None
+
+        # Detect partials sparsity for components that want to finite
+        # difference (or complex step) with column coloring.
+        self._fd_coloring = OrderedDict()
+        for comp in self.root.components(recurse=True, local=True):
+            if comp.deriv_options['coloring'] and \
+               comp.deriv_options['type'] != 'user' and comp.is_active():
+                self._fd_coloring[comp.pathname] = comp._setup_fd_coloring()
+
         # Prep for case recording and record metadata
         self._start_recorders()
 
@@ -974,6 +1005,18 @@ class Problem(object):
                   "uninitialized unknown values: %s" % ubcs, file=out_stream)
         return ubcs
 
+    def _check_fd_coloring(self, out_stream=sys.stdout):
+        """ Report the reduction in the number of model evaluations per
+        linearization for components that use finite difference coloring."""
+
+        if self._fd_coloring:
+            print("\nFinite difference coloring (evaluations per linearization):",
+                  file=out_stream)
+            for cname, (n_before, n_after) in iteritems(self._fd_coloring):
+                print("%s: %d -> %d" % (cname, n_before, n_after), file=out_stream)
+
+        return self._fd_coloring
+
     def _check_unmarked_pbos(self, out_stream=sys.stdout):
         pbos = []
         for comp in self.root.components(recurse=True, include_self=True):
@@ -1095,6 +1138,7 @@ class Problem(object):
         results['unmarked_pbos'] = self._check_unmarked_pbos(out_stream)
         results['relevant_pbos'] = self._check_relevant_pbos(out_stream)
         results['driver_issues'] = self._check_driver_issues(out_stream)
+        results['fd_coloring'] = self._check_fd_coloring(out_stream)
 
         # TODO: Incomplete optimization driver configuration
         # TODO: Parallelizability for users running serial models
@@ -1611,6 +1655,32 @@ class Problem(object):
             qoi_indices, poi_indices = self._poi_indices, self._qoi_indices
             in_scale, un_scale = cn_scale, dv_scale
 
+        # Combine the linear solves for structurally orthogonal columns (fwd)
+        # or rows (rev) of the total Jacobian if we have a coloring for it.
+        coloring = self._simul_coloring
+        if coloring is not None and coloring['mode'] == mode and nproc == 1 \
+           and _coloring_covers(coloring, indep_list, unknown_list):
+
+            Jsub = self._solve_colored(coloring, indep_list, unknown_list,
+                                       poi_indices, qoi_indices, inactives)
+
+            for (okey, ikey), sub in iteritems(Jsub):
+
+                # Driver scaling
+                if ikey in dv_scale:
+                    sub *= dv_scale[ikey]
+                if okey in cn_scale:
+                    sub *= cn_scale[okey]
+
+                if return_format == 'dict':
+                    if ikey in J[okey]:
+                        J[okey][ikey] = sub
+                else:
+                    J[Jslices[okey], Jslices[ikey]] = sub
+
+            root.clear_dparams()
+            return J
+
         # Process our inputs/outputs of interest for parallel groups
         all_vois = self.root._probdata.relevance.vars_of_interest(mode)
 
@@ -1679,6 +1749,19 @@ class Problem(object):
                                        " in the group %s, %d != %d" % (params, old_size, len(in_idxs)))
                 voi_idxs[vkey] = in_idxs
 
+            # Solvers that take several right-hand sides at once get them in
+            # blocks of columns, one column per index of a single voi.
+            multi_rhs = len(params) == 1 and vkey is None and nproc == 1 and \
+                root.ln_solver.supports['multiple_rhs']
+            if multi_rhs:
+                block_size = root.ln_solver.options['block_size']
+                block = {}
+                if inactives and not fwd and voi in inactives:
+                    active = [i for i in range(len(in_idxs))
+                              if i not in inactives[voi]]
+                else:
+                    active = list(range(len(in_idxs)))
+
             # at this point, we know that for all vars in the current
             # group of interest, the number of indices is the same. We loop
             # over the *size* of the indices and use the loop index to look
@@ -1696,6 +1779,20 @@ class Problem(object):
                         vkey = self._get_voi_key(voi, params)
                         dx_mat[vkey] = np.zeros((len(duvec.vec), ))
 
+                elif multi_rhs:
+                    if i not in block:
+                        start = active.index(i)
+                        cols = active[start:start + block_size]
+                        rhs_block = np.zeros((len(duvec.vec), len(cols)))
+                        rhs_block[voi_idxs[vkey][cols], np.arange(len(cols))] = -1.0
+
+                        sol = root.ln_solver.solve({vkey: rhs_block}, root,
+                                                   mode)[vkey]
+                        block = dict((j, sol[:, k]) for k, j in enumerate(cols))
+
+                    dx_mat = OrderedDict()
+                    dx_mat[vkey] = block[i]
+
                 else:
                     for voi in params:
                         vkey = self._get_voi_key(voi, params)
@@ -1798,6 +1895,259 @@ class Problem(object):
 
         return J
 
+    def set_simul_coloring(self, indep_list, unknown_list, sparsity=None,
+                           mode='auto', repeats=2):
+        """ Colors the total Jacobian of `unknown_list` with respect to
+        `indep_list` so that `calc_gradient` can seed several design variable
+        entries (fwd) or response entries (rev) in a single linear solve when
+        their derivatives never touch the same response (or design variable)
+        entry. This must be called after setup, and again after any later
+        call to setup.
+
+        Args
+        ----
+        indep_list : list of strings
+            Design variable names that the coloring covers.
+
+        unknown_list : list of strings
+            Response names that the coloring covers.
+
+        sparsity : dict, optional
+            Nonzero pattern of the total Jacobian, keyed on response name and
+            then on design variable name. Values are arrays or sparse matrices
+            in which only the location of the nonzero entries matters. Missing
+            pairs are zero. If not given, the pattern is computed by running
+            the model and calculating the total Jacobian at `repeats` randomly
+            perturbed design points.
+
+        mode : string, optional
+            Derivative direction that the coloring is for, can be 'fwd', 'rev'
+            or 'auto'.
+
+        repeats : int, optional
+            Number of perturbed design points used to compute the sparsity.
+
+        Returns
+        -------
+        tuple
+            Number of linear solves per gradient before and after coloring.
+        """
+        if mode not in ['auto', 'fwd', 'rev']:
+            raise ValueError("mode must be 'auto', 'fwd', or 'rev'")
+
+        for name in chain(indep_list, unknown_list):
+            if not isinstance(name, string_types):
+                raise TypeError("Design variables and responses must be given "
+                                "by name to be colored, but got %s." % (name,))
+
+        mode = self._mode(mode, indep_list, unknown_list)
+        fwd = mode == 'fwd'
+
+        sizes = OrderedDict()
+        for names, idx_dict in ((indep_list, self._poi_indices),
+                                (unknown_list, self._qoi_indices)):
+            for name in names:
+                if name in idx_dict:
+                    sizes[name] = len(idx_dict[name])
+                else:
+                    sizes[name] = self.root.unknowns.metadata(name)['size']
+
+        if sparsity is None:
+            sparsity = self._compute_total_sparsity(indep_list, unknown_list,
+                                                    mode, repeats)
+
+        # Flatten the pattern into a single matrix with one row per response
+        # entry and one column per design variable entry.
+        offsets = OrderedDict()
+        for names in (unknown_list, indep_list):
+            start = 0
+            for name in names:
+                offsets[name] = start
+                start += sizes[name]
+        shape = (sum(sizes[name] for name in unknown_list),
+                 sum(sizes[name] for name in indep_list))
+
+        pattern = OrderedDict()
+        all_rows = []
+        all_cols = []
+        for okey in unknown_list:
+            for ikey in indep_list:
+                sub = sparsity.get(okey, {}).get(ikey)
+                if sub is None:
+                    continue
+                if issparse(sub):
+                    sub = sub.toarray()
+                sub = np.asarray(sub)
+                if sub.shape != (sizes[okey], sizes[ikey]):
+                    raise ValueError("The sparsity of '%s' wrt '%s' should "
+                                     "have shape %s, but has shape %s." %
+                                     (okey, ikey, (sizes[okey], sizes[ikey]),
+                                      sub.shape))
+                rows, cols = np.nonzero(sub)
+                pattern[okey, ikey] = (rows, cols)
+                all_rows.append(rows + offsets[okey])
+                all_cols.append(cols + offsets[ikey])
+
+        rows = np.concatenate(all_rows) if all_rows else np.zeros(0, dtype=int)
+        cols = np.concatenate(all_cols) if all_cols else np.zeros(0, dtype=int)
+
+        if fwd:
+            seed_list = indep_list
+            colors = color_columns(rows, cols, shape)
+        else:
+            seed_list = unknown_list
+            colors = color_columns(cols, rows, (shape[1], shape[0]))
+
+        # For each color, the seeded entries of each variable, and for each
+        # Jacobian entry that the solve computes, where it lives in the
+        # solution and in the sub-Jacobian.
+        colored = []
+        for color in colors:
+            seeds = OrderedDict()
+            for name in seed_list:
+                start = offsets[name]
+                idxs = color[(color >= start) & (color < start + sizes[name])]
+                if len(idxs) > 0:
+                    seeds[name] = idxs - start
+
+            unpack = []
+            for (okey, ikey), (rows, cols) in iteritems(pattern):
+                if fwd:
+                    seed, sol = ikey, okey
+                    mask = np.in1d(cols, seeds.get(seed, ()))
+                    sol_idxs = rows[mask]
+                else:
+                    seed, sol = okey, ikey
+                    mask = np.in1d(rows, seeds.get(seed, ()))
+                    sol_idxs = cols[mask]
+                if np.any(mask):
+                    unpack.append((okey, ikey, sol, sol_idxs, rows[mask],
+                                   cols[mask]))
+
+            colored.append((list(iteritems(seeds)), unpack))
+
+        self._simul_coloring = {
+            'mode': mode,
+            'indeps': set(indep_list),
+            'unknowns': set(unknown_list),
+            'sizes': sizes,
+            'sparsity': pattern,
+            'colors': colored,
+        }
+
+        return sum(sizes[name] for name in seed_list), len(colored)
+
+    def _compute_total_sparsity(self, indep_list, unknown_list, mode, repeats):
+        """ Returns the nonzero pattern of the total Jacobian, found by
+        calculating it at randomly perturbed design points. The design
+        variables and the model are restored afterwards."""
+
+        root = self.root
+        saved = OrderedDict((name, np.array(self[name])) for name in indep_list)
+
+        # We need every column, so don't use an older coloring.
+        self._simul_coloring = None
+
+        rand = np.random.RandomState(0)
+        sparsity = OrderedDict((okey, OrderedDict()) for okey in unknown_list)
+
+        try:
+            for i in range(repeats):
+                for name, val in iteritems(saved):
+                    self[name] = val + (np.abs(val) + 1.0)*1e-3* \
+                        rand.uniform(-1.0, 1.0, val.shape)
+
+                with root._dircontext:
+                    root.solve_nonlinear()
+
+                J = self.calc_gradient(indep_list, unknown_list, mode=mode,
+                                       return_format='dict')
+
+                for okey in unknown_list:
+                    sub = sparsity[okey]
+                    for ikey in indep_list:
+                        nonzero = J[okey][ikey] != 0.0
+                        if ikey in sub:
+                            sub[ikey] |= nonzero
+                        else:
+                            sub[ikey] = nonzero
+        finally:
+            for name, val in iteritems(saved):
+                self[name] = val
+
+            with root._dircontext:
+                root.solve_nonlinear()
+                root.apply_nonlinear(root.params, root.unknowns, root.resids)
+
+        return sparsity
+
+    def _solve_colored(self, coloring, indep_list, unknown_list, poi_indices,
+                       qoi_indices, inactives):
+        """ Computes the sub-Jacobians of the total Jacobian with one linear
+        solve per color, returned in a dict keyed on (response, design var).
+        """
+        root = self.root
+        mode = coloring['mode']
+        fwd = mode == 'fwd'
+        sizes = coloring['sizes']
+        duvec = root.dumat[None]
+
+        Jsub = OrderedDict()
+        for okey in unknown_list:
+            for ikey in indep_list:
+                Jsub[okey, ikey] = np.zeros((sizes[okey], sizes[ikey]))
+
+        if fwd:
+            seed_list, sol_list = indep_list, unknown_list
+        else:
+            seed_list, sol_list = unknown_list, indep_list
+
+        seed_idxs = dict((name, duvec._get_local_idxs(name, poi_indices))
+                         for name in seed_list)
+        sol_idxs = dict((name, duvec._get_local_idxs(name, qoi_indices))
+                        for name in sol_list)
+
+        colors = []
+        for seeds, unpack in coloring['colors']:
+            seeds = [(name, idxs) for name, idxs in seeds if name in seed_idxs]
+            if not seeds:
+                continue
+
+            # Nothing to do if every seeded constraint entry is inactive.
+            if inactives and not fwd and \
+               all(name in inactives and np.all(np.in1d(idxs, inactives[name]))
+                   for name, idxs in seeds):
+                continue
+
+            colors.append((seeds, unpack))
+
+        # Solvers that take several right-hand sides at once get a block of
+        # colors per solve.
+        if root.ln_solver.supports['multiple_rhs']:
+            block_size = root.ln_solver.options['block_size']
+        else:
+            block_size = 1
+
+        for start in range(0, len(colors), block_size):
+            block = colors[start:start + block_size]
+
+            rhs = np.zeros((len(duvec.vec), len(block)))
+            for k, (seeds, unpack) in enumerate(block):
+                for name, idxs in seeds:
+                    rhs[seed_idxs[name][idxs], k] = -1.0
+
+            if block_size == 1:
+                rhs = rhs[:, 0]
+            dx = root.ln_solver.solve({None: rhs}, root, mode)[None]
+            dx = dx.reshape((len(duvec.vec), len(block)))
+
+            for k, (seeds, unpack) in enumerate(block):
+                for okey, ikey, sol, idxs, rows, cols in unpack:
+                    if (okey, ikey) in Jsub:
+                        Jsub[okey, ikey][rows, cols] = dx[sol_idxs[sol][idxs], k]
+
+        return Jsub
+
     def _get_voi_key(self, voi, grp):
         """Return the voi name, which allows for parallel derivative calculations
         (currently only works with LinearGaussSeidel), or None for those
@@ -2109,6 +2459,11 @@ class Problem(object):
                 jac_fd2 = fd_func(params, unknowns, resids,
                                   option_overrides=global_options)
 
+                # The component's own settings may give sparse sub-jacobians.
+                for key, J in iteritems(jac_fd2):
+                    if issparse(J):
+                        jac_fd2[key] = J.toarray()
+
             # Assemble and Return all metrics.
             _assemble_deriv_data(chain(dparams, states), resids, data[cname],
                                  jac_fwd, jac_rev, jac_fd, out_stream,
@@ -2720,3 +3075,14 @@ def _get_gmres_name():
         return 'PetscKSP'
     else:
         return 'ScipyGMRES'
+
+def _coloring_covers(coloring, indep_list, unknown_list):
+    """Return True if the given total Jacobian coloring was computed for
+    (a superset of) the requested design variables and responses.
+    """
+    for names, covered in ((indep_list, coloring['indeps']),
+                           (unknown_list, coloring['unknowns'])):
+        for name in names:
+            if not isinstance(name, string_types) or name not in covered:
+                return False
+    return True
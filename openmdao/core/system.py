@@ -6,6 +6,7 @@ import sys
 import os
 import re
 from collections import OrderedDict
+from contextlib import contextmanager
 from fnmatch import fnmatch, translate
 from itertools import chain
 import warnings
@@ -13,9 +14,11 @@ import warnings
 from six import string_types, iteritems, itervalues, iterkeys
 
 import numpy as np
+from scipy.sparse import csc_matrix, issparse
 
 from openmdao.core.mpi_wrap import MPI
-from openmdao.core.vec_wrapper import VecWrapper, _PlaceholderVecWrapper
+from openmdao.core.vec_wrapper import VecWrapper, _PlaceholderVecWrapper, \
+     _block_remap
 from openmdao.units.units import get_conversion_tuple
 from openmdao.util.file_util import DirContext
 from openmdao.util.options import OptionsDictionary, DeprecatedOptionsDictionary
@@ -193,6 +196,12 @@ class System(object):
         # to regenerate a Jacobian.
         self._jacobian_changed = False
 
+        # Declared sparsity of sub-jacobians, keyed on (unknown, param), and
+        # the groups of columns of each param that can be finite differenced
+        # together. Only Components declare these.
+        self._partials_sparsity = {}
+        self._fd_colorings = {}
+
         # Used to prevent us from multiplying outscope terms on the jacobian
         self.rel_inputs = None
 
@@ -581,6 +590,15 @@ class System(object):
         jac = {}
         cache2 = None
 
+        # Declared sparsity lets us skip structurally zero columns, but only
+        # for plain partial derivatives. Derivative checks always do the
+        # full dense FD so that a wrong declaration is caught.
+        if total_derivs or use_check or poi_indices or qoi_indices or \
+           pass_unknowns or self._num_par_fds > 1:
+            sparsity = {}
+        else:
+            sparsity = self._partials_sparsity
+
         # Prepare for calculating partial derivatives or total derivatives
         if total_derivs:
             run_model = self._sys_solve_nonlinear
@@ -608,6 +626,13 @@ class System(object):
 
         to_prom_name = self._sysdata.to_prom_name
 
+        # All of the perturbations are worked out before any of them are
+        # evaluated. fd_plan has an entry for each jacobian column (or group
+        # of colored columns), and fd_steps has the perturbations that those
+        # entries need, in the same order.
+        fd_plan = []
+        fd_steps = []
+
         # Compute gradient for this param or state.
         for p_name in chain(fd_params, states):
 
@@ -664,7 +689,30 @@ class System(object):
                 else:
                     u_size = np.size(unknowns[u_name])
 
-                jac[u_name, p_name] = np.zeros((u_size, p_size))
+                if (u_name, p_name) in sparsity:
+                    jac[u_name, p_name] = _alloc_sparse_jac(sparsity[u_name, p_name])
+                else:
+                    jac[u_name, p_name] = np.zeros((u_size, p_size))
+
+            # Only perturb the columns that have a declared nonzero.
+            if sparsity and p_size > 0:
+                p_idxs = _sparse_fd_columns(sparsity, fd_unknowns, p_name, p_idxs)
+
+                # Perturb structurally orthogonal columns together.
+                if p_name in self._fd_colorings:
+                    for cols, scatter in self._fd_colorings[p_name]:
+                        if cs == 'cs':
+                            step = np.full(len(cols), fdstep)
+                        elif fdtype == 'relative':
+                            step = np.maximum(target_input[cols] * fdstep, fdstep)
+                        else:
+                            step = np.full(len(cols), fdstep)
+
+                        fd_plan.append((p_name, param_src, None, cols, step, fdform,
+                                        cs, scatter))
+                        fd_steps.extend(_fd_perturbations(inputs, param_key, cols,
+                                                          step, fdstep, fdform, cs))
+                    continue
 
             # if a given param isn't present in this process, we need
             # to still run the model once for each entry in that param
@@ -681,7 +729,8 @@ class System(object):
                 # parallel fd proc
                 if fd_count % self._num_par_fds == self._par_fd_id:
                     if p_size == 0:
-                        run_model(params, unknowns, resids)
+                        fd_plan.append(None)
+                        fd_steps.append((None, None, None, None, None))
                         continue
 
                     # Relative or Absolute step size
@@ -693,91 +742,109 @@ class System(object):
                         step = fdstep
 
                     if cs == 'cs':
+                        step = fdstep
 
-                        probdata = unknowns._probdata
-                        probdata.in_complex_step = True
+                    fd_plan.append((p_name, param_src, col, idx, step, fdform,
+                                    cs, None))
+                    fd_steps.extend(_fd_perturbations(inputs, param_key, idx,
+                                                      step, fdstep, fdform, cs))
 
-                        inputs._dat[param_key].imag_val[idx] += fdstep
-                        run_model(params, unknowns, resids)
-                        inputs._dat[param_key].imag_val[idx] -= fdstep
+        results = self._fd_evaluate(fd_steps, run_model, params, unknowns,
+                                    resids, resultvec)
 
-                        # delta resid is delta unknown
-                        resultvec.vec[:] = resultvec.imag_vec*(1.0/fdstep)
-                        # Note: vector division is slower than vector mult.
-                        probdata.in_complex_step = False
+        def next_result():
+            result = next(results)
+            if result is not resultvec.vec:
+                resultvec.vec[:] = result
 
-                    elif fdform == 'forward':
+        for plan in fd_plan:
 
-                        target_input[idx] += step
+            # just keeping in sync with the other processes
+            if plan is None:
+                next(results)
+                continue
 
-                        run_model(params, unknowns, resids)
+            p_name, param_src, col, idx, step, fdform, cs, scatter = plan
 
-                        target_input[idx] -= step
+            if cs == 'cs':
 
-                        # delta resid is delta unknown
-                        resultvec.vec[:] -= cache1
-                        resultvec.vec[:] *= (1.0/step)
-                        # Note: vector division is slower than vector mult.
+                # delta resid is delta unknown
+                next_result()
+                scale = 1.0/step
 
-                    elif fdform == 'backward':
+            elif fdform == 'forward':
 
-                        target_input[idx] -= step
+                next_result()
 
-                        run_model(params, unknowns, resids)
+                # delta resid is delta unknown
+                resultvec.vec[:] -= cache1
+                scale = 1.0/step
 
-                        target_input[idx] += step
+            elif fdform == 'backward':
 
-                        # delta resid is delta unknown
-                        resultvec.vec[:] -= cache1
-                        resultvec.vec[:] *= (-1.0/step)
-                        # Note: vector division is slower than vector mult.
+                next_result()
 
-                    elif fdform == 'central':
+                # delta resid is delta unknown
+                resultvec.vec[:] -= cache1
+                scale = -1.0/step
 
-                        target_input[idx] += step
+            elif fdform == 'central':
 
-                        run_model(params, unknowns, resids)
-                        cache2 = resultvec.vec.copy()
+                next_result()
+                cache2 = resultvec.vec.copy()
+                resultvec.vec[:] = cache1
 
-                        target_input[idx] -= step
-                        resultvec.vec[:] = cache1
+                next_result()
 
-                        target_input[idx] -= step
+                # central difference formula
+                resultvec.vec[:] -= cache2
+                scale = -0.5/step
 
-                        run_model(params, unknowns, resids)
+            if scatter is not None:
+                # Each row of each unknown belongs to exactly one perturbed column.
+                for u_name, (slots, rows, pos) in iteritems(scatter):
+                    J = jac.get((u_name, p_name))
+                    if J is not None:
+                        J.data[slots] = resultvec._dat[u_name].val[rows] * scale[pos]
 
-                        # central difference formula
-                        resultvec.vec[:] -= cache2
-                        resultvec.vec[:] *= (-0.5/step)
-                        # Note: vector division is slower than vector mult.
+                # Restore old residual
+                resultvec.vec[:] = cache1
+                continue
 
-                        target_input[idx] += step
+            resultvec.vec[:] *= scale
+            # Note: vector division is slower than vector mult.
 
-                    for u_name in fd_unknowns:
-                        if qoi_indices and u_name in qoi_indices:
-                            result = resultvec._dat[u_name].val[qoi_indices[u_name]]
-                        else:
-                            result = resultvec._dat[u_name].val
-                        jac[u_name, p_name][:, col] = result
-                        if self._num_par_fds > 1: # pragma: no cover
-                            fd_cols[(u_name, p_name, col)] = \
-                                                   jac[u_name, p_name][:, col]
-
-                    # When an unknown is a parameter, it isn't calculated, so
-                    # we manually fill in identity by placing a 1 wherever it
-                    # is needed.
-                    for u_name in pass_unknowns:
-                        if u_name == param_src:
-                            if qoi_indices and u_name in qoi_indices:
-                                q_idxs = qoi_indices[u_name]
-                                if idx in q_idxs:
-                                    row = qoi_indices[u_name].index(idx)
-                                    jac[u_name, p_name][row][col] = 1.0
-                            else:
-                                jac[u_name, p_name] = np.array([[1.0]])
-
-                    # Restore old residual
-                    resultvec.vec[:] = cache1
+            for u_name in fd_unknowns:
+                if qoi_indices and u_name in qoi_indices:
+                    result = resultvec._dat[u_name].val[qoi_indices[u_name]]
+                else:
+                    result = resultvec._dat[u_name].val
+
+                J = jac[u_name, p_name]
+                if issparse(J):
+                    start, end = J.indptr[idx], J.indptr[idx+1]
+                    J.data[start:end] = result[J.indices[start:end]]
+                else:
+                    J[:, col] = result
+                if self._num_par_fds > 1: # pragma: no cover
+                    fd_cols[(u_name, p_name, col)] = \
+                                           jac[u_name, p_name][:, col]
+
+            # When an unknown is a parameter, it isn't calculated, so
+            # we manually fill in identity by placing a 1 wherever it
+            # is needed.
+            for u_name in pass_unknowns:
+                if u_name == param_src:
+                    if qoi_indices and u_name in qoi_indices:
+                        q_idxs = qoi_indices[u_name]
+                        if idx in q_idxs:
+                            row = qoi_indices[u_name].index(idx)
+                            jac[u_name, p_name][row][col] = 1.0
+                    else:
+                        jac[u_name, p_name] = np.array([[1.0]])
+
+            # Restore old residual
+            resultvec.vec[:] = cache1
 
         if self._num_par_fds > 1:
             if trace:  # pragma: no cover
@@ -796,6 +863,69 @@ class System(object):
 
         return jac
 
+    def _fd_evaluate(self, steps, run_model, params, unknowns, resids, resultvec):
+        """ Evaluates the model for each finite difference perturbation,
+        one at a time, and yields the resulting `resultvec` data. Systems
+        that can evaluate several perturbations at once override this.
+
+        Args
+        ----
+        steps : list of tuple
+            The perturbations, as (inputs, key, idx, delta, type) tuples,
+            where `idx` indexes the value of `key` in the `VecWrapper`
+            `inputs`, and `type` is 'fd', 'cs' or None for a run
+            without a perturbation.
+
+        run_model : function
+            Runs the model, given params, unknowns and resids.
+
+        params : `VecWrapper`
+            `VecWrapper` containing parameters. (p)
+
+        unknowns : `VecWrapper`
+            `VecWrapper` containing outputs and states. (u)
+
+        resids : `VecWrapper`
+            `VecWrapper` containing residuals. (r)
+
+        resultvec : `VecWrapper`
+            Either `unknowns` or `resids`, whichever the derivatives are
+            taken of.
+
+        Returns
+        -------
+        iterator
+            An ndarray for each step, which is the real part of the
+            `resultvec` data for 'fd', and the imaginary part for 'cs'.
+            Each one is only valid until the next one is requested.
+        """
+        for inputs, key, idx, delta, fdtype in steps:
+
+            if fdtype == 'cs':
+
+                probdata = unknowns._probdata
+                probdata.in_complex_step = True
+
+                inputs._dat[key].imag_val[idx] += delta
+                run_model(params, unknowns, resids)
+                inputs._dat[key].imag_val[idx] -= delta
+
+                probdata.in_complex_step = False
+                yield resultvec.imag_vec
+
+            elif fdtype == 'fd':
+
+                target_input = inputs._dat[key].val
+                target_input[idx] += delta
+                run_model(params, unknowns, resids)
+                target_input[idx] -= delta
+
+                yield resultvec.vec
+
+            else:
+                run_model(params, unknowns, resids)
+                yield resultvec.vec
+
     def _sys_apply_linear(self, mode, do_apply, vois=(None,), gs_outputs=None,
                           rel_inputs=None):
         """
@@ -823,6 +953,18 @@ class System(object):
         is_relevant = self._probdata.relevance.is_relevant_system
         fwd = mode == "fwd"
 
+        # Blocks of right-hand sides go through apply_linear one column at a
+        # time unless it can take them all at once.
+        if not (force_fd or self._multiple_rhs('apply_linear')):
+            block_vois = [voi for voi in vois if self._block_size(voi)]
+            for voi in block_vois:
+                for _ in self._block_columns(voi):
+                    self._sys_apply_linear(mode, do_apply, vois=(voi,),
+                                           gs_outputs=gs_outputs,
+                                           rel_inputs=rel_inputs)
+            if block_vois:
+                vois = [voi for voi in vois if voi not in block_vois]
+
         if rel_inputs:
             rel_inputs = [name_relative_to(self.pathname, var) \
                           for var in rel_inputs if var.startswith(self.pathname)]
@@ -893,6 +1035,169 @@ class System(object):
 
         self.rel_inputs = None
 
+    def _sys_solve_linear(self, dumat, drmat, vois, mode=None):
+        """
+        Entry point for linear solvers to call solve_linear. Blocks of
+        right-hand sides are solved one column at a time unless solve_linear
+        can take them all at once.
+
+        Args
+        ----
+        dumat : dict of `VecWrappers`
+            In forward mode, each `VecWrapper` contains the incoming vector
+            for the states. In reverse mode, it contains the outgoing vector
+            for the states. (du)
+
+        drmat : `dict of VecWrappers`
+            `VecWrapper` containing either the outgoing result in forward mode
+            or the incoming vector in reverse mode. (dr)
+
+        vois : list of strings
+            List of all quantities of interest to key into the mats.
+
+        mode : string, optional
+            Derivative mode, can be 'fwd' or 'rev'.
+        """
+        block_vois = [voi for voi in vois if self._block_size(voi)]
+        if not block_vois or self._multiple_rhs('solve_linear'):
+            self.solve_linear(dumat, drmat, vois, mode=mode)
+            return
+
+        for voi in block_vois:
+            for _ in self._block_columns(voi):
+                self.solve_linear(dumat, drmat, (voi,), mode=mode)
+
+        vois = [voi for voi in vois if voi not in block_vois]
+        if vois:
+            self.solve_linear(dumat, drmat, vois, mode=mode)
+
+    def _multiple_rhs(self, method):
+        """
+        Returns True if the given linear method can run on derivative vectors
+        that hold a block of right-hand sides.
+
+        Args
+        ----
+        method : str
+            Either 'apply_linear' or 'solve_linear'.
+        """
+        return True
+
+    def _block_size(self, voi):
+        """
+        Returns the number of right-hand sides held by the derivative vectors
+        of the given voi, or 0 if they hold a single 1D right-hand side.
+
+        Args
+        ----
+        voi : str or None
+            Variable of interest.
+        """
+        vec = self.dumat[voi].vec
+        return vec.shape[1] if vec.ndim == 2 else 0
+
+    def _block_systems(self):
+        """ Returns this system and all local systems below it."""
+        return list(self.subsystems(local=True, recurse=True,
+                                    include_self=True))
+
+    @contextmanager
+    def _block_vecs(self, rhs_mat):
+        """
+        Context manager that gives the derivative vectors of this system and
+        everything below it a second dimension, with one right-hand side per
+        column, for each voi whose right-hand side in `rhs_mat` is 2D.
+
+        Args
+        ----
+        rhs_mat : dict of ndarray
+            Right-hand sides keyed by voi.
+        """
+        vois = [voi for voi, rhs in iteritems(rhs_mat)
+                if rhs.ndim == 2 and not self._block_size(voi)]
+        systems = self._block_systems()
+
+        for voi in vois:
+            # The du and dr vectors below us are views into ours. Each Group
+            # owns a dp vector, and our params that are owned higher up are
+            # views into our parents' dp vectors.
+            arrays = [self.dumat[voi].vec, self.drmat[voi].vec]
+            arrays.extend(s.dpmat[voi].vec for s in systems)
+            arrays.extend(acc.val for acc in itervalues(self.dpmat[voi]._dat)
+                          if not (acc.owned or acc.pbo or acc.remote))
+
+            remap = _block_remap(arrays, rhs_mat[voi].shape[1])
+            for s in systems:
+                for vec in (s.dumat[voi], s.drmat[voi], s.dpmat[voi]):
+                    vec._setup_block(remap)
+
+        try:
+            yield
+        finally:
+            for voi in vois:
+                for s in systems:
+                    for vec in (s.dumat[voi], s.drmat[voi], s.dpmat[voi]):
+                        vec._clear_block()
+
+    @contextmanager
+    def _column_vecs(self, voi):
+        """
+        Context manager that switches this system and everything below it
+        back to their 1D derivative vectors while the vectors hold a block of
+        right-hand sides. Does nothing otherwise.
+
+        Args
+        ----
+        voi : str or None
+            Variable of interest.
+        """
+        if not self._block_size(voi):
+            yield
+            return
+
+        vecs = [vec[voi] for s in self._block_systems()
+                for vec in (s.dumat, s.drmat, s.dpmat)]
+        for vec in vecs:
+            vec._use_block(False)
+        try:
+            yield
+        finally:
+            for vec in vecs:
+                vec._use_block(True)
+
+    def _block_columns(self, voi):
+        """
+        Generator that loads each column of a block of right-hand sides into
+        the 1D derivative vectors of this system and everything below it,
+        and stores the result back into the block after each iteration.
+
+        Args
+        ----
+        voi : str or None
+            Variable of interest.
+
+        Yields
+        ------
+        int
+            Column index.
+        """
+        systems = self._block_systems()
+        pairs = [self.dumat[voi]._block, self.drmat[voi]._block]
+        pairs.extend(s.dpmat[voi]._block for s in systems)
+        pairs.extend((acc._block[0][0], acc._block[1][0])
+                     for acc in itervalues(self.dpmat[voi]._dat)
+                     if not acc.owned and acc._block is not None)
+
+        with self._column_vecs(voi):
+            for col in range(pairs[0][1].shape[1]):
+                for vec, block in pairs:
+                    vec[:] = block[:, col]
+
+                yield col
+
+                for vec, block in pairs:
+                    block[:, col] = vec
+
     def _sys_linearize(self, params, unknowns, resids, total_derivs=None):
         """
         Entry point for all callers to cause linearization
@@ -948,9 +1253,18 @@ class System(object):
 
             if self._jacobian_cache is not None:
                 jc = self._jacobian_cache
+                sparsity = self._partials_sparsity
                 for key, J in iteritems(jc):
                     if isinstance(J, real_types):
                         jc[key] = np.array([[J]])
+                    elif issparse(J):
+                        continue
+                    elif key in sparsity and J.ndim == 1 and \
+                         J.size == sparsity[key]['order'].size:
+                        # Values of the declared nonzeros
+                        jc[key] = _alloc_sparse_jac(sparsity[key],
+                                                    J[sparsity[key]['order']])
+                        continue
                     shape = jc[key].shape
                     if len(shape) < 2:
                         jc[key] = jc[key].reshape((shape[0], 1))
@@ -1014,7 +1328,11 @@ class System(object):
             except ValueError:
                 # Provide a user-readable message that locates the problem
                 # derivative term.
-                req_shape = (len(dresids[unknown].flat), len(arg_vec[param].flat))
+                if isvw:
+                    req_shape = (dresids.metadata(unknown)['size'],
+                                 arg_vec.metadata(param)['size'])
+                else:
+                    req_shape = (len(dresids[unknown].flat), len(arg_vec[param].flat))
                 msg = "In component '{}', the derivative of '{}' wrt '{}' should have shape '{}' "
                 msg += "but has shape '{}' instead."
                 msg = msg.format(self.pathname, unknown, param, req_shape, J.shape)
@@ -1582,3 +1900,53 @@ def _iter_J_nested(J):
     for output, subdict in iteritems(J):
         for param, value in iteritems(subdict):
             yield (output, param), value
+
+
+def _alloc_sparse_jac(sparsity, data=None):
+    """ Returns a CSC sub-jacobian with the declared sparsity structure.
+
+    Args
+    ----
+    sparsity : dict
+        Declared sparsity metadata for the sub-jacobian.
+
+    data : ndarray, optional
+        Nonzero values in CSC order. Defaults to zeros.
+
+    Returns
+    -------
+    scipy.sparse.csc_matrix
+    """
+    if data is None:
+        data = np.zeros(sparsity['indices'].size)
+    return csc_matrix((data, sparsity['indices'], sparsity['indptr']),
+                      shape=sparsity['shape'])
+
+
+def _fd_perturbations(inputs, key, idx, step, fdstep, form, cs):
+    """ Returns the steps that System._fd_evaluate takes to finite
+    difference the column(s) `idx` of `key` in `inputs`."""
+    if cs == 'cs':
+        return [(inputs, key, idx, fdstep, 'cs')]
+    if form == 'forward':
+        return [(inputs, key, idx, step, 'fd')]
+    if form == 'backward':
+        return [(inputs, key, idx, -step, 'fd')]
+    return [(inputs, key, idx, step, 'fd'), (inputs, key, idx, -step, 'fd')]
+
+
+def _sparse_fd_columns(sparsity, fd_unknowns, p_name, p_idxs):
+    """ Returns the indices of `p_name` that need to be perturbed in order
+    to fill in the sub-jacobians of all of `fd_unknowns`. If any of those
+    sub-jacobians has no declared sparsity, all of `p_idxs` are returned.
+    """
+    cols = []
+    for u_name in fd_unknowns:
+        meta = sparsity.get((u_name, p_name))
+        if meta is None:
+            return p_idxs
+        cols.append(np.flatnonzero(np.diff(meta['indptr'])))
+
+    if cols:
+        return np.unique(np.concatenate(cols))
+    return p_idxs
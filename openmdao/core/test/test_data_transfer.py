@@ -0,0 +1,93 @@
+""" Tests for the DataTransfer object."""
+
+import unittest
+
+import numpy as np
+
+from openmdao.core.data_transfer import DataTransfer, _MIN_SLICE_SIZE
+from openmdao.core.problem import _ProbData
+
+
+class _Vec(object):
+    """ Just enough of a VecWrapper to transfer data."""
+
+    def __init__(self, vec):
+        self.vec = vec
+        self.imag_vec = np.zeros(vec.size)
+        self._probdata = _ProbData()
+
+
+class TestDataTransfer(unittest.TestCase):
+
+    def _conns(self):
+        big = _MIN_SLICE_SIZE + 10
+        src_idxs = [np.arange(big),               # stays a slice
+                    np.array([big + 3]),
+                    np.array([big + 1, big + 2]),  # contiguous but small
+                    np.array([big + 8, big + 5]),  # unsorted
+                    np.array([big + 4, big + 4]),  # duplicates
+                    np.arange(big + 10, big + 20, 3)]  # strided
+        tgt_idxs = []
+        start = 0
+        for idxs in src_idxs:
+            tgt_idxs.append(np.arange(start, start + idxs.size))
+            start += idxs.size
+        return src_idxs, tgt_idxs, big + 20, start
+
+    def test_fwd(self):
+        src_idxs, tgt_idxs, nsrc, ntgt = self._conns()
+        xfer = DataTransfer(src_idxs, tgt_idxs, [], [], 'fwd', None)
+
+        self.assertEqual(len(xfer.slices), 1)
+        self.assertEqual(xfer.flat_srcs.size, ntgt - _MIN_SLICE_SIZE - 10)
+
+        src = _Vec(np.random.random(nsrc))
+        tgt = _Vec(np.zeros(ntgt))
+        xfer.transfer(src, tgt, deriv=True)
+
+        expected = np.zeros(ntgt)
+        for sidxs, tidxs in zip(src_idxs, tgt_idxs):
+            expected[tidxs] = src.vec[sidxs]
+
+        np.testing.assert_array_equal(tgt.vec, expected)
+
+        # complex step transfers the imaginary part too
+        src.imag_vec[:] = np.random.random(nsrc)
+        tgt._probdata.in_complex_step = True
+        xfer.transfer(src, tgt, deriv=True)
+        for sidxs, tidxs in zip(src_idxs, tgt_idxs):
+            expected[tidxs] = src.imag_vec[sidxs]
+        np.testing.assert_array_equal(tgt.imag_vec, expected)
+
+    def test_rev(self):
+        src_idxs, tgt_idxs, nsrc, ntgt = self._conns()
+        xfer = DataTransfer(src_idxs, tgt_idxs, [], [], 'rev', None)
+
+        self.assertTrue(xfer.rev_unique is not None)
+
+        src = _Vec(np.ones(nsrc))
+        tgt = _Vec(np.random.random(ntgt))
+        xfer.transfer(src, tgt, mode='rev', deriv=True)
+
+        expected = np.ones(nsrc)
+        for sidxs, tidxs in zip(src_idxs, tgt_idxs):
+            np.add.at(expected, sidxs, tgt.vec[tidxs])
+
+        np.testing.assert_allclose(src.vec, expected, rtol=1e-14)
+
+    def test_rev_unique(self):
+        src_idxs = [np.array([3, 1]), np.array([0])]
+        tgt_idxs = [np.array([0, 1]), np.array([2])]
+        xfer = DataTransfer(src_idxs, tgt_idxs, [], [], 'rev', None)
+
+        self.assertEqual(xfer.rev_unique, None)
+
+        src = _Vec(np.zeros(4))
+        tgt = _Vec(np.array([1.0, 2.0, 3.0]))
+        xfer.transfer(src, tgt, mode='rev', deriv=True)
+
+        np.testing.assert_array_equal(src.vec, [3.0, 2.0, 0.0, 1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+""" Tests for declaring sparse partial derivatives on a Component."""
+
+from __future__ import print_function
+import unittest
+
+import numpy as np
+from scipy.sparse import issparse, eye
+
+from openmdao.api import Component, Group, Problem, IndepVarComp, \
+    DirectSolver, LinearGaussSeidel, ScipyGMRES
+from openmdao.test.util import assert_rel_error
+
+
+class SparseComp(Component):
+    """ y = x**2 + 3*z[::-1] is elementwise in x, antidiagonal in z and
+    doesn't depend on w at all."""
+
+    def __init__(self, n=5, declare=True):
+        super(SparseComp, self).__init__()
+        self.n = n
+        self.exec_count = 0
+
+        self.add_param('x', np.ones(n))
+        self.add_param('z', np.ones(n))
+        self.add_param('w', np.ones(n))
+        self.add_output('y', np.zeros(n))
+
+        if declare:
+            ar = np.arange(n)
+            self.declare_partials('y', 'x', rows=ar, cols=ar)
+            self.declare_partials('y', 'z', rows=ar, cols=ar[::-1])
+            self.declare_partials('y', 'w', rows=[], cols=[])
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        self.exec_count += 1
+        unknowns['y'] = params['x']**2 + 3.0*params['z'][::-1]
+
+    def linearize(self, params, unknowns, resids):
+        J = {}
+        J['y', 'x'] = 2.0*params['x']
+        J['y', 'z'] = 3.0*np.ones(self.n)
+        J['y', 'w'] = np.zeros(0)
+        return J
+
+
+def _build(comp, ln_solver=None):
+    n = comp.n
+    prob = Problem()
+    root = prob.root = Group()
+    root.add('px', IndepVarComp('x', np.arange(1.0, n + 1)), promotes=['x'])
+    root.add('pz', IndepVarComp('z', np.ones(n)), promotes=['z'])
+    root.add('pw', IndepVarComp('w', np.ones(n)), promotes=['w'])
+    root.add('comp', comp, promotes=['x', 'z', 'w', 'y'])
+    if ln_solver is not None:
+        root.ln_solver = ln_solver
+    prob.setup(check=False)
+    prob.run()
+    return prob
+
+
+class TestDeclarePartials(unittest.TestCase):
+
+    def _count_fd(self, prob):
+        comp = prob.root.comp
+        comp.exec_count = 0
+        prob.calc_gradient(['x'], ['y'], mode='fwd')
+        return comp.exec_count
+
+    def _check_derivs(self, prob):
+        n = prob.root.comp.n
+        Jx = np.diag(2.0*np.arange(1.0, n + 1))
+        Jz = 3.0*np.eye(n)[::-1]
+
+        for mode in ('fwd', 'rev'):
+            J = prob.calc_gradient(['x', 'z', 'w'], ['y'], mode=mode,
+                                   return_format='dict')
+            assert_rel_error(self, J['y']['x'], Jx, 1e-6)
+            assert_rel_error(self, J['y']['z'], Jz, 1e-6)
+            assert_rel_error(self, J['y']['w'], np.zeros((n, n)), 1e-6)
+
+    def test_linearize_values(self):
+        prob = _build(SparseComp())
+        self._check_derivs(prob)
+
+        jac = prob.root.comp._jacobian_cache
+        self.assertTrue(issparse(jac['y', 'x']))
+        self.assertEqual(jac['y', 'x'].nnz, 5)
+        self.assertEqual(jac['y', 'w'].nnz, 0)
+
+    def test_direct_solver(self):
+        for method in ('assemble', 'sparse'):
+            ln = DirectSolver()
+            ln.options['jacobian_method'] = method
+            prob = _build(SparseComp(), ln)
+            self._check_derivs(prob)
+
+    def test_gmres(self):
+        prob = _build(SparseComp(), ScipyGMRES())
+        self._check_derivs(prob)
+
+    def test_sparsity_matrix(self):
+        comp = SparseComp(declare=False)
+        comp.declare_partials('y', 'x', sparsity=eye(5))
+        comp.declare_partials('y', 'z', sparsity=np.eye(5)[::-1])
+        comp.declare_partials('y', 'w', sparsity=np.zeros((5, 5)))
+
+        prob = _build(comp)
+        self._check_derivs(prob)
+
+    def test_fd(self):
+        comp = SparseComp()
+        comp.deriv_options['type'] = 'fd'
+        prob = _build(comp)
+        self._check_derivs(prob)
+
+        # w is never perturbed.
+        self.assertEqual(self._count_fd(prob), 10)
+        self.assertTrue(issparse(comp._jacobian_cache['y', 'z']))
+
+        comp = SparseComp(declare=False)
+        comp.deriv_options['type'] = 'fd'
+        prob = _build(comp)
+        self._check_derivs(prob)
+        self.assertEqual(self._count_fd(prob), 15)
+
+    def test_cs(self):
+        comp = SparseComp()
+        comp.deriv_options['type'] = 'cs'
+        prob = _build(comp, LinearGaussSeidel())
+        self._check_derivs(prob)
+        self.assertEqual(self._count_fd(prob), 10)
+
+    def test_check_partials(self):
+        prob = _build(SparseComp())
+        data = prob.check_partial_derivatives(out_stream=None)
+
+        for key, val in data['comp'].items():
+            assert_rel_error(self, val['abs error'][0], 0.0, 1e-5)
+            assert_rel_error(self, val['abs error'][1], 0.0, 1e-5)
+            assert_rel_error(self, val['abs error'][2], 0.0, 1e-5)
+
+    def test_bad_declarations(self):
+        comp = SparseComp(declare=False)
+
+        with self.assertRaises(KeyError) as cm:
+            comp.declare_partials('q', 'x', rows=[0], cols=[0])
+        self.assertEqual(str(cm.exception), '": \'q\' is not an output or state."')
+
+        with self.assertRaises(KeyError) as cm:
+            comp.declare_partials('y', 'y', rows=[0], cols=[0])
+        self.assertEqual(str(cm.exception), '": \'y\' is not a param or state."')
+
+        with self.assertRaises(ValueError) as cm:
+            comp.declare_partials('y', 'x', rows=[0, 5], cols=[0, 0])
+        self.assertEqual(str(cm.exception),
+                         ": rows or cols for the partials of 'y' wrt 'x' are "
+                         "out of range for shape (5, 5).")
+
+        with self.assertRaises(ValueError) as cm:
+            comp.declare_partials('y', 'x', rows=[1, 1], cols=[0, 0])
+        self.assertEqual(str(cm.exception),
+                         ": rows and cols for the partials of 'y' wrt 'x' "
+                         "contain duplicate entries.")
+
+        with self.assertRaises(ValueError) as cm:
+            comp.declare_partials('y', 'x', sparsity=np.eye(4))
+        self.assertEqual(str(cm.exception),
+                         ": the sparsity of 'y' wrt 'x' should have shape "
+                         "(5, 5), but has shape (4, 4).")
+
+        with self.assertRaises(ValueError) as cm:
+            comp.declare_partials('y', 'x', rows=[0])
+        self.assertEqual(str(cm.exception),
+                         ": rows and cols or sparsity must be specified for "
+                         "the partials of 'y' wrt 'x'.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+""" Tests for finite difference and complex step with column coloring."""
+
+from __future__ import print_function
+import unittest
+
+import numpy as np
+from six.moves import cStringIO
+from scipy.sparse import issparse
+
+from openmdao.api import Component, Group, Problem, IndepVarComp
+from openmdao.test.util import assert_rel_error
+
+
+class BandedComp(Component):
+    """ y[i] = x[i-1] + x[i]**2 + x[i+1] + 2*z[n-1-i]"""
+
+    def __init__(self, n=10):
+        super(BandedComp, self).__init__()
+        self.n = n
+        self.exec_count = 0
+
+        self.add_param('x', np.ones(n))
+        self.add_param('z', np.ones(n))
+        self.add_output('y', np.zeros(n))
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        self.exec_count += 1
+        x = params['x']
+        y = x**2 + 2.0*params['z'][::-1]
+        y[1:] += x[:-1]
+        y[:-1] += x[1:]
+        unknowns['y'] = y
+
+    def expected(self, x):
+        n = self.n
+        Jx = np.diag(2.0*x) + np.eye(n, k=1) + np.eye(n, k=-1)
+        Jz = 2.0*np.eye(n)[::-1]
+        return Jx, Jz
+
+
+def _build(comp, **options):
+    n = comp.n
+    prob = Problem()
+    root = prob.root = Group()
+    root.add('px', IndepVarComp('x', np.arange(1.0, n + 1)), promotes=['x'])
+    root.add('pz', IndepVarComp('z', np.ones(n)), promotes=['z'])
+    root.add('comp', comp, promotes=['x', 'z', 'y'])
+
+    comp.deriv_options['coloring'] = True
+    for name, val in options.items():
+        comp.deriv_options[name] = val
+
+    stream = cStringIO()
+    results = prob.setup(out_stream=stream)
+    prob.run()
+    return prob, results, stream.getvalue()
+
+
+class TestFDColoring(unittest.TestCase):
+
+    def _check(self, prob, tol=1e-5):
+        comp = prob.root.comp
+        Jx, Jz = comp.expected(np.arange(1.0, comp.n + 1))
+
+        for mode in ('fwd', 'rev'):
+            J = prob.calc_gradient(['x', 'z'], ['y'], mode=mode,
+                                   return_format='dict')
+            assert_rel_error(self, J['y']['x'], Jx, tol)
+            assert_rel_error(self, J['y']['z'], Jz, tol)
+
+        comp.exec_count = 0
+        prob.calc_gradient(['x'], ['y'], mode='fwd')
+        return comp.exec_count
+
+    def test_fd_forward(self):
+        prob, results, out = _build(BandedComp(), type='fd')
+
+        self.assertEqual(results['fd_coloring']['comp'], (20, 4))
+        self.assertTrue("comp: 20 -> 4" in out)
+
+        # 3 colors for the banded x, 1 for the antidiagonal z
+        self.assertEqual(self._check(prob), 4)
+        self.assertTrue(issparse(prob.root.comp._jacobian_cache['y', 'x']))
+
+    def test_fd_central_relative(self):
+        prob, results, out = _build(BandedComp(), type='fd', form='central',
+                                    step_calc='relative')
+        self.assertEqual(self._check(prob), 8)
+
+    def test_fd_backward(self):
+        prob, results, out = _build(BandedComp(), type='fd', form='backward')
+        self.assertEqual(self._check(prob), 4)
+
+    def test_cs(self):
+        prob, results, out = _build(BandedComp(), type='cs')
+        self.assertEqual(self._check(prob, 1e-10), 4)
+
+    def test_declared_partials_kept(self):
+        comp = BandedComp()
+        ar = np.arange(comp.n)
+        comp.declare_partials('y', 'z', rows=ar, cols=ar[::-1])
+        prob, results, out = _build(comp, type='fd')
+
+        self.assertEqual(results['fd_coloring']['comp'], (20, 4))
+        self.assertEqual(self._check(prob), 4)
+
+    def test_user_derivs_not_colored(self):
+        prob = Problem()
+        prob.root = Group()
+        comp = prob.root.add('comp', BandedComp())
+        comp.deriv_options['coloring'] = True
+
+        results = prob.setup(out_stream=cStringIO())
+        self.assertEqual(results['fd_coloring'], {})
+        self.assertEqual(comp._fd_colorings, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
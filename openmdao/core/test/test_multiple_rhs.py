@@ -0,0 +1,161 @@
+""" Tests for linear solves that carry several right-hand sides at once."""
+
+from __future__ import print_function
+import unittest
+
+import numpy as np
+
+from openmdao.api import Component, Group, Problem, IndepVarComp, ExecComp, \
+    DirectSolver, LinearGaussSeidel, ScipyGMRES
+from openmdao.components.linear_system import LinearSystem
+from openmdao.test.util import assert_rel_error
+
+
+class MatVecComp(Component):
+    """ y = A.dot(x), with apply_linear written so that it works on a single
+    vector or on a block of them. Records the dimension of the derivative
+    vectors it was handed."""
+
+    def __init__(self, A, units=None):
+        super(MatVecComp, self).__init__()
+        self.A = A
+        self.add_param('x', np.zeros(A.shape[1]), units=units)
+        self.add_output('y', np.zeros(A.shape[0]), units=units)
+        self.ndims = set()
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        unknowns['y'] = self.A.dot(params['x'])
+
+    def apply_linear(self, params, unknowns, dparams, dunknowns, dresids, mode):
+        self.ndims.add(dresids['y'].ndim)
+        if mode == 'fwd':
+            if 'x' in dparams:
+                dresids['y'] += self.A.dot(dparams['x'])
+        else:
+            if 'x' in dparams:
+                dparams['x'] += self.A.T.dot(dresids['y'])
+
+
+class NoBlockGMRES(ScipyGMRES):
+    """ GMRES that claims it can only handle one right-hand side."""
+
+    def __init__(self):
+        super(NoBlockGMRES, self).__init__()
+        self.supports['multiple_rhs'] = False
+
+
+def _build(n=4, ln_solver=None, sub_solver=None, block_comp=False,
+           units_on_transfer=False):
+    """ A feed-forward chain with unit conversions, a subgroup, and an
+    implicit component with its own solve_linear."""
+
+    A = np.arange(1.0, n*n + 1).reshape((n, n)) / n**2 + np.eye(n)
+
+    prob = Problem()
+    root = prob.root = Group()
+    root.add('p', IndepVarComp('x', np.linspace(1.0, 2.0, n), units='m'))
+
+    sub = root.add('sub', Group())
+    sub.add('c1', MatVecComp(A, units='cm'))
+    sub.add('c2', ExecComp('y = 2.0*x**2', x=np.zeros(n), y=np.zeros(n)))
+    sub.connect('c1.y', 'c2.x')
+    if sub_solver is not None:
+        sub.ln_solver = sub_solver
+
+    root.add('c3', MatVecComp(A.T, units='mm'))
+    root.add('lin', LinearSystem(n))
+    root.connect('p.x', 'sub.c1.x')
+    root.connect('sub.c2.y', 'c3.x')
+    root.connect('c3.y', 'lin.b')
+
+    if ln_solver is not None:
+        root.ln_solver = ln_solver
+    if block_comp:
+        sub.c1.deriv_options['multiple_rhs'] = True
+        root.c3.deriv_options['multiple_rhs'] = True
+
+    prob.root.units_on_transfer = units_on_transfer
+    prob.setup(check=False)
+    prob['lin.A'] = 2.0*np.eye(n) + 0.1
+    prob.run()
+    return prob
+
+
+class TestMultipleRHS(unittest.TestCase):
+
+    def _compare(self, solver_class, mode, **kwargs):
+        """ Solve a block of right-hand sides and compare with solving the
+        columns one at a time."""
+
+        prob = _build(ln_solver=solver_class(), **kwargs)
+        root = prob.root
+        n = len(root.dumat[None].vec)
+
+        # calc_gradient linearizes the model before we solve directly.
+        blocked = prob.calc_gradient(['p.x'], ['lin.x'], mode=mode)
+
+        rhs = np.random.RandomState(11).rand(n, 3)
+        sol = root.ln_solver.solve({None: rhs}, root, mode)[None]
+        self.assertEqual(sol.shape, (n, 3))
+        for k in range(3):
+            col = root.ln_solver.solve({None: rhs[:, k].copy()}, root, mode)[None]
+            assert_rel_error(self, sol[:, k], col, 1e-6)
+
+        root.ln_solver.options['block_size'] = 1
+        single = prob.calc_gradient(['p.x'], ['lin.x'], mode=mode)
+        assert_rel_error(self, blocked, single, 1e-6)
+
+        return prob
+
+    def test_gmres(self):
+        for mode in ('fwd', 'rev'):
+            self._compare(ScipyGMRES, mode)
+
+    def test_gauss_seidel(self):
+        for mode in ('fwd', 'rev'):
+            self._compare(LinearGaussSeidel, mode)
+
+    def test_units_on_transfer(self):
+        for solver_class in (ScipyGMRES, LinearGaussSeidel):
+            for mode in ('fwd', 'rev'):
+                self._compare(solver_class, mode, units_on_transfer=True)
+
+    def test_matches_direct(self):
+        expected = _build(ln_solver=DirectSolver()).calc_gradient(['p.x'],
+                                                                  ['lin.x'],
+                                                                  mode='fwd')
+        for solver_class in (ScipyGMRES, LinearGaussSeidel):
+            for mode in ('fwd', 'rev'):
+                prob = _build(ln_solver=solver_class())
+                J = prob.calc_gradient(['p.x'], ['lin.x'], mode=mode)
+                assert_rel_error(self, J, expected, 1e-6)
+
+    def test_component_opt_in(self):
+        # Components that don't declare multiple_rhs see one column at a time.
+        prob = self._compare(ScipyGMRES, 'fwd')
+        self.assertEqual(prob.root.sub.c1.ndims, set([1]))
+
+        prob = self._compare(ScipyGMRES, 'fwd', block_comp=True)
+        self.assertIn(2, prob.root.sub.c1.ndims)
+        self.assertIn(2, prob.root.c3.ndims)
+
+    def test_nested_solvers(self):
+        for sub_solver in (DirectSolver, ScipyGMRES, NoBlockGMRES):
+            for mode in ('fwd', 'rev'):
+                self._compare(LinearGaussSeidel, mode, block_comp=True,
+                              sub_solver=sub_solver())
+
+    def test_preconditioner(self):
+        for mode in ('fwd', 'rev'):
+            solver = ScipyGMRES()
+            solver.preconditioner = LinearGaussSeidel()
+            prob = _build(ln_solver=solver, block_comp=True)
+            expected = _build(ln_solver=DirectSolver()).calc_gradient(['p.x'],
+                                                                      ['lin.x'],
+                                                                      mode=mode)
+            J = prob.calc_gradient(['p.x'], ['lin.x'], mode=mode)
+            assert_rel_error(self, J, expected, 1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
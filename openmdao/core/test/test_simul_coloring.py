@@ -0,0 +1,200 @@
+""" Tests for combining linear solves in calc_gradient with a coloring of the
+total Jacobian."""
+
+from __future__ import print_function
+import unittest
+
+import numpy as np
+
+from openmdao.api import Component, Group, Problem, IndepVarComp, ExecComp, \
+    DirectSolver, LinearGaussSeidel, ScipyGMRES
+from openmdao.test.util import assert_rel_error
+
+
+class ElementwiseComp(Component):
+    """ y = x**2 + 2*x elementwise."""
+
+    def __init__(self, n):
+        super(ElementwiseComp, self).__init__()
+        self.add_param('x', np.zeros(n))
+        self.add_output('y', np.zeros(n))
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        unknowns['y'] = params['x']**2 + 2.0*params['x']
+
+    def linearize(self, params, unknowns, resids):
+        return {('y', 'x'): np.diag(2.0*params['x'] + 2.0)}
+
+
+def _build(n=6, ln_solver=None):
+    """ Two independent multipoint chains, and an objective that depends on
+    every entry of the first one."""
+
+    prob = Problem()
+    root = prob.root = Group()
+    root.add('px', IndepVarComp('x', np.arange(1.0, n + 1)), promotes=['x'])
+    root.add('pw', IndepVarComp('w', np.linspace(-1.0, 1.0, n)), promotes=['w'])
+    root.add('cx', ElementwiseComp(n), promotes=['x', 'y'])
+    root.add('cw', ElementwiseComp(n))
+    root.add('rev', ExecComp('c = 3.0*y[::-1]', c=np.zeros(n), y=np.zeros(n)),
+             promotes=['y', 'c'])
+    root.add('obj', ExecComp('f = sum(y)', y=np.zeros(n)), promotes=['y', 'f'])
+    root.connect('w', 'cw.x')
+
+    if ln_solver is not None:
+        root.ln_solver = ln_solver
+    else:
+        # one solve per color, so that we can count them
+        root.ln_solver.options['block_size'] = 1
+
+    prob.setup(check=False)
+    prob.run()
+    return prob
+
+
+def _count_solves(prob):
+    """ Wraps the root linear solver so that we can count solves."""
+    ln_solver = prob.root.ln_solver
+    ln_solver.count = 0
+    if 'solve' in ln_solver.__dict__:
+        return ln_solver
+
+    solve = ln_solver.solve
+
+    def counted(rhs_mat, system, mode):
+        ln_solver.count += 1
+        return solve(rhs_mat, system, mode)
+
+    ln_solver.solve = counted
+    return ln_solver
+
+
+class TestSimulColoring(unittest.TestCase):
+
+    def _check(self, prob, indeps, unknowns, mode, expected_colors,
+               expected_solves=None):
+        J_ref = prob.calc_gradient(indeps, unknowns, mode=mode)
+        J_ref_dict = prob.calc_gradient(indeps, unknowns, mode=mode,
+                                        return_format='dict')
+
+        counts = prob.set_simul_coloring(indeps, unknowns, mode=mode)
+        self.assertEqual(counts[1], expected_colors)
+        if expected_solves is None:
+            expected_solves = expected_colors
+
+        ln_solver = _count_solves(prob)
+        J = prob.calc_gradient(indeps, unknowns, mode=mode)
+        self.assertEqual(ln_solver.count, expected_solves)
+        assert_rel_error(self, J, J_ref, 1e-8)
+
+        J = prob.calc_gradient(indeps, unknowns, mode=mode,
+                               return_format='dict')
+        for okey in unknowns:
+            for ikey in indeps:
+                assert_rel_error(self, J[okey][ikey], J_ref_dict[okey][ikey],
+                                 1e-8)
+
+        return counts
+
+    def test_fwd(self):
+        prob = _build()
+        counts = self._check(prob, ['x', 'w'], ['c', 'cw.y'], 'fwd', 1)
+        self.assertEqual(counts, (12, 1))
+
+        # The objective couples every entry of x.
+        counts = self._check(prob, ['x', 'w'], ['c', 'cw.y', 'f'], 'fwd', 6)
+        self.assertEqual(counts, (12, 6))
+
+    def test_rev(self):
+        prob = _build()
+        counts = self._check(prob, ['x', 'w'], ['c', 'cw.y', 'f'], 'rev', 2)
+        self.assertEqual(counts, (13, 2))
+
+    def test_solvers(self):
+        # They all take both colors in one solve.
+        for ln_solver in (DirectSolver(), ScipyGMRES(), LinearGaussSeidel()):
+            prob = _build(ln_solver=ln_solver)
+            self._check(prob, ['x', 'w'], ['c', 'cw.y', 'f'], 'rev', 2, 1)
+
+    def test_subset(self):
+        prob = _build()
+        J_ref = prob.calc_gradient(['x'], ['c'], mode='fwd')
+
+        prob.set_simul_coloring(['x', 'w'], ['c', 'cw.y'], mode='fwd')
+        ln_solver = _count_solves(prob)
+        J = prob.calc_gradient(['x'], ['c'], mode='fwd')
+        self.assertEqual(ln_solver.count, 1)
+        assert_rel_error(self, J, J_ref, 1e-8)
+
+        # Not covered by the coloring, so we solve for each column.
+        ln_solver.count = 0
+        prob.calc_gradient(['x'], ['f'], mode='fwd')
+        self.assertEqual(ln_solver.count, 6)
+
+        # Nor is the other direction.
+        ln_solver.count = 0
+        prob.calc_gradient(['x'], ['c'], mode='rev')
+        self.assertEqual(ln_solver.count, 6)
+
+    def test_given_sparsity(self):
+        n = 6
+        prob = _build(n)
+        J_ref = prob.calc_gradient(['x', 'w'], ['c', 'cw.y'], mode='fwd')
+
+        sparsity = {
+            'c': {'x': np.eye(n)[::-1]},
+            'cw.y': {'w': np.eye(n)},
+        }
+        counts = prob.set_simul_coloring(['x', 'w'], ['c', 'cw.y'],
+                                         sparsity=sparsity, mode='fwd')
+        self.assertEqual(counts, (12, 1))
+
+        J = prob.calc_gradient(['x', 'w'], ['c', 'cw.y'], mode='fwd')
+        assert_rel_error(self, J, J_ref, 1e-8)
+
+        with self.assertRaises(ValueError) as cm:
+            prob.set_simul_coloring(['x'], ['c'], sparsity={'c': {'x': np.eye(2)}})
+        self.assertEqual(str(cm.exception),
+                         "The sparsity of 'c' wrt 'x' should have shape "
+                         "(6, 6), but has shape (2, 2).")
+
+    def test_scaling_and_inactives(self):
+        prob = _build()
+        dv_scale = {'x': 2.0}
+        cn_scale = {'c': 5.0}
+        J_ref = prob.calc_gradient(['x', 'w'], ['c', 'cw.y', 'f'], mode='rev',
+                                   dv_scale=dv_scale, cn_scale=cn_scale)
+
+        prob.set_simul_coloring(['x', 'w'], ['c', 'cw.y', 'f'], mode='rev')
+        J = prob.calc_gradient(['x', 'w'], ['c', 'cw.y', 'f'], mode='rev',
+                               dv_scale=dv_scale, cn_scale=cn_scale)
+        assert_rel_error(self, J, J_ref, 1e-8)
+
+        # The color that only seeds c is skipped.
+        ln_solver = _count_solves(prob)
+        J = prob.calc_gradient(['x', 'w'], ['c', 'cw.y', 'f'], mode='rev',
+                               inactives={'c': list(range(6))},
+                               return_format='dict')
+        self.assertEqual(ln_solver.count, 1)
+        assert_rel_error(self, J['c']['x'], np.zeros((6, 6)), 1e-15)
+        assert_rel_error(self, J['f']['x'], 2.0*np.arange(2.0, 8.0)[None, :],
+                         1e-8)
+
+    def test_setup_clears_coloring(self):
+        prob = _build()
+        prob.set_simul_coloring(['x'], ['c'])
+        self.assertIsNotNone(prob._simul_coloring)
+
+        prob.setup(check=False)
+        self.assertIsNone(prob._simul_coloring)
+
+    def test_sparsity_restores_model(self):
+        prob = _build()
+        y = prob['y'].copy()
+        prob.set_simul_coloring(['x', 'w'], ['c', 'cw.y', 'f'])
+        assert_rel_error(self, prob['x'], np.arange(1.0, 7.0), 1e-15)
+        assert_rel_error(self, prob['y'], y, 1e-15)
+
+
+if __name__ == "__main__":
+    unittest.main()
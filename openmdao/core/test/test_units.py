@@ -1127,5 +1127,174 @@ class TestUnitConversionPBO(unittest.TestCase):
         assert_rel_error(self, top['tgt.x3'], 2.0/0.3048, 1e-6)
 
 
+class ArrayTgtComp(Component):
+
+    def __init__(self):
+        super(ArrayTgtComp, self).__init__()
+
+        self.add_param('x', np.zeros(3), units='ft')
+        self.add_output('y', np.zeros(3))
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        unknowns['y'] = 2.0*params['x']
+
+    def linearize(self, params, unknowns, resids):
+        J = {}
+        J[('y', 'x')] = 2.0*np.eye(3)
+        return J
+
+
+class TestUnitsOnTransfer(unittest.TestCase):
+    """ Unit conversions applied by the data transfers."""
+
+    def test_basic(self):
+
+        for deriv_type in ('user', 'fd'):
+            prob = Problem(units_on_transfer=True)
+            prob.root = Group()
+            prob.root.add('src', SrcComp())
+            prob.root.add('tgtF', TgtCompF())
+            prob.root.add('tgtC', TgtCompC())
+            prob.root.add('tgtK', TgtCompK())
+            prob.root.add('px1', IndepVarComp('x1', 100.0), promotes=['x1'])
+            prob.root.connect('x1', 'src.x1')
+            prob.root.connect('src.x2', 'tgtF.x2')
+            prob.root.connect('src.x2', 'tgtC.x2')
+            prob.root.connect('src.x2', 'tgtK.x2')
+
+            for name in ('src', 'tgtF', 'tgtC', 'tgtK'):
+                getattr(prob.root, name).deriv_options['type'] = deriv_type
+
+            prob.setup(check=False)
+            prob.run()
+
+            assert_rel_error(self, prob['src.x2'], 100.0, 1e-6)
+            assert_rel_error(self, prob['tgtF.x3'], 212.0, 1e-6)
+            assert_rel_error(self, prob['tgtC.x3'], 100.0, 1e-6)
+            assert_rel_error(self, prob['tgtK.x3'], 373.15, 1e-6)
+
+            # converted values are stored in the params vector
+            assert_rel_error(self, prob.root.tgtF.params._dat['x2'].val[0],
+                             212.0, 1e-6)
+
+            indep_list = ['x1']
+            unknown_list = ['tgtF.x3', 'tgtC.x3', 'tgtK.x3']
+            for mode in ('fwd', 'rev', 'fd'):
+                J = prob.calc_gradient(indep_list, unknown_list, mode=mode,
+                                       return_format='dict')
+
+                assert_rel_error(self, J['tgtF.x3']['x1'][0][0], 1.8, 1e-6)
+                assert_rel_error(self, J['tgtC.x3']['x1'][0][0], 1.0, 1e-6)
+                assert_rel_error(self, J['tgtK.x3']['x1'][0][0], 1.0, 1e-6)
+
+            prob.run()
+
+            data = prob.check_partial_derivatives(out_stream=None)
+
+            for key1, val1 in iteritems(data):
+                for key2, val2 in iteritems(val1):
+                    assert_rel_error(self, val2['abs error'][0], 0.0, 1e-6)
+                    assert_rel_error(self, val2['abs error'][1], 0.0, 1e-6)
+                    assert_rel_error(self, val2['abs error'][2], 0.0, 1e-6)
+
+    def test_array_view(self):
+
+        prob = Problem(units_on_transfer=True)
+        prob.root = Group()
+        prob.root.add('px', IndepVarComp('x', np.array([1.0, 2.0, 3.0]),
+                                         units='m'))
+        prob.root.add('tgt', ArrayTgtComp())
+        prob.root.connect('px.x', 'tgt.x')
+
+        prob.setup(check=False)
+        prob.run()
+
+        params = prob.root.tgt.params
+        assert_rel_error(self, params['x'], np.array([1.0, 2.0, 3.0])/0.3048,
+                         1e-6)
+        assert_rel_error(self, prob['tgt.y'], np.array([2.0, 4.0, 6.0])/0.3048,
+                         1e-6)
+
+        # params are returned without a copy
+        self.assertTrue(params['x'].base is not None)
+        self.assertTrue(np.may_share_memory(params['x'], prob.root.params.vec))
+
+        for mode in ('fwd', 'rev'):
+            J = prob.calc_gradient(['px.x'], ['tgt.y'], mode=mode)
+            assert_rel_error(self, J, 2.0/0.3048*np.eye(3), 1e-6)
+
+    def test_basic_grouped(self):
+
+        prob = Problem(units_on_transfer=True)
+        prob.root = Group()
+        sub1 = prob.root.add('sub1', Group())
+        sub2 = prob.root.add('sub2', Group())
+        sub1.add('src', SrcComp())
+        sub2.add('tgtF', TgtCompF())
+        sub2.add('tgtC', TgtCompC())
+        sub2.add('tgtK', TgtCompK())
+        prob.root.add('px1', IndepVarComp('x1', 100.0), promotes=['x1'])
+        prob.root.connect('x1', 'sub1.src.x1')
+        prob.root.connect('sub1.src.x2', 'sub2.tgtF.x2')
+        prob.root.connect('sub1.src.x2', 'sub2.tgtC.x2')
+        prob.root.connect('sub1.src.x2', 'sub2.tgtK.x2')
+
+        prob.setup(check=False)
+        prob.run()
+
+        assert_rel_error(self, prob['sub2.tgtF.x3'], 212.0, 1e-6)
+        assert_rel_error(self, prob['sub2.tgtC.x3'], 100.0, 1e-6)
+        assert_rel_error(self, prob['sub2.tgtK.x3'], 373.15, 1e-6)
+
+        indep_list = ['x1']
+        unknown_list = ['sub2.tgtF.x3', 'sub2.tgtC.x3', 'sub2.tgtK.x3']
+        for mode in ('fwd', 'rev', 'fd'):
+            J = prob.calc_gradient(indep_list, unknown_list, mode=mode,
+                                   return_format='dict')
+
+            assert_rel_error(self, J['sub2.tgtF.x3']['x1'][0][0], 1.8, 1e-6)
+            assert_rel_error(self, J['sub2.tgtC.x3']['x1'][0][0], 1.0, 1e-6)
+            assert_rel_error(self, J['sub2.tgtK.x3']['x1'][0][0], 1.0, 1e-6)
+
+    def test_nested_relevancy_gmres(self):
+
+        def build(units_on_transfer):
+            prob = Problem(units_on_transfer=units_on_transfer)
+            root = prob.root = Group()
+            root.add('p1', IndepVarComp('xx', 3.0))
+            root.add('c1', ExecComp(['y1=0.5*x + 1.0*xx', 'y2=0.3*x - 1.0*xx'], units={'y2' : 'km'}))
+            root.add('c2', ExecComp(['y=0.5*x']))
+            sub = root.add('sub', Group())
+            sub.add('cc1', ExecComp(['y=1.01*x1 + 1.01*x2'], units={'x1' : 'fm'}))
+            sub.add('cc2', ExecComp(['y=1.01*x']))
+
+            root.connect('p1.xx', 'c1.xx')
+            root.connect('c1.y1', 'c2.x')
+            root.connect('c2.y', 'c1.x')
+            root.connect('c1.y2', 'sub.cc1.x1')
+            root.connect('sub.cc1.y', 'sub.cc2.x')
+            root.connect('sub.cc2.y', 'sub.cc1.x2')
+
+            root.nl_solver = Newton()
+            root.ln_solver = ScipyGMRES()
+
+            sub.nl_solver = Newton()
+            sub.ln_solver = ScipyGMRES()
+
+            prob.setup(check=False)
+            prob.run()
+            return prob
+
+        expected = build(False)
+        prob = build(True)
+
+        assert_rel_error(self, prob['sub.cc2.y'], expected['sub.cc2.y'], 1e-6)
+
+        for mode in ('fwd', 'rev'):
+            J = prob.calc_gradient(['p1.xx'], ['sub.cc2.y'], mode=mode)
+            Jexp = expected.calc_gradient(['p1.xx'], ['sub.cc2.y'], mode=mode)
+            assert_rel_error(self, J[0][0], Jexp[0][0], 1e-6)
+
+
 if __name__ == "__main__":
     unittest.main()
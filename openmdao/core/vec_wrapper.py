@@ -1,6 +1,8 @@
 """ Class definition for VecWrapper"""
 
 import sys
+from bisect import bisect_right
+
 import numpy
 from numpy import real, imag
 from numpy.linalg import norm
@@ -25,6 +27,45 @@ class _ByObjWrapper(object):
     def __str__(self):
         return str(self.val)
 
+def _address(arr):
+    """ Returns the address of the first element of `arr`."""
+    return arr.__array_interface__['data'][0]
+
+def _block_remap(arrays, nrhs):
+    """
+    Allocates a zeroed (size, nrhs) block for each of the given 1D arrays.
+
+    Args
+    ----
+    arrays : list of ndarray
+        Disjoint 1D float arrays.
+
+    nrhs : int
+        Number of right-hand sides, i.e., columns in each block.
+
+    Returns
+    -------
+    function
+        Maps any contiguous view into one of `arrays` to the same rows of
+        that array's block.
+    """
+    arrays = sorted((arr for arr in arrays if arr.size), key=_address)
+    starts = [_address(arr) for arr in arrays]
+    blocks = [numpy.zeros((arr.size, nrhs)) for arr in arrays]
+
+    def remap(view):
+        if view.size == 0:
+            return numpy.zeros((0, nrhs))
+
+        i = bisect_right(starts, _address(view)) - 1
+        if i < 0 or _address(view) + view.nbytes > starts[i] + arrays[i].nbytes:
+            raise ValueError("Array is not a view into any of the blocked arrays.")
+
+        start = (_address(view) - starts[i]) // view.itemsize
+        return blocks[i][start:start + view.size]
+
+    return remap
+
 # using a slotted object here to save memory
 class Accessor(object):
     def __init__(self, vecwrapper, slice, val, meta, probdata, alloc_complex,
@@ -90,6 +131,10 @@ class Accessor(object):
         self.get, self.flat = self._setup_get_funct(vecwrapper, meta, alloc_complex)
         self.set = self._setup_set_funct(vecwrapper, meta, alloc_complex)
 
+        # 1D and 2D (val, get, set) while the vector holds a block of
+        # right-hand sides.
+        self._block = None
+
     def __getstate__(self):
         """ Returns state as a dict. """
         state = self.__dict__.copy()
@@ -130,6 +175,10 @@ class Accessor(object):
             else:
                 return self._get_pbo, flatfunc
 
+        # Units were already converted when the value was transferred.
+        if vecwrapper._probdata.units_on_transfer:
+            scale = None
+
         shape = meta['shape']
         if vecwrapper.deriv_units:
             offset = 0.0
@@ -323,6 +372,27 @@ class Accessor(object):
     def _set_pbo(self, value):
         self.val.val = value
 
+    def _get_block(self):
+        """Block of values, with one right-hand side per entry of the last
+        dimension."""
+        if self.meta['shape'] == 1:
+            return self.val[0]
+        return self.val.reshape(numpy.atleast_1d(self.meta['shape']).tolist() +
+                                [self.val.shape[1]])
+
+    def _set_block(self, value):
+        """Set a block of values."""
+        self.val[:] = numpy.reshape(value, self.val.shape)
+
+    def _setup_block(self, val):
+        """Stores a 2D block of values next to the current 1D values."""
+        self._block = ((self.val, self.get, self.set),
+                       (val, self._get_block, self._set_block))
+
+    def _use_block(self, block):
+        """Switches between the 1D values and the 2D block."""
+        self.val, self.get, self.set = self._block[block]
+
     def _remote_access_error(self, value=None):
         msg = "Cannot access remote Variable '{name}' in this process."
         raise RuntimeError(msg.format(name=self.meta['pathname']))
@@ -375,6 +445,9 @@ class VecWrapper(object):
         self.scale_cache = None
         self.units_cache = None
 
+        # 1D and 2D vec while this vector holds a block of right-hand sides.
+        self._block = None
+
     def _flat(self, name):
         """
         Return a flat version of the named variable, including any necessary conversions.
@@ -577,6 +650,44 @@ class VecWrapper(object):
         """
         return norm(self.vec)
 
+    def _setup_block(self, remap):
+        """
+        Gives this vector a second dimension with one right-hand side per
+        column. The 1D arrays are kept and can be switched back in with
+        `_use_block`.
+
+        Args
+        ----
+        remap : function
+            Maps each 1D array to the matching rows of its block.
+        """
+        self._block = (self.vec, remap(self.vec))
+        for acc in itervalues(self._dat):
+            if not (acc.pbo or acc.remote):
+                acc._setup_block(remap(acc.val))
+        self._use_block(True)
+
+    def _use_block(self, block):
+        """
+        Switches between the 1D arrays and the blocks.
+
+        Args
+        ----
+        block : bool
+            If True, use the blocks.
+        """
+        self.vec = self._block[block]
+        for acc in itervalues(self._dat):
+            if not (acc.pbo or acc.remote):
+                acc._use_block(block)
+
+    def _clear_block(self):
+        """ Restores the 1D arrays and drops the blocks."""
+        self._use_block(False)
+        self._block = None
+        for acc in itervalues(self._dat):
+            acc._block = None
+
     def get_view(self, system, comm, varmap):
         """
         Return a new `VecWrapper` that is a view into this one.
@@ -1247,9 +1358,14 @@ class TgtVecWrapper(VecWrapper):
                 self._dat[name].val *= val
 
     def _cache_units(self):
-        """ Caches the scalers so we don't have to do a lot of looping."""
+        """ Caches the scalers so we don't have to do a lot of looping.
+        Nothing is cached if the data transfers apply the unit scalers."""
 
         units_cache = []
+        if self._probdata.units_on_transfer:
+            self.units_cache = units_cache
+            return
+
         for name, acc in iteritems(self._dat):
             meta = acc.meta
             if 'unit_conv' in meta:
@@ -3,13 +3,15 @@ OpenMDAO design-of-experiments Driver implementing the Latin Hypercube and Optim
 """
 
 from collections import OrderedDict
+from multiprocessing import Pool
 import os
-from random import shuffle, randint, seed
+from random import shuffle, randint, seed, Random
 
 from six import iteritems, itervalues
 from six.moves import range, zip
 
 import numpy as np
+from scipy.spatial.distance import pdist
 
 from openmdao.drivers.predeterminedruns_driver import PredeterminedRunsDriver
 from openmdao.util.array_util import evenly_distrib_idxs
@@ -142,10 +144,39 @@ class LatinHypercubeDriver(PredeterminedRunsDriver):
 class OptimizedLatinHypercubeDriver(LatinHypercubeDriver):
     """Design-of-experiments Driver implementing the Morris-Mitchell method for
     an Optimized Latin Hypercube.
+
+    Args
+    ----
+    num_samples : int, optional
+        The number of samples to run. Defaults to 1.
+
+    seed : int or None, optional
+        Random seed.  Defaults to None.
+
+    population : int, optional
+        Number of perturbed hypercubes tried in each generation. Defaults to 20.
+
+    generations : int, optional
+        Number of generations of the evolutionary search. Defaults to 2.
+
+    norm_method : int, optional
+        Order of the norm used for the distance between samples. Defaults to 1.
+
+    num_par_doe : int, optional
+        The number of DOE cases to run concurrently.  Defaults to 1.
+
+    load_balance : bool, Optional
+        If True, use rank 0 as master and load balance cases among all of the
+        other ranks. Defaults to False.
+
+    num_procs : int, optional
+        Number of processes that search for the best hypercube, one value of
+        the Morris-Mitchell exponent q at a time. The result does not depend
+        on it. Defaults to 1.
     """
 
     def __init__(self, num_samples=1, seed=None, population=20, generations=2,
-                norm_method=1, num_par_doe=1, load_balance=False):
+                norm_method=1, num_par_doe=1, load_balance=False, num_procs=1):
         super(OptimizedLatinHypercubeDriver, self).__init__(num_par_doe=num_par_doe,
                                                             load_balance=load_balance)
         self.qs = [1, 2, 5, 10, 20, 50, 100]  # List of qs to try for Phi_q optimization
@@ -154,6 +185,7 @@ class OptimizedLatinHypercubeDriver(LatinHypercubeDriver):
         self.population = population
         self.generations = generations
         self.norm_method = norm_method
+        self.num_procs = num_procs
 
     def _get_lhc(self):
         """Generate an Optimized Latin Hypercube
@@ -161,83 +193,102 @@ class OptimizedLatinHypercubeDriver(LatinHypercubeDriver):
 
         rand_lhc = _rand_latin_hypercube(self.num_samples, self.num_design_vars)
 
-        # Optimize our LHC before returning it
-        best_lhc = _LHC_Individual(rand_lhc, q=1, p=self.norm_method)
-        for q in self.qs:
-            lhc_start = _LHC_Individual(rand_lhc, q, self.norm_method)
-            lhc_opt = _mmlhs(lhc_start, self.population, self.generations)
-            if lhc_opt.mmphi() < best_lhc.mmphi():
-                best_lhc = lhc_opt
+        # Each search gets its own random stream, so that the result is the
+        # same whether they run in parallel or not.
+        jobs = [(rand_lhc, q, self.norm_method, self.population, self.generations,
+                 randint(0, 2**31 - 1)) for q in self.qs]
+
+        if self.num_procs > 1:
+            pool = Pool(min(self.num_procs, len(jobs)))
+            try:
+                results = pool.map(_optimize_lhc, jobs)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [_optimize_lhc(job) for job in jobs]
+
+        # Return the best of the optimized LHCs
+        best_doe = rand_lhc
+        best_phi = _LHC_Individual(rand_lhc, q=1, p=self.norm_method).mmphi()
+        for doe, phi in results:
+            if phi < best_phi:
+                best_doe, best_phi = doe, phi
 
-        return best_lhc._get_doe().astype(int)
+        return best_doe.astype(int)
 
 
 class _LHC_Individual(object):
-    def __init__(self, doe, q=2, p=1):
+    def __init__(self, doe, q=2, p=1, dists=None):
         self.q = q
         self.p = p
         self.doe = doe
         self.phi = None  # Morris-Mitchell sampling criterion
 
+        # Distances between all pairs of points, in the condensed order of
+        # scipy's pdist. They are computed when first needed.
+        self._dists = dists
+
     @property
     def shape(self):
         """Size of the LatinHypercube DOE (rows,cols)."""
 
         return self.doe.shape
 
+    def _get_dists(self):
+        """Returns the distances between all pairs of points in the DOE."""
+        if self._dists is None:
+            self._dists = _pair_distances(self.doe, self.p)
+        return self._dists
+
     def mmphi(self):
         """Returns the Morris-Mitchell sampling criterion for this Latin
         hypercube.
         """
 
         if self.phi is None:
-            distdict = {}
-
-            # Calculate the norm between each pair of points in the DOE
-            arr = self.doe
-            n, m = arr.shape
-            for i in range(1, n):
-                nrm = np.linalg.norm(arr[i] - arr[:i], ord=self.p, axis=1)
-                for j in range(0, i):
-                    nrmj = nrm[j]
-                    if nrmj in distdict:
-                        distdict[nrmj] += 1
-                    else:
-                        distdict[nrmj] = 1
-
-            size = len(distdict)
-
-            distinct_d = np.fromiter(distdict, dtype=float, count=size)
-
-            # Mutltiplicity array with a count of how many pairs of points
-            # have a given distance
-            J = np.fromiter(itervalues(distdict), dtype=int, count=size)
-
-            self.phi = sum(J * (distinct_d ** (-self.q))) ** (1.0 / self.q)
+            # Summing over every pair is the same as summing over the
+            # distinct distances times their multiplicity.
+            dists = self._get_dists()
+            self.phi = np.sum(dists ** (-self.q)) ** (1.0 / self.q)
 
         return self.phi
 
-    def perturb(self, mutation_count):
+    def perturb(self, mutation_count, rng=None):
         """ Interchanges pairs of randomly chosen elements within randomly chosen
         columns of a DOE a number of times. The result of this operation will also
         be a Latin hypercube.
+
+        Only the distances from the rows that changed are computed again.
+        Random numbers are drawn from rng, a `random.Random`, if given.
         """
 
+        if rng is None:
+            rand = randint
+        else:
+            rand = rng.randint
+
         new_doe = self.doe.copy()
         n, k = self.doe.shape
+        changed = set()
         for count in range(mutation_count):
-            col = randint(0, k - 1)
+            col = rand(0, k - 1)
 
             # Choosing two distinct random points
-            el1 = randint(0, n - 1)
-            el2 = randint(0, n - 1)
+            el1 = rand(0, n - 1)
+            el2 = rand(0, n - 1)
             while el1 == el2:
-                el2 = randint(0, n - 1)
+                el2 = rand(0, n - 1)
+
+            new_doe[el1, col], new_doe[el2, col] = new_doe[el2, col], new_doe[el1, col]
+            changed.update((el1, el2))
 
-            new_doe[el1, col] = self.doe[el2, col]
-            new_doe[el2, col] = self.doe[el1, col]
+        dists = None
+        if self._dists is not None:
+            dists = self._dists.copy()
+            _update_distances(dists, new_doe, sorted(changed), self.p)
 
-        return _LHC_Individual(new_doe, self.q, self.p)
+        return _LHC_Individual(new_doe, self.q, self.p, dists)
 
     def __iter__(self):
         return self._get_rows()
@@ -270,6 +321,31 @@ def _rand_latin_hypercube(n, k):
     return arr
 
 
+def _pair_distances(doe, p):
+    """Returns the p-norm distances between all pairs of rows of doe, in the
+    condensed order of pdist."""
+    if p == 1:
+        return pdist(doe, 'cityblock')
+    elif p == 2:
+        return pdist(doe, 'euclidean')
+    elif p == np.inf:
+        return pdist(doe, 'chebyshev')
+    return pdist(doe, 'minkowski', p=p)
+
+
+def _update_distances(dists, doe, rows, p):
+    """Updates the condensed pair distances dists for the changed rows of
+    doe."""
+    n = doe.shape[0]
+    others = np.arange(n)
+    for i in rows:
+        j = others[others != i]
+        lo = np.minimum(i, j)
+        hi = np.maximum(i, j)
+        idx = n*lo - lo*(lo + 1)//2 + hi - lo - 1
+        dists[idx] = np.linalg.norm(doe[j] - doe[i], ord=p, axis=1)
+
+
 def _is_latin_hypercube(lh):
     """Returns True if the given array is a Latin hypercube.
     The given array is assumed to be a numpy array.
@@ -284,9 +360,19 @@ def _is_latin_hypercube(lh):
     return True
 
 
-def _mmlhs(x_start, population, generations):
+def _optimize_lhc(args):
+    """Runs _mmlhs from a Latin hypercube for one q, with its own random
+    seed. Returns the optimized DOE and its Morris-Mitchell criterion."""
+    doe, q, p, population, generations, seed_val = args
+    lhc_opt = _mmlhs(_LHC_Individual(doe, q, p), population, generations,
+                     Random(seed_val))
+    return lhc_opt._get_doe(), lhc_opt.mmphi()
+
+
+def _mmlhs(x_start, population, generations, rng=None):
     """Evolutionary search for most space filling Latin-Hypercube.
     Returns a new LatinHypercube instance with an optimized set of points.
+    Random numbers are drawn from rng, a `random.Random`, if given.
     """
 
     x_best = x_start
@@ -304,7 +390,7 @@ def _mmlhs(x_start, population, generations):
         phi_improved = phi_best
 
         for offspring in range(population):
-            x_try = x_best.perturb(mutations)
+            x_try = x_best.perturb(mutations, rng)
             phi_try = x_try.mmphi()
 
             if phi_try < phi_improved:
@@ -6,10 +6,11 @@ from __future__ import print_function
 
 import sys
 import os
+import time
 import traceback
 import logging
-from itertools import chain
-from six.moves import zip
+from itertools import chain, islice
+from six.moves import zip, queue
 from six import next, PY3, iteritems, string_types
 
 import multiprocessing
@@ -20,15 +21,23 @@ from openmdao.core.problem import _get_root_var
 from openmdao.core.driver import Driver
 from openmdao.util.record_util import create_local_meta, update_local_meta
 from openmdao.util.array_util import evenly_distrib_idxs
+from openmdao.util.concurrent import update_throughput, next_chunk_size
 from openmdao.core.mpi_wrap import MPI, debug, any_proc_is_true
 from openmdao.core.system import AnalysisError
 from openmdao.recorders.inmem_recorder import InMemoryRecorder
+from openmdao.recorders.recording_manager import _copy_value
 
 trace = os.environ.get('OPENMDAO_TRACE')
 
-def worker(problem, response_vars, case_queue, response_queue, worker_id): # pragma: no cover
-    """This is used to run parallel DOEs using multprocessing. It takes a case
-    off of the case_queue, runs it, then puts responses on the response_queue.
+def worker(problem, response_vars, case_queue, response_queue, worker_id,
+           table=None, update_queue=None): # pragma: no cover
+    """This is used to run parallel DOEs using multprocessing. It takes a
+    chunk of cases off of the case_queue, runs them, then puts their responses
+    on the response_queue along with the time it took to run them.
+    If a shared memory table is given, float responses are written into the
+    rows of the chunk instead. Each chunk has the number of the run it belongs
+    to, and the changed input values of each new run are taken off of the
+    update_queue before running its first chunk.
     """
     # set env var so comps/recorders know they're running in a worker proc
     os.environ['OPENMDAO_WORKER_ID'] = str(worker_id)
@@ -43,40 +52,253 @@ def worker(problem, response_vars, case_queue, response_queue, worker_id): # pra
         driver = problem.driver
         root = driver.root
 
-        terminate = 0
-        for case_id, case in iter(case_queue.get, 'STOP'):
-            #logging.info("worker %d, case id %d, case %s" % (worker_id, case_id, case))
+        if table is not None:
+            shared, layout = table
+            rows = _table_rows(shared, layout)
 
-            if terminate:
-                continue
+        vecs = (root.unknowns.vec, root.params.vec)
 
-            metadata = driver._prep_case(case, case_id)
+        terminate = 0
+        run_id = 0
+        for slot, chunk_run, chunk in iter(case_queue.get, 'STOP'):
+            while run_id < chunk_run:
+                run_id, updates = update_queue.get()
+                for vec, (idxs, vals) in zip(vecs, updates):
+                    vec[idxs] = vals
+                terminate = 0
+
+            start = time.time()
+            completed = []
+            for i, (case_id, case) in enumerate(chunk):
+                #logging.info("worker %d, case id %d, case %s" % (worker_id, case_id, case))
 
-            try:
-                terminate, exc = driver._try_case(root, metadata)
                 if terminate:
+                    break
+
+                metadata = driver._prep_case(case, case_id)
+
+                try:
+                    terminate, exc = driver._try_case(root, metadata)
+                    if terminate:
+                        complete_case = (metadata, [])
+                    else:
+                        values = [_get_root_var(root, n) for n in response_vars]
+                        if table is not None:
+                            values = _write_row(rows[slot + i], layout, values)
+                        else:
+                            # the rest of the chunk would overwrite the views
+                            values = [_copy_value(v) for v in values]
+                        complete_case = (metadata, values)
+                except:
+                    # we generally shouldn't get here, but just in case,
+                    # handle it so that the main process doesn't hang at the
+                    # end when it tries to join all of the concurrent processes.
+                    if metadata.get('msg'):
+                        metadata['msg'] += "\n\n%s" % traceback.format_exc()
+                    else:
+                        metadata['msg'] = traceback.format_exc()
+                    metadata['success'] = 0
+                    metadata['terminate'] = 1
                     complete_case = (metadata, [])
-                else:
-                    complete_case = (metadata,
-                             [_get_root_var(root, n) for n in response_vars])
-            except:
-                # we generally shouldn't get here, but just in case,
-                # handle it so that the main process doesn't hang at the
-                # end when it tries to join all of the concurrent processes.
-                if metadata.get('msg'):
-                    metadata['msg'] += "\n\n%s" % traceback.format_exc()
-                else:
-                    metadata['msg'] = traceback.format_exc()
-                metadata['success'] = 0
-                metadata['terminate'] = 1
-                complete_case = (metadata, [])
 
-            metadata['id'] = case_id
-            response_queue.put(complete_case)
+                metadata['id'] = case_id
+                completed.append(complete_case)
+
+            # always answer, even with no cases, so the master can keep count
+            response_queue.put((slot, worker_id, time.time() - start,
+                                completed))
     except:
         logging.error(traceback.format_exc())
         raise
 
+
+def _table_layout(root, names):
+    """Returns the (offset, shape) of each named variable in a row of a
+    shared memory case table, or None for variables that aren't floats,
+    followed by the size of a row."""
+    layout = []
+    size = 0
+    for name in names:
+        val = _get_root_var(root, name)
+        if isinstance(val, float) or (isinstance(val, numpy.ndarray) and
+                                      val.dtype.kind == 'f'):
+            shape = numpy.shape(val)
+            layout.append((size, shape))
+            size += int(numpy.prod(shape))
+        else:
+            layout.append(None)
+    return layout, size
+
+
+def _table_rows(shared, layout):
+    """Returns the shared memory case table as an array with one row per
+    slot."""
+    row_size = layout[1]
+    rows = numpy.frombuffer(shared, dtype=float)
+    return rows.reshape((-1, max(row_size, 1)))
+
+
+def _write_row(row, layout, values):
+    """Writes the float values into a row of the case table, and returns
+    copies of the rest of the values, with None in place of the ones in the
+    row."""
+    rest = []
+    for val, loc in zip(values, layout[0]):
+        if loc is None:
+            rest.append(_copy_value(val))
+        else:
+            offset, shape = loc
+            row[offset:offset + int(numpy.prod(shape))] = numpy.ravel(val)
+            rest.append(None)
+    return rest
+
+
+def _read_row(row, layout, values):
+    """Fills in the values that were written into a row of the case table.
+    The row is copied, so that it can be used again."""
+    row = row.copy()
+    full = []
+    for val, loc in zip(values, layout[0]):
+        if loc is None:
+            full.append(val)
+        else:
+            offset, shape = loc
+            if shape:
+                full.append(row[offset:offset + int(numpy.prod(shape))].reshape(shape))
+            else:
+                full.append(float(row[offset]))
+    return full
+
+class WorkerPool(object):
+    """
+    A set of multiprocessing worker processes, each with its own copy of a
+    Problem, that can run the cases of several DOE runs. Before each run,
+    only the values in the unknowns and params vectors of the Problem root
+    that have changed since the last run are sent to the workers.
+
+    Args
+    ----
+    problem : `Problem`
+        The Problem that is copied into each worker.
+
+    response_vars : list of str
+        Names of the variables whose values are sent back for each case.
+
+    num_procs : int
+        Number of worker processes.
+
+    max_chunk : int, optional
+        The largest number of cases sent to a worker at a time. Defaults
+        to 1.
+
+    shared_memory : bool, optional
+        If True, float responses are written into a table in shared memory
+        instead of being sent through the response queue.
+
+    daemon : bool, optional
+        If True, the workers are daemon processes, so they are killed
+        if the pool is never closed.
+    """
+
+    def __init__(self, problem, response_vars, num_procs, max_chunk=1,
+                 shared_memory=False, daemon=False):
+        root = problem.root
+
+        self.problem = problem
+        self.response_vars = list(response_vars)
+        self.num_procs = num_procs
+        self.max_chunk = max_chunk
+        self.shared_memory = shared_memory
+        self.run_id = 0
+
+        self._vecs = (root.unknowns.vec, root.params.vec)
+        self._sent = [vec.copy() for vec in self._vecs]
+
+        # Create queues
+        if sys.platform == 'win32':
+            self._manager = manager = multiprocessing.Manager()
+            self.task_queue = manager.Queue()
+            self.done_queue = manager.Queue()
+            self._update_queues = [manager.Queue() for i in range(num_procs)]
+        else:
+            self.task_queue = multiprocessing.Queue()
+            self.done_queue = multiprocessing.Queue()
+            self._update_queues = [multiprocessing.Queue()
+                                   for i in range(num_procs)]
+
+        # A table in shared memory with max_chunk rows for each chunk that is
+        # running. A slot is the first row of a chunk, and its rows are free
+        # again once the master has copied them.
+        if shared_memory:
+            self.layout = _table_layout(root, self.response_vars)
+            shared = multiprocessing.RawArray('d', num_procs * max_chunk *
+                                              max(self.layout[1], 1))
+            self.table = (shared, self.layout)
+            self.rows = _table_rows(shared, self.layout)
+        else:
+            self.table = None
+        self.free_slots = [i * max_chunk for i in range(num_procs)]
+
+        self._procs = []
+
+        # Start worker processes
+        for i in range(num_procs):
+            proc = multiprocessing.Process(target=worker,
+                                           args=(problem, self.response_vars,
+                                                 self.task_queue,
+                                                 self.done_queue, i,
+                                                 self.table,
+                                                 self._update_queues[i]))
+            proc.daemon = daemon
+            self._procs.append(proc)
+
+        for proc in self._procs:
+            proc.start()
+
+    def matches(self, problem, response_vars, num_procs, max_chunk,
+                shared_memory):
+        """Returns True if this pool can run the cases of the given Problem
+        with the given settings, i.e., the Problem hasn't been set up again
+        since the pool was started.
+        """
+        root = problem.root
+        return (problem is self.problem and
+                root.unknowns.vec is self._vecs[0] and
+                root.params.vec is self._vecs[1] and
+                list(response_vars) == self.response_vars and
+                num_procs == self.num_procs and
+                max_chunk <= self.max_chunk and
+                shared_memory == self.shared_memory)
+
+    def start_run(self):
+        """Starts a new run, sending the input values that changed since
+        the last one to every worker.
+        """
+        updates = []
+        for vec, sent in zip(self._vecs, self._sent):
+            idxs = numpy.nonzero(vec != sent)[0]
+            vals = vec[idxs]
+            sent[idxs] = vals
+            updates.append((idxs, vals))
+
+        self.run_id += 1
+        for q in self._update_queues:
+            q.put((self.run_id, updates))
+
+    def submit(self, chunk):
+        """Sends a chunk of cases to be run in the next free slot."""
+        self.task_queue.put((self.free_slots.pop(), self.run_id, chunk))
+
+    def close(self):
+        """Tells all workers we're done and waits for them to exit."""
+        for proc in self._procs:
+            self.task_queue.put('STOP')
+
+        for proc in self._procs:
+            proc.join()
+
+        self._procs = []
+
 class PredeterminedRunsDriver(Driver):
     """
     Baseclass for design-of-experiments Drivers that have pre-determined
@@ -92,6 +314,38 @@ class PredeterminedRunsDriver(Driver):
         cases among all of the other ranks. Default is False.  If
         multiprocessing is being used instead of MPI, then cases are always
         load balanced.
+
+    Options
+    -------
+    options['auto_add_response'] :  bool(False)
+        If True, all design vars, objectives and constraints are automatically
+        added as responses.
+    options['shared_memory'] :  bool(False)
+        If True, multiprocessing workers write float responses into a table in
+        shared memory and only send a short message for each case, instead of
+        pickling all of the responses.
+    options['chunk_size'] :  int(1)
+        Number of cases sent to a multiprocessing worker at a time.
+    options['adaptive_chunks'] :  bool(False)
+        If True, the size of each chunk is chosen so that it takes about
+        options['chunk_time'] seconds to run, based on the time per case
+        measured on the last chunk of the worker.
+    options['chunk_time'] :  float(0.1)
+        Target time in seconds for a chunk when options['adaptive_chunks']
+        is True.
+    options['max_chunk_size'] :  int(100)
+        Largest chunk that is sent when options['adaptive_chunks'] is True.
+    options['persistent_workers'] :  bool(False)
+        If True, multiprocessing workers are kept alive after a run and used
+        again by the next run, which only sends them the input values that
+        changed. Call close_workers() to stop them.
+
+    Attributes
+    ----------
+    worker_stats : dict
+        After a multiprocessing run, the number of cases and chunks, the time
+        spent running them and the cases per second of each worker, keyed by
+        worker id.
     """
 
     def __init__(self, num_par_doe=1, load_balance=False):
@@ -102,12 +356,33 @@ class PredeterminedRunsDriver(Driver):
         self.options.add_option('auto_add_response', False,
                        desc="If True, all design vars, objectives and "
                             "constraints are automatically added as responses.")
+        self.options.add_option('shared_memory', False,
+                       desc="If True, multiprocessing workers write float "
+                            "responses into a table in shared memory instead "
+                            "of sending them through a queue.")
+        self.options.add_option('chunk_size', 1, lower=1,
+                       desc="Number of cases sent to a multiprocessing "
+                            "worker at a time.")
+        self.options.add_option('adaptive_chunks', False,
+                       desc="If True, chunks are sized to take about "
+                            "chunk_time seconds to run.")
+        self.options.add_option('chunk_time', 0.1, lower=0.0,
+                       desc="Target time in seconds for a chunk when "
+                            "adaptive_chunks is True.")
+        self.options.add_option('max_chunk_size', 100, lower=1,
+                       desc="Largest chunk that is sent when "
+                            "adaptive_chunks is True.")
+        self.options.add_option('persistent_workers', False,
+                       desc="If True, multiprocessing workers are kept alive "
+                            "between runs.")
 
         self._num_par_doe = int(num_par_doe)
         self._par_doe_id = 0
         self._load_balance = load_balance
         self._respvars = []
         self._resp_recorder = None
+        self.worker_stats = {}
+        self._pool = None
 
     def _setup_communicators(self, comm, parent_dir):
         """
@@ -409,6 +684,7 @@ class PredeterminedRunsDriver(Driver):
         parameters.
         """
         self.iter_count = 0
+        self.worker_stats = {}
 
         if self._resp_recorder is not None:
             self._resp_recorder.reset()
@@ -574,79 +850,110 @@ class PredeterminedRunsDriver(Driver):
         pvars = list(self.recorders._vars_to_record['pnames'])
         response_vars = uvars + pvars
         numuvars = len(uvars)
+        num_procs = self._num_par_doe
 
-        runiter = self._build_runlist()
-
-        # Create queues
-        if sys.platform == 'win32':
-            manager = multiprocessing.Manager()
-            task_queue = manager.Queue()
-            done_queue = manager.Queue()
+        chunk_size = self.options['chunk_size']
+        if self.options['adaptive_chunks']:
+            chunk_time = self.options['chunk_time']
+            max_chunk = max(chunk_size, self.options['max_chunk_size'])
         else:
-            task_queue = multiprocessing.Queue()
-            done_queue = multiprocessing.Queue()
+            chunk_time = None
+            max_chunk = chunk_size
+
+        runiter = iter(self._build_runlist())
+
+        pool = self._pool
+        if pool is not None and not pool.matches(problem, response_vars,
+                                                 num_procs, max_chunk,
+                                                 self.options['shared_memory']):
+            self.close_workers()
+            pool = None
+
+        if pool is None:
+            pool = WorkerPool(problem, response_vars, num_procs, max_chunk,
+                              self.options['shared_memory'],
+                              daemon=self.options['persistent_workers'])
+
+        pool.start_run()
+        table = pool.table
+
+        iter_count, num_active, stop = self._start_cases(runiter, pool, 0,
+                                                         chunk_size)
+
+        while num_active > 0:
+            # Take every chunk that has finished, so that they are recorded
+            # together.
+            results = [pool.done_queue.get()]
+            while len(results) < num_active:
+                try:
+                    results.append(pool.done_queue.get_nowait())
+                except queue.Empty:
+                    break
+            num_active -= len(results)
 
-        procs = []
-        terminating = False
+            completed = []
+            for slot, worker_id, elapsed, chunk in results:
+                update_throughput(self.worker_stats, worker_id, len(chunk),
+                                  elapsed)
+                chunk_size = next_chunk_size(chunk_size, len(chunk), elapsed,
+                                             chunk_time, max_chunk)
 
-        # Start worker processes
-        for i in range(self._num_par_doe):
-            procs.append(multiprocessing.Process(target=worker,
-                                                 args=(problem, response_vars,
-                                                 task_queue, done_queue, i)))
+                for i, (meta, values) in enumerate(chunk):
+                    if table is not None and values:
+                        values = _read_row(pool.rows[slot + i], pool.layout,
+                                           values)
 
-        for proc in procs:
-            proc.start()
-
-        iter_count = 0
-        num_active = 0
-        empty = {}
-        try:
-            for proc in procs:
-                # case is a generator, so must make a list to send
-                case = list(next(runiter))
-                task_queue.put((iter_count, case))
-                iter_count += 1
-                num_active += 1
-        except StopIteration:
-            pass
-        else:
-            try:
-                while num_active > 0:
-                    meta, values = done_queue.get()
-                    #logging.info("RECEIVED: %d, %s" % (meta['id'], values[2]))
+                    #logging.info("RECEIVED: %d, %s" % (meta['id'], values))
                     complete_case = self._build_case(meta, uvars, pvars,
                                                      numuvars, values)
-                    num_active -= 1
                     if complete_case is None:
                         # there was a fatal error, don't run more cases
-                        break
+                        stop = True
+                    else:
+                        completed.append(complete_case)
+                pool.free_slots.append(slot)
 
-                    self.recorders.record_completed_case(root, complete_case)
-                    case = list(next(runiter))
-                    task_queue.put((iter_count, case))
-                    iter_count += 1
-                    num_active += 1
-            except StopIteration:
-                pass
-
-        # tell all workers we're done
-        for proc in procs:
-            task_queue.put('STOP')
-
-        for i in range(num_active):
-            meta, values = done_queue.get()
-            #logging.info("RECEIVED: %d, %s" % (meta['id'], values[0]))
-            complete_case = self._build_case(meta, uvars, pvars,
-                                             numuvars, values)
-            if complete_case is None:
-                # had a fatal error, don't record
-                continue
-
-            self.recorders.record_completed_case(root, complete_case)
-
-        for proc in procs:
-            proc.join()
+            # Keep the workers busy while the finished cases are recorded.
+            if not stop:
+                iter_count, started, stop = self._start_cases(runiter, pool,
+                                                              iter_count,
+                                                              chunk_size)
+                num_active += started
+
+            for complete_case in completed:
+                self.recorders.record_completed_case(root, complete_case)
+
+        if self.options['persistent_workers']:
+            self._pool = pool
+        else:
+            pool.close()
+            self._pool = None
+
+    def close_workers(self):
+        """Stops the multiprocessing workers that were kept alive by
+        options['persistent_workers'].
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def _start_cases(self, runiter, pool, iter_count, chunk_size=1):
+        """Sends a chunk of cases to run for each free slot. Returns the next
+        case id, the number of chunks sent and whether the runlist is
+        exhausted."""
+        started = 0
+        while pool.free_slots:
+            # cases are generators, so must make lists to send
+            chunk = [(iter_count + i, list(case)) for i, case in
+                     enumerate(islice(runiter, chunk_size))]
+            if chunk:
+                pool.submit(chunk)
+                iter_count += len(chunk)
+                started += 1
+            if len(chunk) < chunk_size:
+                return iter_count, started, True
+
+        return iter_count, started, False
 
     def _get_case_w_nones(self, it):
         """A wrapper around a case generator that returns None cases if
@@ -70,6 +70,8 @@ class pyOptSparseDriver(Driver):
         Name of optimizers to use
     options['print_results'] :  bool(True)
         Print pyOpt results if True
+    options['simul_derivs'] :  bool(False)
+        Color the total Jacobian at the start of the run so that design variables (or responses) whose derivatives don't overlap share a linear solve
     options['gradient method'] :  str('openmdao', 'pyopt_fd', 'snopt_fd')
         Finite difference implementation to use ('snopt_fd' may only be used with SNOPT)
     options['title'] :  str('Optimization using pyOpt_sparse')
@@ -102,6 +104,11 @@ class pyOptSparseDriver(Driver):
         self.options.add_option('gradient method', 'openmdao',
                                 values={'openmdao', 'pyopt_fd', 'snopt_fd'},
                                 desc='Finite difference implementation to use')
+        self.options.add_option('simul_derivs', False,
+                                desc="Color the total Jacobian at the start of"
+                                " the run so that design variables (or"
+                                " responses) whose derivatives don't overlap"
+                                " share a linear solve")
 
         # The user places optimizer-specific settings in here.
         self.opt_settings = {}
@@ -122,6 +129,7 @@ class pyOptSparseDriver(Driver):
         self._problem = None
         self.sparsity = OrderedDict()
         self.sub_sparsity = OrderedDict()
+        self.simul_sparsity = OrderedDict()
         self.active_tols = {}
 
     def _setup(self):
@@ -205,6 +213,7 @@ class pyOptSparseDriver(Driver):
         self.quantities = list(objs)
         self.sparsity = OrderedDict()
         self.sub_sparsity = OrderedDict()
+        self.simul_sparsity = OrderedDict()
         for name in objs:
             opt_prob.addObj(name)
             self.sparsity[name] = self.indep_list
@@ -212,6 +221,14 @@ class pyOptSparseDriver(Driver):
         # Calculate and save gradient for any linear constraints.
         lcons = self.get_constraints(lintype='linear').keys()
         self._problem = problem
+
+        # Color the total Jacobian of the nonlinear responses. This also
+        # gives us its exact sparsity for the constraint Jacobians.
+        if self.options['simul_derivs'] and problem._simul_coloring is None \
+           and self.options['gradient method'] == 'openmdao':
+            responses = list(objs)
+            responses.extend(self.get_constraints(lintype='nonlinear'))
+            problem.set_simul_coloring(indep_list, responses)
         if len(lcons) > 0:
             self.lin_jacs = self.calc_gradient(indep_list, lcons,
                                                return_format='dict')
@@ -351,7 +368,9 @@ class pyOptSparseDriver(Driver):
     def _build_sparse(self, name, wrt, consize, param_vals, sub_param_conns,
                       full_param_conns, rels):
         """ Build up the data structures that define a sparse Jacobian
-        matrix. Called separately on each nonlinear constraint.
+        matrix. Called separately on each nonlinear constraint. If the
+        Problem has a total Jacobian coloring that covers the constraint, its
+        exact sparsity is used.
 
         Args
         ----
@@ -377,6 +396,23 @@ class pyOptSparseDriver(Driver):
 
         jac = None
 
+        # A total Jacobian coloring knows exactly where the nonzeros are.
+        coloring = self._problem._simul_coloring
+        if coloring is not None and name in coloring['unknowns']:
+            jac = {}
+            self.simul_sparsity[name] = {}
+            for param in wrt:
+                empty = np.zeros(0, dtype=int)
+                rows, cols = coloring['sparsity'].get((name, param),
+                                                      (empty, empty))
+                coo = {}
+                coo['shape'] = [consize, len(param_vals[param])]
+                coo['coo'] = [rows, cols, np.ones((len(rows), ))]
+                jac[param] = coo
+                self.simul_sparsity[name][param] = (rows, cols)
+
+            return jac
+
         # Additional sparsity for index connections
         for param in wrt:
 
@@ -585,6 +621,16 @@ class pyOptSparseDriver(Driver):
                     coo['coo'] = [np.array(row), np.array(col), np.array(data)]
                     sens_dict[con][desvar] = coo
 
+            # Constraints with a total Jacobian coloring are passed with their
+            # exact sparsity.
+            for con, val1 in iteritems(self.simul_sparsity):
+                for desvar, (row, col) in iteritems(val1):
+                    coo = {}
+                    jac = sens_dict[con][desvar]
+                    coo['shape'] = list(jac.shape)
+                    coo['coo'] = [row, col, jac[row, col]]
+                    sens_dict[con][desvar] = coo
+
         except Exception as msg:
             tb = traceback.format_exc()
 
@@ -54,6 +54,56 @@ class TestLatinHypercubeDriver(unittest.TestCase):
         for n, k in self.hypercube_sizes:
             self._test_mmlhs_latin(n, k)
 
+    def test_mmphi(self):
+        test_lhc = _rand_latin_hypercube(20, 4)
+
+        for p in (1, 2, 3):
+            # Count the distinct distances between pairs of points.
+            counts = {}
+            for i in range(20):
+                for j in range(i):
+                    d = np.linalg.norm(test_lhc[i] - test_lhc[j], ord=p)
+                    counts[d] = counts.get(d, 0) + 1
+            for q in (1, 5, 50):
+                expected = sum(J * d**(-q) for d, J in counts.items()) ** (1.0 / q)
+                assert_rel_error(self, _LHC_Individual(test_lhc, q, p).mmphi(),
+                                 expected, 1e-12)
+
+    def test_perturb_updates_distances(self):
+        lhc = _LHC_Individual(_rand_latin_hypercube(30, 5), 2, 2)
+        lhc.mmphi()
+
+        for mutations in (1, 3, 10):
+            lhc_try = lhc.perturb(mutations)
+            self.assertTrue(_is_latin_hypercube(lhc_try.doe))
+            self.assertTrue(np.sum(lhc_try.doe != lhc.doe) <= 2 * mutations)
+            assert_rel_error(self, lhc_try.mmphi(),
+                             _LHC_Individual(lhc_try.doe, 2, 2).mmphi(), 1e-12)
+            lhc = lhc_try
+
+    def test_num_procs(self):
+        runs = []
+        for num_procs in (1, 3):
+            prob = Problem()
+            root = prob.root = Group()
+            root.add('p1', IndepVarComp('x', 50.0), promotes=['*'])
+            root.add('p2', IndepVarComp('y', 50.0), promotes=['*'])
+            root.add('comp', Paraboloid(), promotes=['*'])
+
+            prob.driver = OptimizedLatinHypercubeDriver(30, seed=3, population=5,
+                                                        generations=4,
+                                                        num_procs=num_procs)
+            prob.driver.add_desvar('x', lower=-50.0, upper=50.0)
+            prob.driver.add_desvar('y', lower=-50.0, upper=50.0)
+            prob.driver.add_objective('f_xy')
+            prob.setup(check=False)
+
+            runs.append([dict(case) for case in prob.driver._build_runlist()])
+
+        self.assertEqual(len(runs[0]), 30)
+        for case, expected in zip(runs[1], runs[0]):
+            self.assertEqual(case, expected)
+
     def test_algorithm_coverage_lhc(self):
 
         prob = Problem()
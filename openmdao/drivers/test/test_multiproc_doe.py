@@ -1,10 +1,32 @@
 
 import unittest
 
+import numpy as np
+
 from openmdao.api import IndepVarComp, Component, Group, Problem, \
                          FullFactorialDriver, AnalysisError
 from openmdao.test.exec_comp_for_test import ExecComp4Test
 
+
+class ArrayResponses(Component):
+    """ Has an array output, a scalar output and an output passed by
+    object."""
+
+    def __init__(self, n):
+        super(ArrayResponses, self).__init__()
+        self.add_param('x', 0.0)
+        self.add_output('y', np.zeros((n, 2)))
+        self.add_output('s', 0.0)
+        self.add_output('label', '', pass_by_obj=True)
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        x = params['x']
+        if x == 3.0:
+            raise AnalysisError('bad case')
+        unknowns['y'] = x * np.arange(unknowns['y'].size).reshape(unknowns['y'].shape)
+        unknowns['s'] = x**2
+        unknowns['label'] = 'case %g' % x
+
 class LBParallelDOETestCase6(unittest.TestCase):
 
     def test_multiproc_doe(self):
@@ -142,5 +164,160 @@ class LBParallelDOETestCase6(unittest.TestCase):
         else:
             self.assertEqual(nfails[fail_rank], 0)
 
+class MultiprocDOESharedMemoryTestCase(unittest.TestCase):
+
+    def _run(self, shared_memory):
+        problem = Problem()
+        root = problem.root = Group()
+        root.add('indep_var', IndepVarComp('x', val=1.0))
+        root.add('comp', ArrayResponses(50))
+        root.connect('indep_var.x', 'comp.x')
+
+        problem.driver = FullFactorialDriver(num_levels=12, num_par_doe=3,
+                                             load_balance=True)
+        problem.driver.options['shared_memory'] = shared_memory
+        problem.driver.add_desvar('indep_var.x', lower=1.0, upper=12.0)
+        problem.driver.add_objective('comp.s')
+        problem.driver.add_response(['indep_var.x', 'comp.y', 'comp.s',
+                                     'comp.label'])
+
+        problem.setup(check=False)
+        problem.run()
+
+        cases = [(dict(responses), success) for responses, success, msg in
+                 problem.driver.get_responses()]
+        return sorted(cases, key=lambda case: case[0]['indep_var.x'])
+
+    def test_shared_memory(self):
+        cases = self._run(True)
+        self.assertEqual(len(cases), 12)
+
+        for responses, success in cases:
+            x = responses['indep_var.x']
+            self.assertEqual(success, x != 3.0)
+            if success:
+                self.assertEqual(responses['comp.s'], x**2)
+                self.assertTrue(isinstance(responses['comp.s'], float))
+                self.assertEqual(responses['comp.y'].shape, (50, 2))
+                np.testing.assert_array_equal(responses['comp.y'].ravel(),
+                                              x * np.arange(100))
+                self.assertEqual(responses['comp.label'], 'case %g' % x)
+
+        # Same as sending everything through the queue.
+        expected = self._run(False)
+        for (responses, success), (exp_responses, exp_success) in zip(cases, expected):
+            self.assertEqual(success, exp_success)
+            self.assertEqual(sorted(responses), sorted(exp_responses))
+            for name, val in exp_responses.items():
+                np.testing.assert_array_equal(responses[name], val)
+
+class MultiprocDOEChunkTestCase(unittest.TestCase):
+
+    def _run(self, **options):
+        problem = Problem()
+        root = problem.root = Group()
+        root.add('indep_var', IndepVarComp('x', val=1.0))
+        root.add('comp', ArrayResponses(5))
+        root.connect('indep_var.x', 'comp.x')
+
+        problem.driver = FullFactorialDriver(num_levels=30, num_par_doe=3,
+                                             load_balance=True)
+        for name, val in options.items():
+            problem.driver.options[name] = val
+        problem.driver.add_desvar('indep_var.x', lower=1.0, upper=30.0)
+        problem.driver.add_objective('comp.s')
+        problem.driver.add_response(['indep_var.x', 'comp.y', 'comp.s'])
+
+        problem.setup(check=False)
+        problem.run()
+
+        return problem.driver
+
+    def _check(self, driver):
+        xs = []
+        for responses, success, msg in driver.get_responses():
+            responses = dict(responses)
+            x = responses['indep_var.x']
+            xs.append(x)
+            self.assertEqual(success, x != 3.0)
+            if success:
+                self.assertEqual(responses['comp.s'], x**2)
+                np.testing.assert_array_equal(responses['comp.y'].ravel(),
+                                              x * np.arange(10))
+
+        self.assertEqual(sorted(xs), list(np.linspace(1.0, 30.0, 30)))
+
+        stats = driver.worker_stats
+        self.assertEqual(sum(s['cases'] for s in stats.values()), 30)
+        for s in stats.values():
+            self.assertTrue(s['chunks'] > 0)
+            self.assertTrue(s['time'] >= 0.0)
+
+    def test_chunks(self):
+        driver = self._run(chunk_size=4)
+        self._check(driver)
+        self.assertTrue(sum(s['chunks'] for s in
+                            driver.worker_stats.values()) <= 9)
+
+    def test_chunks_shared_memory(self):
+        self._check(self._run(chunk_size=4, shared_memory=True))
+
+    def test_adaptive_chunks(self):
+        driver = self._run(adaptive_chunks=True, chunk_time=0.05,
+                           max_chunk_size=8, shared_memory=True)
+        self._check(driver)
+
+
+class MultiprocDOEPersistentWorkersTestCase(unittest.TestCase):
+
+    def test_persistent_workers(self):
+        problem = Problem()
+        root = problem.root = Group()
+        root.add('indep_var', IndepVarComp('x', val=1.0))
+        root.add('const', IndepVarComp('c', val=2.0))
+        root.add('mult', ExecComp4Test("y=c*x"))
+
+        root.connect('indep_var.x', 'mult.x')
+        root.connect('const.c', 'mult.c')
+
+        problem.driver = FullFactorialDriver(num_levels=10, num_par_doe=3,
+                                             load_balance=True)
+        problem.driver.options['persistent_workers'] = True
+        problem.driver.add_desvar('indep_var.x', lower=1.0, upper=10.0)
+        problem.driver.add_objective('mult.y')
+        problem.driver.add_response(['indep_var.x', 'mult.y'])
+
+        problem.setup(check=False)
+
+        try:
+            pools = []
+            for c in (2.0, 3.0, 3.0, -1.5):
+                problem['const.c'] = c
+                problem.run()
+                pools.append(problem.driver._pool)
+
+                num_cases = 0
+                for responses, success, msg in problem.driver.get_responses():
+                    responses = dict(responses)
+                    num_cases += 1
+                    self.assertEqual(responses['indep_var.x']*c,
+                                     responses['mult.y'])
+                self.assertEqual(num_cases, 10)
+
+            # the same workers ran all of the cases
+            self.assertTrue(all(pool is pools[0] for pool in pools))
+            self.assertEqual(pools[0].run_id, 4)
+
+            # a new setup starts new workers
+            problem.setup(check=False)
+            problem.run()
+            self.assertTrue(problem.driver._pool is not pools[0])
+        finally:
+            problem.driver.close_workers()
+
+        self.assertEqual(problem.driver._pool, None)
+
+
+
 if __name__ == '__main__':
     unittest.main()
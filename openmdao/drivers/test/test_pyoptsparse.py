@@ -1765,5 +1765,38 @@ class TestPyoptSparse(unittest.TestCase, ConcurrentTestCaseMixin):
         driver_issues = checks['driver_issues']['active_tol']
         self.assertEqual(driver_issues, ['ci', 'cia'])
 
+    def test_simul_derivs(self):
+        n = 5
+        prob = Problem()
+        root = prob.root = Group()
+        root.add('px', IndepVarComp('x', 2.0*np.ones(n)), promotes=['x'])
+        root.add('pw', IndepVarComp('w', -2.0*np.ones(n)), promotes=['w'])
+        root.add('con', ExecComp('c = x - w', c=np.zeros(n), x=np.zeros(n),
+                                 w=np.zeros(n)), promotes=['*'])
+        root.add('obj', ExecComp('f = sum(x**2) + sum(w**2)', x=np.zeros(n),
+                                 w=np.zeros(n)), promotes=['*'])
+
+        prob.driver = pyOptSparseDriver()
+        prob.driver.options['optimizer'] = OPTIMIZER
+        prob.driver.options['print_results'] = False
+        prob.driver.options['simul_derivs'] = True
+        prob.driver.add_desvar('x', lower=-10.0, upper=10.0)
+        prob.driver.add_desvar('w', lower=-10.0, upper=10.0)
+        prob.driver.add_objective('f')
+        prob.driver.add_constraint('c', lower=1.0)
+
+        prob.setup(check=False)
+        prob.run()
+
+        assert_rel_error(self, prob['x'], 0.5*np.ones(n), 1e-5)
+        assert_rel_error(self, prob['w'], -0.5*np.ones(n), 1e-5)
+
+        # One solve for the constraint rows and one for the objective.
+        self.assertEqual(len(prob._simul_coloring['colors']), 2)
+
+        rows, cols = prob.driver.simul_sparsity['c']['x']
+        self.assertEqual(list(rows), list(range(n)))
+        self.assertEqual(list(cols), list(range(n)))
+
 if __name__ == "__main__":
     unittest.main()
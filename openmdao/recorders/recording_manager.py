@@ -5,17 +5,49 @@ import os
 import itertools
 import time
 import traceback
+import threading
+from copy import deepcopy
 
-from six import iteritems
+import numpy as np
+from six import iteritems, reraise
+from six.moves import queue
 
 from openmdao.core.mpi_wrap import MPI, debug
+from openmdao.util.options import OptionsDictionary
 
 trace = os.environ.get('OPENMDAO_TRACE')
 
 class RecordingManager(object):
-    """ Object that routes function calls to all attached recorders. """
+    """ Object that routes function calls to all attached recorders.
+
+    Options
+    -------
+    options['background'] :  bool(False)
+        Set to True to hand the recorded data to a background thread that
+        writes it to the recorders, so that the driver does not wait on
+        slow files. Only the recorded variables are copied. An error raised
+        by a recorder is re-raised by the next call to the manager. This is
+        ignored under MPI.
+    options['max_queued'] :  int(100)
+        Number of cases that can wait to be written in background mode
+        before recording blocks.
+    """
 
     def __init__(self):
+        self.options = OptionsDictionary()
+        self.options.add_option('background', False,
+                                desc='Set to True to write cases to the '
+                                'recorders in a background thread')
+        self.options.add_option('max_queued', 100, lower=1,
+                                desc='Number of cases that can wait to be '
+                                'written in background mode before '
+                                'recording blocks')
+
+        # Background writer
+        self._queue = None
+        self._writer = None
+        self._writer_error = None
+
         self._vars_to_record = {
             'pnames': set(),
             'unames': set(),
@@ -78,6 +110,8 @@ class RecordingManager(object):
             rowned = root._owning_ranks
 
         self._record_p = self._record_u = self._record_r = False
+        for names in self._vars_to_record.values():
+            names.clear()
 
         for recorder in self._recorders:
             recorder.startup(root)
@@ -118,9 +152,88 @@ class RecordingManager(object):
             self._vars_to_record['rnames'].update(rnames)
 
     def close(self):
-        """ Close all recorders. """
-        for recorder in self._recorders:
-            recorder.close()
+        """ Close all recorders, after writing any queued cases."""
+        try:
+            self._stop_writer()
+        finally:
+            for recorder in self._recorders:
+                recorder.close()
+
+    def flush(self):
+        """ Waits until the background writer has written all queued cases,
+        and raises any error that happened while writing them."""
+        if self._writer is not None:
+            self._queue.join()
+        self._check_writer()
+
+    def _start_writer(self):
+        """ Starts the thread that writes queued cases."""
+        self._queue = queue.Queue(maxsize=self.options['max_queued'])
+        self._writer = threading.Thread(target=self._write_queued,
+                                        name='RecordingManager writer')
+        self._writer.daemon = True
+        self._writer.start()
+
+    def _stop_writer(self):
+        """ Writes the remaining cases and stops the writer thread."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+            self._queue = None
+        self._check_writer()
+
+    def _check_writer(self):
+        """ Raises the first error from the writer thread, if any."""
+        if self._writer_error is not None:
+            exc_info, self._writer_error = self._writer_error, None
+            reraise(*exc_info)
+
+    def _write_queued(self):
+        """ Body of the writer thread. Cases that are queued after an error
+        are dropped so that the driver never blocks on a full queue."""
+        q = self._queue
+        while True:
+            item = q.get()
+            try:
+                if item is None:
+                    return
+                if self._writer_error is None:
+                    method, recorders, args = item
+                    for recorder in recorders:
+                        getattr(recorder, method)(*args)
+            except Exception:
+                self._writer_error = sys.exc_info()
+            finally:
+                q.task_done()
+
+    def _dispatch(self, method, recorders, *args):
+        """ Calls the given method of the recorders, or queues the call for
+        the writer thread in background mode. The arguments must already be
+        snapshots in background mode."""
+        if not recorders:
+            return
+
+        if self._writer is None:
+            if not self.options['background'] or MPI:
+                for recorder in recorders:
+                    getattr(recorder, method)(*args)
+                return
+            self._start_writer()
+
+        self._check_writer()
+
+        # Blocks while the queue is full.
+        self._queue.put((method, recorders, args))
+
+    def _background(self):
+        """ Returns True if cases are written in a background thread."""
+        return self._writer is not None or \
+            (self.options['background'] and not MPI)
+
+    def _snapshot(self, vec, names):
+        """ Returns a dict with copies of the values of the given variables."""
+        return {n: _copy_value(vec[n]) for n in names}
 
     def record_metadata(self, root):
         """ Record metadata for all variables of interest.
@@ -156,8 +269,8 @@ class RecordingManager(object):
 
         case['meta']['timestamp'] = time.time()
 
-        for recorder in self._recorders:
-            recorder.record_iteration(case['p'], case['u'], case['r'], case['meta'])
+        self._dispatch('record_iteration', self._recorders,
+                       case['p'], case['u'], case['r'], case['meta'])
 
     def record_iteration(self, root, metadata, dummy=False):
         """ Gathers variables for non-parallel case recorders and calls
@@ -220,16 +333,24 @@ class RecordingManager(object):
                         cases = []
 
         if cases is None:
+            if self._background():
+                # Copy the recorded variables, since the model keeps running
+                # while they wait to be written.
+                params = self._snapshot(params, self._vars_to_record['pnames'])
+                unknowns = self._snapshot(unknowns, self._vars_to_record['unames'])
+                resids = self._snapshot(resids, self._vars_to_record['rnames'])
+                metadata = deepcopy(metadata)
             cases = [(params, unknowns, resids, metadata)]
 
         # If the recorder does not support parallel recording
         # we need to make sure we only record on rank 0.
+        recorders = [recorder for recorder in self._recorders
+                     if recorder._parallel or MPI is None or self.rank == 0]
         for params, unknowns, resids, meta in cases:
             if params is None: # dummy cases have None in place of params, etc.
                 continue
-            for recorder in self._recorders:
-                if recorder._parallel or MPI is None or self.rank == 0:
-                    recorder.record_iteration(params, unknowns, resids, meta)
+            self._dispatch('record_iteration', recorders,
+                           params, unknowns, resids, meta)
 
     def record_derivatives(self, derivs, metadata):
         """" Records derivatives if requested.
@@ -246,7 +367,21 @@ class RecordingManager(object):
 
         # If the recorder does not support parallel recording
         # we need to make sure we only record on rank 0.
-        for recorder in self._recorders:
-            if recorder.options['record_derivs']:
-                if recorder._parallel or self.rank == 0:
-                    recorder.record_derivatives(derivs, metadata)
+        recorders = [recorder for recorder in self._recorders
+                     if recorder.options['record_derivs'] and
+                     (recorder._parallel or self.rank == 0)]
+
+        if recorders and self._background():
+            derivs = deepcopy(derivs)
+            metadata = deepcopy(metadata)
+
+        self._dispatch('record_derivatives', recorders, derivs, metadata)
+
+
+def _copy_value(val):
+    """ Copies a recorded value, which may be a view into a vector."""
+    if isinstance(val, np.ndarray):
+        return val.copy()
+    if isinstance(val, float):
+        return val
+    return deepcopy(val)
@@ -0,0 +1,273 @@
+"""Class definition for SqliteColumnRecorder, which stores each recorded
+variable as a column of float64 blobs in an SQLite file."""
+
+import os
+import sqlite3
+from collections import OrderedDict
+
+import numpy as np
+from six import iteritems
+from six.moves import cPickle as pickle
+
+from openmdao.recorders.base_recorder import BaseRecorder
+from openmdao.util.record_util import format_iteration_coordinate
+
+from openmdao.devtools.partition_tree_n2 import get_model_viewer_data
+
+from openmdao.core.mpi_wrap import MPI
+
+format_version = 5
+
+# The vectors that can be recorded, with the option that turns them on and
+# the name used by `Case`.
+_vec_names = (('p', 'record_params', 'Parameters'),
+              ('u', 'record_unknowns', 'Unknowns'),
+              ('r', 'record_resids', 'Residuals'))
+
+
+def _encode(obj):
+    """ Pickles an object the same way as sqlitedict, so that the metadata
+    table can be read with a SqliteDict."""
+    return sqlite3.Binary(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class SqliteColumnRecorder(BaseRecorder):
+    """ Recorder that saves cases in an SQLite file with one table per
+    variable. Float variables are stored as raw float64 blobs, so that the
+    history of a variable can be read back with a single query, and cases are
+    written in bulk, `options['commit_every']` cases per transaction. Use
+    `SqliteCaseReader` (or `CaseReader`) to read the file.
+
+    Cases that have not been committed yet are lost if the process dies
+    before the recorder is closed.
+
+    Args
+    ----
+    out : str
+        Name of the SQLite file to write. An existing file is overwritten.
+
+    Options
+    -------
+    options['record_metadata'] :  bool(True)
+        Tells recorder whether to record variable attribute metadata.
+    options['record_unknowns'] :  bool(True)
+        Tells recorder whether to record the unknowns vector.
+    options['record_params'] :  bool(False)
+        Tells recorder whether to record the params vector.
+    options['record_resids'] :  bool(False)
+        Tells recorder whether to record the ressiduals vector.
+    options['record_derivs'] :  bool(True)
+        Tells recorder whether to record derivatives that are requested by a `Driver`.
+    options['includes'] :  list of strings
+        Patterns for variables to include in recording.
+    options['excludes'] :  list of strings
+        Patterns for variables to exclude in recording (processed after includes).
+    options['commit_every'] :  int(100)
+        Number of cases to buffer before they are written to the file in a
+        single transaction.
+    """
+
+    def __init__(self, out):
+        super(SqliteColumnRecorder, self).__init__()
+
+        self.options.add_option('commit_every', 100, lower=1,
+                                desc='Number of cases to buffer before they '
+                                'are written to the file in a single transaction')
+
+        self.model_viewer_data = None
+
+        # Column info keyed on (vector name, variable name). Each value is
+        # (table name, shape, is_float).
+        self._layout = OrderedDict()
+        self._layout_changed = False
+        self._new_tables = []
+
+        # Buffered rows, waiting for the next commit.
+        self._case_rows = []
+        self._var_rows = {}
+        self._deriv_rows = []
+        self._num_cases = 0
+
+        if MPI and MPI.COMM_WORLD.rank > 0 :
+            self._con = None
+            return
+
+        if os.path.exists(out):
+            os.remove(out)
+
+        # The connection may be used by the background writer of a
+        # RecordingManager, but never by two threads at once.
+        self._con = con = sqlite3.connect(out, check_same_thread=False)
+        with con:
+            # Same layout as a SqliteDict table.
+            con.execute('CREATE TABLE metadata (key TEXT PRIMARY KEY, value BLOB)')
+            con.execute('CREATE TABLE cases (id INTEGER PRIMARY KEY, key TEXT, '
+                        'timestamp REAL, success INTEGER, msg TEXT)')
+            con.execute('CREATE INDEX cases_key ON cases (key)')
+            con.execute('CREATE TABLE derivs (key TEXT PRIMARY KEY, '
+                        'timestamp REAL, success INTEGER, msg TEXT, value BLOB)')
+
+        self._set_metadata('format_version', format_version)
+        self._set_metadata('layout', self._layout)
+
+    def _set_metadata(self, key, value):
+        """ Writes a single metadata entry."""
+        with self._con:
+            self._con.execute('REPLACE INTO metadata (key, value) VALUES (?, ?)',
+                              (key, _encode(value)))
+
+    def startup(self, group):
+        super(SqliteColumnRecorder, self).startup(group)
+
+        # Need this for use when recording the metadata
+        # Can't do this in the record_metadata method because it only gets
+        #   called for rank 0 when running in parallel and so the MPI gather
+        #   that is called in that function won't work. All processes
+        #   need to participate in that collective call
+        self.model_viewer_data = get_model_viewer_data(group)
+
+    def record_metadata(self, group):
+        """Stores the metadata of the given group in the metadata table
+        using the variable name for the key.
+
+        Args
+        ----
+        group : `System`
+            `System` containing vectors
+        """
+
+        if MPI and MPI.COMM_WORLD.rank > 0 :
+            raise RuntimeError("not rank 0")
+
+        self._set_metadata('Parameters', dict(group.params.iteritems()))
+        self._set_metadata('Unknowns', dict(group.unknowns.iteritems()))
+        self._set_metadata('system_metadata', group.metadata)
+        self._set_metadata('model_viewer_data', self.model_viewer_data)
+
+    def _column(self, vec_name, name, val):
+        """ Returns the table and layout of the column for the given variable,
+        adding a new one the first time we see it."""
+        key = (vec_name, name)
+        try:
+            return self._layout[key]
+        except KeyError:
+            pass
+
+        is_float = isinstance(val, float) or \
+            (isinstance(val, np.ndarray) and val.dtype.kind == 'f')
+
+        column = ('var_%d' % len(self._layout), np.shape(val), is_float)
+        self._layout[key] = column
+        self._layout_changed = True
+        self._new_tables.append(column[0])
+        self._var_rows[column[0]] = []
+        return column
+
+    def record_iteration(self, params, unknowns, resids, metadata):
+        """
+        Buffers the provided data, which is written to the sqlite file
+        `options['commit_every']` cases at a time.
+
+        Args
+        ----
+        params : dict
+            Dictionary containing parameters. (p)
+
+        unknowns : dict
+            Dictionary containing outputs and states. (u)
+
+        resids : dict
+            Dictionary containing residuals. (r)
+
+        metadata : dict, optional
+            Dictionary containing execution metadata (e.g. iteration coordinate).
+        """
+
+        if MPI and MPI.COMM_WORLD.rank > 0 :
+            raise RuntimeError("not rank 0")
+
+        iteration_coordinate = metadata['coord']
+        case_id = self._num_cases
+        self._num_cases += 1
+
+        self._case_rows.append((case_id,
+                                format_iteration_coordinate(iteration_coordinate),
+                                metadata['timestamp'], metadata['success'],
+                                metadata['msg']))
+
+        vecs = {'p': params, 'u': unknowns, 'r': resids}
+        for key, option, vec_name in _vec_names:
+            if not self.options[option]:
+                continue
+
+            filtered = self._filter_vector(vecs[key], key, iteration_coordinate)
+            for name, val in iteritems(filtered):
+                table, shape, is_float = self._column(vec_name, name, val)
+                if is_float:
+                    data = np.asarray(val, dtype=float)
+                    if data.shape != shape:
+                        raise ValueError("The shape of '%s' changed from %s "
+                                         "to %s during recording." %
+                                         (name, shape, data.shape))
+                    blob = sqlite3.Binary(data.tobytes())
+                else:
+                    blob = _encode(val)
+                self._var_rows[table].append((case_id, blob))
+
+        if len(self._case_rows) >= self.options['commit_every']:
+            self._commit()
+
+    def record_derivatives(self, derivs, metadata):
+        """Buffers the derivatives that were calculated for the driver.
+
+        Args
+        ----
+        derivs : dict or ndarray depending on the optimizer
+            Dictionary containing derivatives
+
+        metadata : dict, optional
+            Dictionary containing execution metadata (e.g. iteration coordinate).
+        """
+
+        self._deriv_rows.append((format_iteration_coordinate(metadata['coord']),
+                                 metadata['timestamp'], metadata['success'],
+                                 metadata['msg'], _encode(derivs)))
+
+    def _commit(self):
+        """ Writes all buffered cases in a single transaction."""
+        con = self._con
+        if con is None:
+            return
+
+        with con:
+            for table in self._new_tables:
+                con.execute('CREATE TABLE "%s" (case_id INTEGER PRIMARY KEY, '
+                            'value BLOB)' % table)
+            self._new_tables = []
+
+            if self._layout_changed:
+                con.execute('REPLACE INTO metadata (key, value) VALUES (?, ?)',
+                            ('layout', _encode(self._layout)))
+                self._layout_changed = False
+
+            con.executemany('INSERT INTO cases VALUES (?, ?, ?, ?, ?)',
+                            self._case_rows)
+            self._case_rows = []
+
+            for table, rows in iteritems(self._var_rows):
+                if rows:
+                    con.executemany('INSERT INTO "%s" VALUES (?, ?)' % table,
+                                    rows)
+                    self._var_rows[table] = []
+
+            con.executemany('REPLACE INTO derivs VALUES (?, ?, ?, ?, ?)',
+                            self._deriv_rows)
+            self._deriv_rows = []
+
+    def close(self):
+        """Writes any buffered cases and closes the file."""
+
+        if self._con is not None:
+            self._commit()
+            self._con.close()
+            self._con = None
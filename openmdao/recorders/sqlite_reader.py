@@ -1,21 +1,46 @@
 from __future__ import print_function, absolute_import
 
+import sqlite3
+from collections import OrderedDict
+from contextlib import closing
+from numbers import Integral
+
+import numpy as np
+from six.moves import cPickle as pickle
 from sqlitedict import SqliteDict
 
 from openmdao.recorders.case_reader_base import CaseReaderBase
 from openmdao.recorders.case import Case
 from openmdao.util.record_util import is_valid_sqlite3_db
 
+# Largest code point, used as an upper bound for key prefix ranges.
+_MAX_CHAR = u'\U0010ffff'
+
+# Number of keys read at once when cases are looked up by index.
+_KEY_PAGE_SIZE = 1000
+
+# Attribute of `Case` holding each recorded vector.
+_case_attrs = {'Parameters': 'parameters',
+               'Unknowns': 'unknowns',
+               'Residuals': 'resids'}
+
 
 class SqliteCaseReader(CaseReaderBase):
-    """ A CaseReader specific to files created with SqliteRecorder.
+    """ A CaseReader specific to files created with SqliteRecorder or
+    SqliteColumnRecorder.
+
+    Cases are read from the file as they are needed. The reader can be
+    indexed with an int, a case identifier or a slice, iterated over, and
+    keeps the most recently read cases in memory.
 
     Parameters
     ----------
     filename : str
         The path to the filename containing the recorded data.
+    cache_size : int, optional
+        Number of decoded cases to keep in memory. Defaults to 128.
     """
-    def __init__(self, filename):
+    def __init__(self, filename, cache_size=128):
         super(SqliteCaseReader, self).__init__(filename)
 
         if filename is not None:
@@ -26,6 +51,9 @@ class SqliteCaseReader(CaseReaderBase):
         with SqliteDict(self.filename, 'metadata', flag='r') as db:
             self.format_version = db.get('format_version', None)
 
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+
         self._load()
 
         self.num_cases = len(self._case_keys)
@@ -37,27 +65,61 @@ class SqliteCaseReader(CaseReaderBase):
         `format_version`, `parameters`, and `unknowns` attributes of this
         CaseReader.
 
-        The `iterations` table is read to load the keys which identify
-        the individual cases/iterations from the recorded file.
+        The keys which identify the individual cases/iterations are not
+        read until they are needed, only their number is.
 
         Parameters
         ----------
         format_version : int
             The version of the format assumed when loading the file.
         """
-        if self.format_version in (3, 4):
+        if self.format_version == 5:
+            # Columnar format from SqliteColumnRecorder
+            with SqliteDict(self.filename, 'metadata', flag='r') as db:
+                self._parameters = db.get('Parameters', None)
+                self._unknowns = db.get('Unknowns', None)
+                self._layout = db.get('layout')
+
+            self._table, self._order = 'cases', 'id'
+
+        elif self.format_version in (3, 4):
             # Read the metadata and save it in the reader
             with SqliteDict(self.filename, 'metadata', flag='r') as db:
                 self._parameters = db.get('Parameters', None)
                 self._unknowns = db.get('Unknowns', None)
 
-            # Store the identifier for each iteration in _case_keys
-            with SqliteDict(self.filename, 'iterations', flag='r') as db:
-                self._case_keys = tuple(db.keys())
+            # SqliteDict keeps the insertion order in the rowid.
+            self._table, self._order = 'iterations', 'rowid'
         else:
             raise ValueError('SQliteCaseReader encountered an unhandled '
                              'format version: {0}'.format(self.format_version))
 
+        with self._connect() as con:
+            count = con.execute('SELECT COUNT(*) FROM "%s"' %
+                                self._table).fetchone()[0]
+
+        self._case_keys = _CaseKeys(self, count)
+
+    def list_cases(self):
+        """ Return a tuple of the case string identifiers available in this
+        instance of the CaseReader. This reads every key in the file, so use
+        `iter_cases` or slicing to look at part of a long history.
+        """
+        return tuple(self._case_keys)
+
+    def __len__(self):
+        return self.num_cases
+
+    def __iter__(self):
+        return self.iter_cases()
+
+    def __getitem__(self, case_id):
+        """ Returns the case with the given index or identifier, or a list of
+        cases for a slice."""
+        if isinstance(case_id, slice):
+            return [self.get_case(key) for key in self._case_keys[case_id]]
+        return self.get_case(case_id)
+
     def get_case(self, case_id):
         """
         Parameters
@@ -70,7 +132,7 @@ class SqliteCaseReader(CaseReaderBase):
             An instance of Case populated with data from the
             specified case/iteration.
         """
-        if isinstance(case_id, int):
+        if isinstance(case_id, Integral):
             # If case_id is an integer, assume the user
             # wants a case as an index
             _case_id = self._case_keys[case_id]
@@ -78,18 +140,275 @@ class SqliteCaseReader(CaseReaderBase):
             # Otherwise assume we were given the case string identifier
             _case_id = case_id
 
-        # Initialize the Case object from the iterations data
-        with SqliteDict(self.filename, 'iterations', flag='r') as iter_db:
-            case = Case(self.filename, _case_id, iter_db[_case_id])
+        case = self._cache_get(_case_id)
+        if case is not None:
+            return case
 
-        # Set the derivs data for the case if available
-        with SqliteDict(self.filename, 'derivs', flag='r') as derivs_db:
-            # If derivs weren't recorded then don't bother sending them
-            # to the Case.
-            if len(derivs_db) == 0:
-                pass
+        with self._connect() as con:
+            if self.format_version == 5:
+                case = self._get_column_case(con, _case_id)
             else:
-                if _case_id in derivs_db:
-                    case._derivs = derivs_db[_case_id].get('Derivatives', None)
+                row = con.execute('SELECT value FROM iterations WHERE key=?',
+                                  (_case_id,)).fetchone()
+                if row is None:
+                    raise KeyError(_case_id)
+                case = self._get_row_case(con, _case_id, row[0])
 
+        self._cache_put(_case_id, case)
         return case
+
+    def iter_cases(self, coord_prefix=None):
+        """ Iterates over the cases in the order they were recorded, reading
+        them from the file one at a time.
+
+        Parameters
+        ----------
+        coord_prefix : str, optional
+            Only yield cases whose iteration coordinate starts with this one,
+            e.g. 'rank0:SLSQP|3' for the cases under the third iteration of
+            the driver.
+
+        Yields
+        ------
+        Case
+            The next case.
+        """
+        if self.format_version == 5:
+            for key in self._iter_keys(coord_prefix):
+                yield self.get_case(key)
+            return
+
+        where, args = _prefix_clause(coord_prefix)
+        with self._connect() as con:
+            cursor = con.execute('SELECT key, value FROM iterations%s '
+                                 'ORDER BY rowid' % where, args)
+            for key, blob in cursor:
+                case = self._cache_get(key)
+                if case is None:
+                    case = self._get_row_case(con, key, blob)
+                    self._cache_put(key, case)
+                yield case
+
+    def _connect(self):
+        """ Returns a connection to the file that is closed on exiting a
+        with block."""
+        return closing(sqlite3.connect(self.filename))
+
+    def _iter_keys(self, coord_prefix=None, limit=-1, offset=0):
+        """ Yields case keys in recording order."""
+        where, args = _prefix_clause(coord_prefix)
+        if offset and not where and self._order == 'id':
+            # The ids of the columnar format are the case numbers, so the
+            # primary key finds the first case instead of stepping over
+            # `offset` rows.
+            where, args, offset = ' WHERE id >= ?', (offset,), 0
+        with self._connect() as con:
+            cursor = con.execute('SELECT key FROM "%s"%s ORDER BY %s '
+                                 'LIMIT ? OFFSET ?' %
+                                 (self._table, where, self._order),
+                                 args + (limit, offset))
+            for row in cursor:
+                yield row[0]
+
+    def _cache_get(self, key):
+        """ Returns a recently read case, or None."""
+        try:
+            case = self._cache.pop(key)
+        except KeyError:
+            return None
+        self._cache[key] = case
+        return case
+
+    def _cache_put(self, key, case):
+        """ Adds a case to the cache, dropping the least recently used one
+        when it is full."""
+        if self._cache_size <= 0:
+            return
+        self._cache[key] = case
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def _get_row_case(self, con, case_key, blob):
+        """ Assembles a Case from a pickled row of a file written by
+        SqliteRecorder."""
+        case = Case(self.filename, case_key, pickle.loads(bytes(blob)))
+
+        # Set the derivs data for the case if available
+        row = con.execute('SELECT value FROM derivs WHERE key=?',
+                          (case_key,)).fetchone()
+        if row is not None:
+            case._derivs = pickle.loads(bytes(row[0])).get('Derivatives', None)
+
+        return case
+
+    def _get_column_case(self, con, case_key):
+        """ Assembles a Case from the columns of a file written by
+        SqliteColumnRecorder."""
+        row = con.execute('SELECT id, timestamp, success, msg FROM cases '
+                          'WHERE key=?', (case_key,)).fetchone()
+        if row is None:
+            raise KeyError(case_key)
+
+        row_id = row[0]
+        case_dict = {'timestamp': row[1], 'success': row[2], 'msg': row[3]}
+
+        for (vec_name, name), (table, shape, is_float) in self._layout.items():
+            row = con.execute('SELECT value FROM "%s" WHERE case_id=?' % table,
+                              (row_id,)).fetchone()
+            if row is None:
+                continue
+            if vec_name not in case_dict:
+                case_dict[vec_name] = {}
+            case_dict[vec_name][name] = _decode_value(row[0], shape, is_float)
+
+        row = con.execute('SELECT value FROM derivs WHERE key=?',
+                          (case_key,)).fetchone()
+
+        case = Case(self.filename, case_key, case_dict)
+        if row is not None:
+            case.derivs = pickle.loads(bytes(row[0]))
+
+        return case
+
+    def get_history(self, name, vector='Unknowns', coord_prefix=None):
+        """ Returns the value of a variable in every case that recorded it,
+        read in a single pass over the file. For files written by
+        SqliteColumnRecorder only the column of the variable is read.
+
+        Parameters
+        ----------
+        name : str
+            Name of the variable.
+        vector : str, optional
+            Which vector the variable was recorded from, 'Unknowns',
+            'Parameters' or 'Residuals'.
+        coord_prefix : str, optional
+            Only include cases whose iteration coordinate starts with this
+            one.
+
+        Returns
+        -------
+        ndarray
+            Array with one row per case, holding the flattened values of the
+            variable. For non-float variables, a list of values is returned
+            instead.
+        """
+        if self.format_version == 5:
+            return self._get_column_history(name, vector, coord_prefix)
+
+        where, args = _prefix_clause(coord_prefix)
+        attr = _case_attrs.get(vector)
+        values = []
+
+        with self._connect() as con:
+            cursor = con.execute('SELECT key, value FROM iterations%s '
+                                 'ORDER BY rowid' % where, args)
+            for key, blob in cursor:
+                # Don't decode the cases we already have.
+                case = self._cache.get(key)
+                if case is not None:
+                    vec = getattr(case, attr, None)
+                else:
+                    vec = pickle.loads(bytes(blob)).get(vector)
+                if vec is not None and name in vec:
+                    values.append(vec[name])
+
+        if not values:
+            raise KeyError("'%s' was not recorded in %s." % (name, vector))
+
+        val = values[0]
+        if not (isinstance(val, float) or
+                (isinstance(val, np.ndarray) and val.dtype.kind == 'f')):
+            return values
+
+        return np.array([np.asarray(v, dtype=float).ravel() for v in values])
+
+    def _get_column_history(self, name, vector, coord_prefix):
+        """ Reads the history of a variable from its column."""
+        try:
+            table, shape, is_float = self._layout[vector, name]
+        except KeyError:
+            raise KeyError("'%s' was not recorded in %s." % (name, vector))
+
+        where, args = _prefix_clause(coord_prefix, 'c.key')
+        with self._connect() as con:
+            if where:
+                rows = con.execute('SELECT v.value FROM "%s" v JOIN cases c '
+                                   'ON v.case_id = c.id%s ORDER BY v.case_id' %
+                                   (table, where), args).fetchall()
+            else:
+                rows = con.execute('SELECT value FROM "%s" ORDER BY case_id' %
+                                   table).fetchall()
+
+        if not is_float:
+            return [pickle.loads(bytes(row[0])) for row in rows]
+
+        size = int(np.prod(shape))
+        data = np.frombuffer(b''.join(bytes(row[0]) for row in rows),
+                             dtype=np.float64)
+        return data.reshape((len(rows), size))
+
+
+class _CaseKeys(object):
+    """ Read-only sequence of the case keys in a file, which are read as they
+    are needed rather than all at once."""
+
+    def __init__(self, reader, size):
+        self._reader = reader
+        self._size = size
+
+        # (index of the first key, keys) of the last page read.
+        self._page = (0, ())
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return self._reader._iter_keys()
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            idxs = range(*idx.indices(self._size))
+            if len(idxs) == 0:
+                return ()
+            lo = min(idxs)
+            keys = tuple(self._reader._iter_keys(limit=max(idxs) + 1 - lo,
+                                                 offset=lo))
+            return tuple(keys[i - lo] for i in idxs)
+
+        if idx < 0:
+            idx += self._size
+        if idx < 0 or idx >= self._size:
+            raise IndexError('case index out of range')
+
+        start, keys = self._page
+        if not start <= idx < start + len(keys):
+            start = idx - idx % _KEY_PAGE_SIZE
+            keys = tuple(self._reader._iter_keys(limit=_KEY_PAGE_SIZE,
+                                                 offset=start))
+            self._page = (start, keys)
+        return keys[idx - start]
+
+
+def _prefix_clause(coord_prefix, column='key'):
+    """ Returns the WHERE clause and arguments that select the cases under
+    the given iteration coordinate. The range test lets sqlite use the index
+    on the key."""
+    if not coord_prefix:
+        return '', ()
+
+    coord_prefix = coord_prefix.rstrip('|')
+    start = coord_prefix + '|'
+    return (' WHERE (%s = ? OR (%s >= ? AND %s < ?))' % (column, column, column),
+            (coord_prefix, start, start + _MAX_CHAR))
+
+
+def _decode_value(blob, shape, is_float):
+    """ Converts a value stored by SqliteColumnRecorder back to a float,
+    array or object."""
+    if not is_float:
+        return pickle.loads(bytes(blob))
+    val = np.frombuffer(bytes(blob), dtype=np.float64)
+    if shape == ():
+        return float(val[0])
+    return val.reshape(shape).copy()
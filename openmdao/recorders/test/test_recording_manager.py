@@ -0,0 +1,119 @@
+""" Unit tests for writing cases in the background in RecordingManager. """
+
+import time
+import threading
+import unittest
+from copy import deepcopy
+
+import numpy as np
+
+from openmdao.api import Problem, InMemoryRecorder, ScipyOptimizer, \
+    FullFactorialDriver
+from openmdao.test.sellar import SellarDerivativesGrouped
+from openmdao.test.util import assert_rel_error
+
+
+class SlowRecorder(InMemoryRecorder):
+    """ Records copies of the values in memory, slowly, and remembers which
+    threads it ran in."""
+
+    def __init__(self, delay=0.0, fail_at=None):
+        super(SlowRecorder, self).__init__()
+        self.delay = delay
+        self.fail_at = fail_at
+        self.threads = set()
+
+    def record_iteration(self, params, unknowns, resids, metadata):
+        self.threads.add(threading.current_thread().name)
+        if len(self.iters) == self.fail_at:
+            raise RuntimeError('disk full')
+        time.sleep(self.delay)
+        super(SlowRecorder, self).record_iteration(params, unknowns, resids,
+                                                   metadata)
+        self.iters[-1] = deepcopy(self.iters[-1])
+
+
+def _sellar(recorder, background, **options):
+    prob = Problem()
+    prob.root = SellarDerivativesGrouped()
+
+    prob.driver = ScipyOptimizer()
+    prob.driver.options['optimizer'] = 'SLSQP'
+    prob.driver.options['disp'] = False
+
+    prob.driver.add_desvar('z', lower=np.array([-10.0, 0.0]),
+                           upper=np.array([10.0, 10.0]))
+    prob.driver.add_desvar('x', lower=0.0, upper=10.0)
+    prob.driver.add_objective('obj')
+    prob.driver.add_constraint('con1', upper=0.0)
+    prob.driver.add_constraint('con2', upper=0.0)
+
+    recorder.options['record_params'] = True
+    recorder.options['record_resids'] = True
+    prob.driver.add_recorder(recorder)
+    prob.driver.recorders.options['background'] = background
+    for name, val in options.items():
+        prob.driver.recorders.options[name] = val
+
+    prob.setup(check=False)
+    return prob
+
+
+class TestBackgroundRecording(unittest.TestCase):
+
+    def test_same_cases(self):
+        expected = SlowRecorder()
+        prob = _sellar(expected, False)
+        prob.run()
+        prob.cleanup()
+        self.assertEqual(expected.threads, set(['MainThread']))
+
+        recorder = SlowRecorder(delay=0.002)
+        prob = _sellar(recorder, True, max_queued=2)
+        prob.run()
+        prob.cleanup()
+
+        self.assertEqual(recorder.threads, set(['RecordingManager writer']))
+        self.assertIsNone(prob.driver.recorders._writer)
+
+        self.assertEqual(len(recorder.iters), len(expected.iters))
+        self.assertEqual(len(recorder.deriv_iters), len(expected.deriv_iters))
+        for data, expected_data in zip(recorder.iters, expected.iters):
+            self.assertEqual(data['iter'], expected_data['iter'])
+            for vec in ('params', 'unknowns', 'resids'):
+                self.assertEqual(sorted(data[vec]), sorted(expected_data[vec]))
+                for name, val in expected_data[vec].items():
+                    assert_rel_error(self, data[vec][name], val, 1e-12)
+
+    def test_flush(self):
+        recorder = SlowRecorder(delay=0.01)
+        prob = Problem()
+        prob.root = SellarDerivativesGrouped()
+        prob.driver = FullFactorialDriver(num_levels=2)
+        prob.driver.add_desvar('x', lower=0.0, upper=10.0)
+        prob.driver.add_recorder(recorder)
+        prob.driver.recorders.options['background'] = True
+        prob.setup(check=False)
+        prob.run()
+
+        prob.driver.recorders.flush()
+        self.assertEqual(len(recorder.iters), 2)
+        assert_rel_error(self, recorder.iters[1]['unknowns']['x'], 10.0, 1e-15)
+        prob.cleanup()
+
+    def test_error(self):
+        recorder = SlowRecorder(fail_at=2)
+        prob = _sellar(recorder, True, max_queued=1)
+
+        with self.assertRaises(RuntimeError) as cm:
+            prob.run()
+            prob.cleanup()
+        self.assertEqual(str(cm.exception), 'disk full')
+        self.assertEqual(len(recorder.iters), 2)
+
+        # The error is only raised once.
+        prob.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
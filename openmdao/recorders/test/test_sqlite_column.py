@@ -0,0 +1,248 @@
+""" Unit tests for the SqliteColumnRecorder and reading its files."""
+from __future__ import print_function
+
+import errno
+import os
+import sqlite3
+import unittest
+from shutil import rmtree
+from tempfile import mkdtemp
+
+import numpy as np
+
+from openmdao.api import Problem, Group, IndepVarComp, \
+    ScipyOptimizer, FullFactorialDriver, SqliteRecorder, \
+    SqliteColumnRecorder, CaseReader
+from openmdao.recorders.sqlite_column_recorder import format_version
+from openmdao.recorders.sqlite_reader import SqliteCaseReader
+from openmdao.examples.paraboloid_example import Paraboloid
+from openmdao.test.exec_comp_for_test import ExecComp4Test
+from openmdao.test.util import assert_rel_error
+
+
+def _build(driver):
+    prob = Problem()
+    root = prob.root = Group()
+
+    root.add('p1', IndepVarComp('xy', np.zeros((2,))))
+    root.add('p', Paraboloid())
+    root.add('c', ExecComp4Test('z = 2.0*xy', nl_delay=0.0, xy=np.zeros(2),
+                                z=np.zeros(2)))
+
+    root.connect('p1.xy', 'p.x', src_indices=[0])
+    root.connect('p1.xy', 'p.y', src_indices=[1])
+    root.connect('p1.xy', 'c.xy')
+
+    prob.driver = driver
+    driver.add_desvar('p1.xy', lower=-10, upper=10)
+    driver.add_objective('p.f_xy')
+    return prob
+
+
+class TestSqliteColumnRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = mkdtemp()
+        self.filename = os.path.join(self.dir, "column_test")
+        self.row_filename = os.path.join(self.dir, "row_test")
+
+    def tearDown(self):
+        try:
+            rmtree(self.dir)
+        except OSError as e:
+            # If directory already deleted, keep going
+            if e.errno not in (errno.ENOENT, errno.EACCES, errno.EPERM):
+                raise e
+
+    def _run(self, driver, commit_every=100, **options):
+        prob = _build(driver)
+
+        recorder = SqliteColumnRecorder(self.filename)
+        recorder.options['commit_every'] = commit_every
+        row_recorder = SqliteRecorder(self.row_filename)
+        for rec in (recorder, row_recorder):
+            for name, val in options.items():
+                rec.options[name] = val
+            prob.driver.add_recorder(rec)
+
+        prob.setup(check=False)
+        prob['p1.xy'] = np.array([3.0, -2.0])
+        prob.run()
+        return prob, recorder
+
+    def _compare_cases(self):
+        cr = CaseReader(self.filename)
+        row_cr = CaseReader(self.row_filename)
+
+        self.assertTrue(isinstance(cr, SqliteCaseReader))
+        self.assertEqual(cr.format_version, format_version)
+        self.assertEqual(cr.list_cases(), row_cr.list_cases())
+
+        for i in range(row_cr.num_cases):
+            case, row_case = cr.get_case(i), row_cr.get_case(i)
+            self.assertEqual(case.case_id, row_case.case_id)
+            self.assertEqual(case.success, row_case.success)
+            for attr in ('parameters', 'unknowns', 'resids'):
+                vals, row_vals = getattr(case, attr), getattr(row_case, attr)
+                if row_vals is None:
+                    self.assertIsNone(vals)
+                    continue
+                self.assertEqual(sorted(vals), sorted(row_vals))
+                for name, val in row_vals.items():
+                    if isinstance(val, (float, np.ndarray)):
+                        assert_rel_error(self, vals[name], val, 1e-15)
+                    else:
+                        self.assertEqual(vals[name], val)
+
+        return cr
+
+    def test_doe(self):
+        driver = FullFactorialDriver(num_levels=4)
+        prob, recorder = self._run(driver, commit_every=5, record_params=True,
+                                   record_resids=True)
+        prob.cleanup()
+
+        cr = self._compare_cases()
+        self.assertEqual(cr.num_cases, 16)
+
+        xy = cr.get_history('p1.xy')
+        self.assertEqual(xy.shape, (16, 2))
+        assert_rel_error(self, cr.get_history('c.z'), 2.0*xy, 1e-15)
+        assert_rel_error(self, cr.get_history('p.x', 'Parameters')[:, 0],
+                         xy[:, 0], 1e-15)
+
+        # Objects are pickled.
+        self.assertEqual(cr.get_history('c.case_rank'), [0]*16)
+
+        with self.assertRaises(KeyError) as cm:
+            cr.get_history('p.x')
+        self.assertEqual(str(cm.exception), "\"'p.x' was not recorded in Unknowns.\"")
+
+    def test_optimizer_derivs(self):
+        driver = ScipyOptimizer()
+        driver.options['disp'] = False
+        prob, recorder = self._run(driver, includes=['p1.*', 'p.f_xy'])
+        prob.cleanup()
+
+        cr = self._compare_cases()
+        self.assertEqual(sorted(cr.get_case(0).unknowns), ['p.f_xy', 'p1.xy'])
+
+        row_cr = CaseReader(self.row_filename)
+        ncases = 0
+        for i in range(cr.num_cases):
+            derivs = cr.get_case(i).derivs
+            if derivs is not None:
+                ncases += 1
+                assert_rel_error(self, derivs, row_cr.get_case(i)._derivs, 1e-15)
+        self.assertTrue(ncases > 0)
+
+    def test_bulk_commits(self):
+        driver = FullFactorialDriver(num_levels=3)
+        prob, recorder = self._run(driver, commit_every=4)
+
+        # 9 cases, so one is still waiting to be written.
+        with sqlite3.connect(self.filename) as con:
+            count = con.execute('SELECT COUNT(*) FROM cases').fetchone()[0]
+        self.assertEqual(count, 8)
+
+        prob.cleanup()
+        cr = self._compare_cases()
+        self.assertEqual(cr.num_cases, 9)
+
+    def test_get_history_row_format(self):
+        driver = FullFactorialDriver(num_levels=2)
+        prob, recorder = self._run(driver)
+        prob.cleanup()
+
+        cr = CaseReader(self.filename)
+        row_cr = CaseReader(self.row_filename)
+        xy = row_cr.get_history('p1.xy')
+        self.assertEqual(xy.shape, (4, 2))
+        assert_rel_error(self, xy, cr.get_history('p1.xy'), 1e-15)
+        assert_rel_error(self, row_cr.get_history('p.f_xy'),
+                         cr.get_history('p.f_xy'), 1e-15)
+        self.assertEqual(row_cr.get_history('c.case_rank'), [0]*4)
+
+        with self.assertRaises(KeyError) as cm:
+            row_cr.get_history('p.x')
+        self.assertEqual(str(cm.exception), "\"'p.x' was not recorded in Unknowns.\"")
+
+    def test_lazy_access(self):
+        driver = FullFactorialDriver(num_levels=4)
+        prob, recorder = self._run(driver)
+        prob.cleanup()
+
+        for filename in (self.filename, self.row_filename):
+            cr = SqliteCaseReader(filename, cache_size=3)
+            keys = cr.list_cases()
+            self.assertEqual(len(cr), 16)
+
+            self.assertEqual([case.case_id for case in cr], list(keys))
+            self.assertEqual([case.case_id for case in cr[3:7]], list(keys[3:7]))
+            self.assertEqual([case.case_id for case in cr[::-5]], list(keys[::-5]))
+            self.assertEqual(cr[20:], [])
+            self.assertEqual(cr[-1].case_id, keys[-1])
+            self.assertEqual(cr[keys[2]].case_id, keys[2])
+            with self.assertRaises(IndexError):
+                cr[16]
+            with self.assertRaises(KeyError):
+                cr['rank0:nope|1']
+
+            # Coordinate prefixes match whole iteration numbers, so '1'
+            # doesn't pick up '10' through '16'.
+            prefix = keys[0].rsplit('|', 1)[0]
+            self.assertEqual(len(list(cr.iter_cases(prefix))), 16)
+            cases = list(cr.iter_cases(prefix + '|1'))
+            self.assertEqual([case.case_id for case in cases], [keys[1]])
+            assert_rel_error(self, cr.get_history('p1.xy', coord_prefix=prefix + '|1'),
+                             cr.get_history('p1.xy')[1:2], 1e-15)
+
+            # Recently read cases are kept, up to the cache size.
+            self.assertEqual(len(cr._cache), 3)
+            self.assertTrue(cr.get_case(keys[1]) is cases[0])
+            case = cr.get_case(4)
+            self.assertTrue(cr[keys[4]] is case)
+            for i in range(3):
+                cr.get_case(i)
+            self.assertFalse(cr.get_case(4) is case)
+
+    def test_index_large_file(self):
+        driver = FullFactorialDriver(num_levels=2)
+        prob, recorder = self._run(driver)
+        prob.cleanup()
+
+        # Pad the file out to a long history of cases.
+        ncases = 200000
+        with sqlite3.connect(self.filename) as con:
+            con.executemany('INSERT INTO cases VALUES (?, ?, 0.0, 1, "")',
+                            (('%d' % i, 'rank0:Pad|%d' % i)
+                             for i in range(4, ncases)))
+
+        cr = SqliteCaseReader(self.filename)
+        self.assertEqual(len(cr), ncases)
+
+        # Count the work sqlite does, in units of 1000 virtual machine steps.
+        steps = []
+        connect = cr._connect
+        def counting_connect():
+            con = connect()
+            con.thing.set_progress_handler(lambda: steps.append(1), 1000)
+            return con
+        cr._connect = counting_connect
+
+        keys = cr._case_keys
+        self.assertEqual(keys[ncases - 2], 'rank0:Pad|%d' % (ncases - 2))
+        self.assertEqual(keys[-1], 'rank0:Pad|%d' % (ncases - 1))
+        self.assertEqual(keys[ncases - 3:ncases - 1],
+                         ('rank0:Pad|%d' % (ncases - 3), 'rank0:Pad|%d' % (ncases - 2)))
+
+        # Stepping over the rows before the end would take far more.
+        self.assertTrue(len(steps) < 50, len(steps))
+
+        # A loop over the indices reads a page of keys at a time.
+        self.assertEqual([keys[i] for i in range(ncases - 1500, ncases)],
+                         ['rank0:Pad|%d' % i for i in range(ncases - 1500, ncases)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,12 @@
 """ OpenMDAO LinearSolver that explicitly solves the linear system using
-linalg.solve or scipy LU factor/solve. Inherits from MultLinearSolver just
-for the mult function."""
+linalg.solve or scipy LU factor/solve, or their scipy.sparse counterparts.
+Inherits from MultLinearSolver just for the mult function."""
 
 from collections import OrderedDict
 
 import numpy as np
 from scipy.linalg import lu_factor, lu_solve
+from scipy.sparse.linalg import splu, spsolve
 
 from openmdao.solvers.solver_base import MultLinearSolver
 
@@ -29,9 +30,16 @@ class DirectSolver(MultLinearSolver):
         Jacobian by calling apply_linear with columns of identity. Select
         'assemble' to build the Jacobian by taking the calculated Jacobians in
         each component and placing them directly into a clean identity matrix.
+        Select 'sparse' to assemble the component Jacobians into a
+        scipy.sparse matrix, which is much cheaper for large models.
     options['solve_method'] : str('LU')
         Solution method, either 'solve' for linalg.solve, or 'LU' for
-        linalg.lu_factor and linalg.lu_solve.
+        linalg.lu_factor and linalg.lu_solve. When jacobian_method is
+        'sparse', these become scipy.sparse.linalg.spsolve and
+        scipy.sparse.linalg.splu.
+    options['block_size'] : int(100)
+        Maximum number of right-hand sides that calc_gradient passes to a
+        single solve.
     """
 
     def __init__(self):
@@ -43,21 +51,35 @@ class DirectSolver(MultLinearSolver):
                        "let OpenMDAO determine the best mode.",
                        lock_on_setup=True)
 
-        self.options.add_option('jacobian_method', 'MVP', values=['MVP', 'assemble'],
+        self.options.add_option('jacobian_method', 'MVP', values=['MVP', 'assemble', 'sparse'],
                                 desc="Method to assemble the jacobian to solve. " +
                                 "Select 'MVP' to build the Jacobian by calling " +
                                 "apply_linear with columns of identity. Select " +
                                 "'assemble' to build the Jacobian by taking the " +
                                 "calculated Jacobians in each component and placing " +
-                                "them directly into a clean identity matrix.")
+                                "them directly into a clean identity matrix. " +
+                                "Select 'sparse' to assemble them into a " +
+                                "scipy.sparse matrix.")
         self.options.add_option('solve_method', 'LU', values=['LU', 'solve'],
                                 desc="Solution method, either 'solve' for linalg.solve, " +
                                 "or 'LU' for linalg.lu_factor and linalg.lu_solve.")
+        self.options.add_option('block_size', 100, lower=1,
+                                desc="Maximum number of right-hand sides that " +
+                                "calc_gradient passes to a single solve.")
+
+        # What we support
+        self.supports['multiple_rhs'] = True
 
         self.jacobian = None
         self.lup = None
         self.mode = None
 
+        # Column ordering from the last sparse symbolic factorization, and the
+        # assembly plan (i.e., sparsity structure) that it was computed for.
+        self._perm_c = None
+        self._factor_plan = None
+        self._permuted = False
+
     def setup(self, system):
         """ Initialization. Allocate Jacobian and set up some helpers.
 
@@ -74,11 +96,18 @@ class DirectSolver(MultLinearSolver):
         # Note, we solve a slightly modified version of the unified
         # derivatives equations in OpenMDAO.
         # (dR/du) * (du/dr) = -I
-        u_vec = system.unknowns
-        self.jacobian = -np.eye(u_vec.vec.size)
+        # The sparse jacobian is allocated by the system during assembly.
+        if self.options['jacobian_method'] == 'assemble':
+            u_vec = system.unknowns
+            self.jacobian = -np.eye(u_vec.vec.size)
 
         # Clear the index cache
         system._icache = {}
+        system._icache_src_idxs = {}
+        system._sparse_plans = {}
+        self._perm_c = None
+        self._factor_plan = None
+        self._permuted = False
 
     def solve(self, rhs_mat, system, mode):
         """ Solves the linear system for the problem in self.system. The
@@ -89,7 +118,7 @@ class DirectSolver(MultLinearSolver):
         rhs_mat : dict of ndarray
             Dictionary containing one ndarry per top level quantity of
             interest. Each array contains the right-hand side for the linear
-            solve.
+            solve, or a 2D array with one right-hand side per column.
 
         system : `System`
             Parent `System` object.
@@ -120,20 +149,62 @@ class DirectSolver(MultLinearSolver):
                     self.setup(system)
                 self.mode = mode
 
-                self.jacobian, _ = system.assemble_jacobian(mode=mode, method=method,
-                                                            mult=self.mult)
+                # MVP builds the Jacobian one column of identity at a time.
+                with system._column_vecs(voi):
+                    self.jacobian, _ = system.assemble_jacobian(mode=mode, method=method,
+                                                                mult=self.mult)
                 system._jacobian_changed = False
 
                 if self.options['solve_method'] == 'LU':
-                    self.lup = lu_factor(self.jacobian)
+                    if method == 'sparse':
+                        self._sparse_factor(system, mode)
+                    else:
+                        self.lup = lu_factor(self.jacobian)
 
             if self.options['solve_method'] == 'LU':
-                deriv = lu_solve(self.lup, rhs)
+                if self.options['jacobian_method'] == 'sparse':
+                    deriv = self.lup.solve(rhs)
+                    if self._permuted:
+                        deriv[self._perm_c] = deriv.copy()
+                else:
+                    deriv = lu_solve(self.lup, rhs)
+            elif self.options['jacobian_method'] == 'sparse':
+                deriv = spsolve(self.jacobian, rhs)
             else:
                 deriv = np.linalg.solve(self.jacobian, rhs)
 
             self.system = None
-            sol_buf[voi] = deriv
+            sol_buf[voi] = deriv.reshape(rhs.shape)
 
         return sol_buf
 
+
+    def _sparse_factor(self, system, mode):
+        """ LU factor the sparse Jacobian. The fill-reducing column ordering
+        is only computed when the sparsity structure changes. Otherwise, the
+        columns are permuted up front and only the numeric factorization is
+        redone.
+
+        Args
+        ----
+        system : `System`
+            Parent `System` object.
+
+        mode : string
+            Derivative mode, can be 'fwd' or 'rev'.
+        """
+        plan = system._sparse_plans.get(mode)
+
+        if plan is None or plan is not self._factor_plan:
+            self.lup = splu(self.jacobian)
+            self._factor_plan = plan
+            self._permuted = False
+
+            # Save the ordering for reuse. Solutions of the column-permuted
+            # system need to be scattered back by this permutation.
+            self._perm_c = np.argsort(self.lup.perm_c)
+
+        else:
+            self.lup = splu(self.jacobian[:, self._perm_c],
+                            permc_spec='NATURAL')
+            self._permuted = True
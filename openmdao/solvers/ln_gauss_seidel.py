@@ -5,6 +5,7 @@ from __future__ import print_function
 from six import iteritems, itervalues
 from collections import OrderedDict
 
+from openmdao.core.mpi_wrap import MPI
 from openmdao.core.system import AnalysisError
 from openmdao.solvers.solver_base import LinearSolver
 
@@ -28,6 +29,9 @@ class LinearGaussSeidel(LinearSolver):
         Derivative calculation mode, set to 'fwd' for forward mode, 'rev' for reverse mode, or 'auto' to let OpenMDAO determine the best mode.
     options['rtol'] :  float(1e-10)
         Absolute convergence tolerance.
+    options['block_size'] : int(100)
+        Maximum number of right-hand sides that calc_gradient passes to a
+        single solve.
 
     """
 
@@ -53,6 +57,13 @@ class LinearGaussSeidel(LinearSolver):
                               "may increase performance but will use "
                               "more memory.",
                         lock_on_setup=True)
+        opt.add_option('block_size', 100, lower=1,
+                       desc="Maximum number of right-hand sides that " +
+                       "calc_gradient passes to a single solve.")
+
+        # Blocks of right-hand sides need 2D derivative vectors, which PETSc
+        # vectors can't hold.
+        self.supports['multiple_rhs'] = MPI is None
 
         self.print_name = 'LN_GS'
 
@@ -79,7 +90,7 @@ class LinearGaussSeidel(LinearSolver):
         rhs_mat : dict of ndarray
             Dictionary containing one ndarry per top level quantity of
             interest. Each array contains the right-hand side for the linear
-            solve.
+            solve, or a 2D array with one right-hand side per column.
 
         system : `System`
             Parent `System` object.
@@ -91,6 +102,13 @@ class LinearGaussSeidel(LinearSolver):
         -------
         dict of ndarray : Solution vectors
         """
+        # A 2D rhs holds one right-hand side per column. They are all carried
+        # through the transfers and the subsystems at once.
+        with system._block_vecs(rhs_mat):
+            return self._iterate(rhs_mat, system, mode)
+
+    def _iterate(self, rhs_mat, system, mode):
+        """ Runs the Gauss Seidel iterations for `solve`."""
 
         dumat = system.dumat
         drmat = system.drmat
@@ -152,7 +170,7 @@ class LinearGaussSeidel(LinearSolver):
                         dpmat[voi].vec[:] = 0.0
 
                     with sub._dircontext:
-                        sub.solve_linear(sub.dumat, sub.drmat, vois, mode=mode)
+                        sub._sys_solve_linear(sub.dumat, sub.drmat, vois, mode=mode)
 
                     # for voi in vois:
                     #    print('post solve', dpmat[voi].vec, dumat[voi].vec, drmat[voi].vec)
@@ -185,7 +203,7 @@ class LinearGaussSeidel(LinearSolver):
                         continue
 
                     with sub._dircontext:
-                        sub.solve_linear(sub.dumat, sub.drmat, vois, mode=mode)
+                        sub._sys_solve_linear(sub.dumat, sub.drmat, vois, mode=mode)
                     #for voi in vois:
                         #print('post solve', dpmat[voi].vec, dumat[voi].vec, drmat[voi].vec)
 
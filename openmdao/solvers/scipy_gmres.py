@@ -5,6 +5,7 @@ from __future__ import print_function
 from six import iteritems
 
 import numpy as np
+from scipy.linalg import solve_triangular
 from scipy.sparse.linalg import gmres, LinearOperator
 
 from openmdao.core.system import AnalysisError
@@ -35,6 +36,9 @@ class ScipyGMRES(MultLinearSolver):
     options['restart'] :  int(20)
         Number of iterations between restarts. Larger values increase iteration cost,
         but may be necessary for convergence
+    options['block_size'] : int(100)
+        Maximum number of right-hand sides that calc_gradient passes to a
+        single solve.
     """
 
     def __init__(self):
@@ -53,6 +57,11 @@ class ScipyGMRES(MultLinearSolver):
                        desc='Number of iterations between restarts. Larger values ' +
                        'increase iteration cost, but may be necessary for convergence',
                        lock_on_setup=True)
+        opt.add_option('block_size', 100, lower=1,
+                       desc="Maximum number of right-hand sides that " +
+                       "calc_gradient passes to a single solve.")
+
+        self.supports['multiple_rhs'] = True
 
         # These are defined whenever we call solve to provide info we need in
         # the callback.
@@ -101,7 +110,7 @@ class ScipyGMRES(MultLinearSolver):
         rhs_mat : dict of ndarray
             Dictionary containing one ndarry per top level quantity of
             interest. Each array contains the right-hand side for the linear
-            solve.
+            solve, or a 2D array with one right-hand side per column.
 
         system : `System`
             Parent `System` object.
@@ -121,30 +130,36 @@ class ScipyGMRES(MultLinearSolver):
         unknowns_mat = OrderedDict()
         for voi, rhs in iteritems(rhs_mat):
 
-            # Scipy can only handle one right-hand-side at a time.
             self.voi = voi
+            self.system = system
+            self.iter_count = 0
 
-            n_edge = len(rhs)
-            A = LinearOperator((n_edge, n_edge),
-                               matvec=self.mult,
-                               dtype=float)
+            if rhs.ndim == 2:
+                # Scipy can only handle one right-hand-side at a time, so
+                # blocks go through our own GMRES with 2D derivative vectors.
+                with system._block_vecs({voi: rhs}):
+                    d_unknowns, info = self._block_gmres(rhs)
 
-            # Support a preconditioner
-            if self.preconditioner:
-                M = LinearOperator((n_edge, n_edge),
-                                   matvec=self._precon,
-                                   dtype=float)
             else:
-                M = None
+                n_edge = len(rhs)
+                A = LinearOperator((n_edge, n_edge),
+                                   matvec=self.mult,
+                                   dtype=float)
 
-            # Call GMRES to solve the linear system
-            self.system = system
-            self.iter_count = 0
-            d_unknowns, info = gmres(A, rhs, M=M,
-                                     tol=options['atol'],
-                                     maxiter=options['maxiter'],
-                                     restart=options['restart'],
-                                     callback=self.monitor)
+                # Support a preconditioner
+                if self.preconditioner:
+                    M = LinearOperator((n_edge, n_edge),
+                                       matvec=self._precon,
+                                       dtype=float)
+                else:
+                    M = None
+
+                # Call GMRES to solve the linear system
+                d_unknowns, info = gmres(A, rhs, M=M,
+                                         tol=options['atol'],
+                                         maxiter=options['maxiter'],
+                                         restart=options['restart'],
+                                         callback=self.monitor)
             self.system = None
 
             # Final residual print if you only want the last one
@@ -179,6 +194,102 @@ class ScipyGMRES(MultLinearSolver):
 
         return unknowns_mat
 
+    def _block_gmres(self, rhs):
+        """ Restarted GMRES for a block of right-hand sides. Every column has
+        its own Krylov space, but they are built side by side so that each
+        iteration does a single product with the whole block. A column stops
+        updating once its residual is below options['atol'] times the norm of
+        its right-hand side. The preconditioner, if any, is applied on the
+        right.
+
+        Args
+        ----
+        rhs : ndarray
+            2D array with one right-hand side per column.
+
+        Returns
+        -------
+        ndarray : Solution block
+
+        int : 0 if all columns converged, else the number of iterations
+        """
+        options = self.options
+        n_edge, nrhs = rhs.shape
+        restart = max(1, min(options['restart'], n_edge))
+
+        if self.preconditioner:
+            precon = lambda arg: self._precon(arg).copy()
+        else:
+            precon = lambda arg: arg
+
+        tol = options['atol'] * np.linalg.norm(rhs, axis=0)
+        x = np.zeros(rhs.shape)
+        res = rhs.copy()
+
+        while True:
+            beta = np.linalg.norm(res, axis=0)
+            active = beta > tol
+            if not active.any():
+                return x, 0
+            if self.iter_count >= options['maxiter']:
+                break
+
+            V = np.zeros((restart + 1, n_edge, nrhs))
+            H = np.zeros((restart + 1, restart, nrhs))
+            cs = np.zeros((restart, nrhs))
+            sn = np.zeros((restart, nrhs))
+            g = np.zeros((restart + 1, nrhs))
+            g[0] = beta
+            V[0] = res / np.where(active, beta, 1.0)
+            steps = np.zeros(nrhs, dtype=int)
+
+            for j in range(restart):
+                w = self.mult(precon(V[j])).copy()
+
+                # Modified Gram-Schmidt, one column per right-hand side.
+                for i in range(j + 1):
+                    H[i, j] = np.einsum('ij,ij->j', V[i], w)
+                    w -= H[i, j] * V[i]
+                H[j + 1, j] = np.linalg.norm(w, axis=0)
+                V[j + 1] = w / np.where(H[j + 1, j] > 0.0, H[j + 1, j], 1.0)
+
+                # Givens rotations reduce H to upper triangular form.
+                for i in range(j):
+                    hij = cs[i] * H[i, j] + sn[i] * H[i + 1, j]
+                    H[i + 1, j] = cs[i] * H[i + 1, j] - sn[i] * H[i, j]
+                    H[i, j] = hij
+                denom = np.hypot(H[j, j], H[j + 1, j])
+
+                # A zero column means the Krylov space can't grow any more,
+                # so the column keeps what it has so far.
+                active &= denom > 0.0
+                denom[denom == 0.0] = 1.0
+
+                cs[j] = H[j, j] / denom
+                sn[j] = H[j + 1, j] / denom
+                H[j, j] = cs[j] * H[j, j] + sn[j] * H[j + 1, j]
+                H[j + 1, j] = 0.0
+                g[j + 1] = -sn[j] * g[j]
+                g[j] *= cs[j]
+
+                steps[active] = j + 1
+                active &= np.abs(g[j + 1]) > tol
+                self.monitor(np.where(steps > 0, g[j + 1], 0.0))
+
+                if not active.any() or self.iter_count >= options['maxiter']:
+                    break
+
+            update = np.zeros(rhs.shape)
+            for col in np.nonzero(steps)[0]:
+                m = steps[col]
+                y = solve_triangular(H[:m, :m, col], g[:m, col])
+                update[:, col] = V[:m, :, col].T.dot(y)
+
+            x += precon(update)
+            res = rhs - self.mult(x)
+
+        return x, max(self.iter_count, 1)
+
     def _precon(self, arg):
         """ GMRES Callback: applies a preconditioner by calling
         solve_linear on this system's children.
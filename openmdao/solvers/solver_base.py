@@ -223,6 +223,12 @@ class LinearSolver(SolverBase):
         # Solver needs to communicate local relevancy into calls to sys_apply_linear.
         self.rel_inputs = None
 
+        # What this solver supports. Solvers that support multiple_rhs can
+        # take a 2D rhs with one right-hand side per column, and must define
+        # a 'block_size' option giving the most columns to pass at once.
+        self.supports = OptionsDictionary(read_only=True)
+        self.supports.add_option('multiple_rhs', False)
+
     def add_recorder(self, recorder):
         """Appends the given recorder to this solver's list of recorders.
 
@@ -772,5 +772,275 @@ class TestDirectSolverAssemble(unittest.TestCase):
         J = p.calc_gradient(['p.x'], ['comp.y1'], mode='fwd')
         assert_rel_error(self, J[0][0], 1.5, 1e-6)
 
+
+class TestDirectSolverSparse(unittest.TestCase):
+    """ Tests the DirectSolver using the method that assembles a sparse Jacobian."""
+
+    def test_simple_matvec(self):
+        group = Group()
+        group.add('x_param', IndepVarComp('x', 1.0), promotes=['*'])
+        group.add('mycomp', SimpleCompDerivMatVec(), promotes=['x', 'y'])
+
+        prob = Problem()
+        prob.root = group
+        prob.root.ln_solver = DirectSolver()
+        prob.root.ln_solver.options['jacobian_method'] = 'sparse'
+        prob.setup(check=False)
+        prob.run()
+
+        with self.assertRaises(RuntimeError) as cm:
+            J = prob.calc_gradient(['x'], ['y'], mode='fwd', return_format='dict')
+
+        expected_msg = "The 'assemble' jacobian_method is not supported when " + \
+                       "'apply_linear' is used on a component (mycomp)."
+
+        self.assertEqual(str(cm.exception), expected_msg)
+
+    def test_array2D(self):
+        group = Group()
+        group.add('x_param', IndepVarComp('x', np.ones((2, 2))), promotes=['*'])
+        group.add('mycomp', ArrayComp2D(), promotes=['x', 'y'])
+
+        prob = Problem()
+        prob.root = group
+        prob.root.ln_solver = DirectSolver()
+        prob.root.ln_solver.options['jacobian_method'] = 'sparse'
+        prob.setup(check=False)
+        prob.run()
+
+        J = prob.calc_gradient(['x'], ['y'], mode='fwd', return_format='dict')
+        Jbase = prob.root.mycomp._jacobian_cache
+        diff = np.linalg.norm(J['y']['x'] - Jbase['y', 'x'])
+        assert_rel_error(self, diff, 0.0, 1e-8)
+
+        J = prob.calc_gradient(['x'], ['y'], mode='rev', return_format='dict')
+        diff = np.linalg.norm(J['y']['x'] - Jbase['y', 'x'])
+        assert_rel_error(self, diff, 0.0, 1e-8)
+
+    def test_array2D_no_decompose(self):
+        group = Group()
+        group.add('x_param', IndepVarComp('x', np.ones((2, 2))), promotes=['*'])
+        group.add('mycomp', ArrayComp2D(), promotes=['x', 'y'])
+
+        prob = Problem()
+        prob.root = group
+        prob.root.ln_solver = DirectSolver()
+        prob.root.ln_solver.options['jacobian_method'] = 'sparse'
+        prob.root.ln_solver.options['solve_method'] = 'solve'
+        prob.setup(check=False)
+        prob.run()
+
+        J = prob.calc_gradient(['x'], ['y'], mode='fwd', return_format='dict')
+        Jbase = prob.root.mycomp._jacobian_cache
+        diff = np.linalg.norm(J['y']['x'] - Jbase['y', 'x'])
+        assert_rel_error(self, diff, 0.0, 1e-8)
+
+        J = prob.calc_gradient(['x'], ['y'], mode='rev', return_format='dict')
+        diff = np.linalg.norm(J['y']['x'] - Jbase['y', 'x'])
+        assert_rel_error(self, diff, 0.0, 1e-8)
+
+    def test_converge_diverge_groups(self):
+
+        prob = Problem()
+        prob.root = ConvergeDivergeGroups()
+        prob.root.ln_solver = DirectSolver()
+        prob.root.ln_solver.options['jacobian_method'] = 'sparse'
+        prob.setup(check=False)
+        prob.run()
+
+        indep_list = ['p.x']
+        unknown_list = ['comp7.y1']
+
+        J = prob.calc_gradient(indep_list, unknown_list, mode='fwd', return_format='dict')
+        assert_rel_error(self, J['comp7.y1']['p.x'][0][0], -40.75, 1e-6)
+
+        J = prob.calc_gradient(indep_list, unknown_list, mode='rev', return_format='dict')
+        assert_rel_error(self, J['comp7.y1']['p.x'][0][0], -40.75, 1e-6)
+
+        # The sparse jacobian should match the dense assembled one.
+        Jsparse, _ = prob.root.assemble_jacobian(method='sparse')
+        Jdense, _ = prob.root.assemble_jacobian(method='assemble')
+        diff = np.linalg.norm(Jsparse.toarray() - Jdense)
+        assert_rel_error(self, diff, 0.0, 1e-12)
+
+    def test_sellar_derivs(self):
+
+        prob = Problem()
+        prob.root = SellarStateConnection()
+        prob.root.ln_solver = DirectSolver()
+        prob.root.ln_solver.options['jacobian_method'] = 'sparse'
+
+        prob.root.nl_solver.options['atol'] = 1e-12
+        prob.setup(check=False)
+        prob.run()
+
+        # Just make sure we are at the right answer
+        assert_rel_error(self, prob['y1'], 25.58830273, .00001)
+        assert_rel_error(self, prob['d1.y2'], 12.05848819, .00001)
+
+        indep_list = ['x', 'z']
+        unknown_list = ['obj', 'con1', 'con2']
+
+        Jbase = {}
+        Jbase['con1'] = {}
+        Jbase['con1']['x'] = -0.98061433
+        Jbase['con1']['z'] = np.array([-9.61002285, -0.78449158])
+        Jbase['con2'] = {}
+        Jbase['con2']['x'] = 0.09692762
+        Jbase['con2']['z'] = np.array([1.94989079, 1.0775421 ])
+        Jbase['obj'] = {}
+        Jbase['obj']['x'] = 2.98061392
+        Jbase['obj']['z'] = np.array([9.61001155, 1.78448534])
+
+        J = prob.calc_gradient(indep_list, unknown_list, mode='fwd', return_format='dict')
+        for key1, val1 in Jbase.items():
+            for key2, val2 in val1.items():
+                assert_rel_error(self, J[key1][key2], val2, .00001)
+
+        J = prob.calc_gradient(indep_list, unknown_list, mode='rev', return_format='dict')
+        for key1, val1 in Jbase.items():
+            for key2, val2 in val1.items():
+                assert_rel_error(self, J[key1][key2], val2, .00001)
+
+    def test_sellar_derivs_reuse_structure(self):
+
+        prob = Problem()
+        prob.root = SellarStateConnection()
+        prob.root.ln_solver = DirectSolver()
+        prob.root.ln_solver.options['jacobian_method'] = 'sparse'
+
+        prob.root.nl_solver.options['atol'] = 1e-12
+        prob.setup(check=False)
+        prob.run()
+
+        indep_list = ['x', 'z']
+        unknown_list = ['obj', 'con1', 'con2']
+
+        J1 = prob.calc_gradient(indep_list, unknown_list, mode='fwd', return_format='dict')
+        plan = prob.root._sparse_plans['fwd']
+
+        # Second linearization only refreshes the values and the numeric
+        # factorization.
+        prob.run()
+        J2 = prob.calc_gradient(indep_list, unknown_list, mode='fwd', return_format='dict')
+        self.assertTrue(prob.root._sparse_plans['fwd'] is plan)
+        self.assertTrue(prob.root.ln_solver._permuted)
+
+        for key1, val1 in J1.items():
+            for key2, val2 in val1.items():
+                assert_rel_error(self, J2[key1][key2], val2, 1e-10)
+
+    def test_implicit_solve_linear(self):
+
+        p = Problem()
+        p.root = Group()
+
+        dvars = ( ('a', 3.), ('b', 10.))
+        p.root.add('desvars', IndepVarComp(dvars), promotes=['a', 'b'])
+
+        sg = p.root.add('sg', Group(), promotes=["*"])
+        sg.add('si', SimpleImplicitSL(), promotes=['a', 'b', 'x'])
+
+        p.root.add('func', ExecComp('f = 2*x0+a'), promotes=['f', 'x0', 'a'])
+        p.root.connect('x', 'x0', src_indices=[1])
+
+        p.driver.add_objective('f')
+        p.driver.add_desvar('a')
+
+        p.root.nl_solver = Newton()
+        p.root.nl_solver.options['rtol'] = 1e-10
+        p.root.nl_solver.options['atol'] = 1e-10
+        p.root.ln_solver = DirectSolver()
+        p.root.ln_solver.options['jacobian_method'] = 'sparse'
+
+        p.setup(check=False)
+        p['x'] = np.array([1.5, 2.])
+
+        p.run()
+        J = p.calc_gradient(['a'], ['f'], mode='fwd')
+        assert_rel_error(self, J[0][0], 1.57735, 1e-6)
+
+        J = p.calc_gradient(['a'], ['f'], mode='rev')
+        assert_rel_error(self, J[0][0], 1.57735, 1e-6)
+
+    def test_unrel_var_in_Jac(self):
+
+        p = Problem()
+        root = p.root = Group()
+        root.add('p', IndepVarComp('x', 4.0))
+        root.add('comp', ExecComp(['y1 = 1.5*x1 + 2.0*x2', 'y2 = 3.0*x1 - x2']))
+
+        root.connect('p.x', 'comp.x1')
+        p.driver.add_objective('comp.y1')
+        p.driver.add_desvar('p.x')
+
+        p.root.ln_solver = DirectSolver()
+        p.root.ln_solver.options['jacobian_method'] = 'sparse'
+
+        p.setup(check=False)
+        p.run()
+
+        J = p.calc_gradient(['p.x'], ['comp.y1'], mode='fwd')
+        assert_rel_error(self, J[0][0], 1.5, 1e-6)
+
+
+class TestDirectSolverMultipleRHS(unittest.TestCase):
+
+    def _build(self, method, solve_method='LU', block_size=100):
+        group = Group()
+        group.add('x_param', IndepVarComp('x', np.ones((2, 2))), promotes=['*'])
+        group.add('mycomp', ArrayComp2D(), promotes=['x', 'y'])
+
+        prob = Problem()
+        prob.root = group
+        prob.root.ln_solver = DirectSolver()
+        prob.root.ln_solver.options['jacobian_method'] = method
+        prob.root.ln_solver.options['solve_method'] = solve_method
+        prob.root.ln_solver.options['block_size'] = block_size
+        prob.setup(check=False)
+        prob.run()
+
+        # Count the solves.
+        ln_solver = prob.root.ln_solver
+        solve = ln_solver.solve
+        ln_solver.count = 0
+
+        def counted(rhs_mat, system, mode):
+            ln_solver.count += 1
+            return solve(rhs_mat, system, mode)
+
+        ln_solver.solve = counted
+        return prob
+
+    def test_block_solves(self):
+        for method in ('MVP', 'assemble', 'sparse'):
+            for solve_method in ('LU', 'solve'):
+                for block_size, nsolves in ((100, 1), (3, 2), (1, 4)):
+                    prob = self._build(method, solve_method, block_size)
+
+                    for mode in ('fwd', 'rev'):
+                        prob.root.ln_solver.count = 0
+                        J = prob.calc_gradient(['x'], ['y'], mode=mode,
+                                               return_format='dict')
+                        Jbase = prob.root.mycomp._jacobian_cache['y', 'x']
+                        assert_rel_error(self, J['y']['x'], Jbase, 1e-8)
+                        self.assertEqual(prob.root.ln_solver.count, nsolves)
+
+                        J = prob.calc_gradient(['x'], ['y'], mode=mode)
+                        assert_rel_error(self, J, Jbase, 1e-8)
+
+    def test_inactives(self):
+        prob = self._build('sparse')
+        Jbase = prob.calc_gradient(['x'], ['y'], mode='rev')
+
+        prob.root.ln_solver.count = 0
+        J = prob.calc_gradient(['x'], ['y'], mode='rev', return_format='dict',
+                               inactives={'y': [1, 2]})
+        self.assertEqual(prob.root.ln_solver.count, 1)
+
+        Jbase[1:3, :] = 0.0
+        assert_rel_error(self, J['y']['x'], Jbase, 1e-8)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,14 +1,19 @@
 """ Surrogate model based on Kriging. """
 
+from multiprocessing import Pool
+
 import numpy as np
 import scipy.linalg as linalg
 from scipy.optimize import minimize
-from six.moves import zip, range
+from six.moves import range
 
 from openmdao.surrogate_models.surrogate_model import SurrogateModel
 
 MACHINE_EPSILON = np.finfo(np.double).eps
 
+# Bounds of the log of the correlation coefficients during training.
+THETA_BOUNDS = (np.log(1e-5), np.log(1e5))
+
 
 class KrigingSurrogate(SurrogateModel):
     """Surrogate Modeling method based on the simple Kriging interpolation.
@@ -24,11 +29,28 @@ class KrigingSurrogate(SurrogateModel):
     eval_rmse : bool
         Flag indicating whether the Root Mean Squared Error (RMSE) should be computed. Set to False
         by default.
+    method : str, optional
+        How the correlation matrix is factored during training. 'svd' (the default) uses a
+        regularized pseudo-inverse. 'cholesky' computes the pairwise distances once, uses a
+        Cholesky factorization (adding to the nugget if it fails) and gives the optimizer the
+        analytic gradient of the likelihood, which is much faster for many training points.
+    num_restarts : int, optional
+        Number of extra hyper-parameter optimizations, started from random points, when
+        method is 'cholesky'. The best result is kept. Default: 0
+    num_procs : int, optional
+        Number of processes used to run the hyper-parameter optimizations. Default: 1
     """
 
-    def __init__(self, nugget=10. * MACHINE_EPSILON, eval_rmse=False):
+    _option_names = ('nugget', 'eval_rmse', 'method', 'num_restarts')
+
+    def __init__(self, nugget=10. * MACHINE_EPSILON, eval_rmse=False, method='svd',
+                 num_restarts=0, num_procs=1):
         super(KrigingSurrogate, self).__init__()
 
+        if method not in ('svd', 'cholesky'):
+            raise ValueError("KrigingSurrogate method must be 'svd' or 'cholesky', "
+                             "not '{0}'.".format(method))
+
         self.n_dims = 0       # number of independent
         self.n_samples = 0       # number of training points
         self.thetas = np.zeros(0)
@@ -37,6 +59,7 @@ class KrigingSurrogate(SurrogateModel):
         self.alpha = np.zeros(0)
         self.L = np.zeros(0)
         self.sigma2 = np.zeros(0)
+        self.U = self.S_inv = self.Vh = None
 
         # Normalized Training Values
         self.X = np.zeros(0)
@@ -47,6 +70,24 @@ class KrigingSurrogate(SurrogateModel):
         self.Y_std = np.zeros(0)
 
         self.eval_rmse = eval_rmse
+        self.method = method
+
+        # Largest number of entries in the arrays of correlations between evaluation and training
+        # points. Bigger batches of points are evaluated in chunks.
+        self.max_work_size = 2**20
+        self._buffers = {}
+        self.num_restarts = num_restarts
+        self.num_procs = num_procs
+
+    def __getstate__(self):
+        # The work buffers are only a cache.
+        state = super(KrigingSurrogate, self).__getstate__()
+        del state['_buffers']
+        return state
+
+    def __setstate__(self, state):
+        super(KrigingSurrogate, self).__setstate__(state)
+        self._buffers = {}
 
     def train(self, x, y):
         """
@@ -89,6 +130,10 @@ class KrigingSurrogate(SurrogateModel):
         self.X_mean, self.X_std = X_mean, X_std
         self.Y_mean, self.Y_std = Y_mean, Y_std
 
+        if self.method == 'cholesky':
+            self._train_cholesky()
+            return
+
         def _calcll(thetas):
             """ Callback function"""
             loglike = self._calculate_reduced_likelihood_params(np.exp(thetas))[0]
@@ -111,6 +156,43 @@ class KrigingSurrogate(SurrogateModel):
         self.Vh = params['Vh']
         self.sigma2 = params['sigma2']
 
+    def _train_cholesky(self):
+        """ Finds the correlation coefficients that maximize the likelihood, using Cholesky
+        factorizations of the correlation matrix and the analytic gradient."""
+        X, Y = self.X, self.Y
+        rows, cols = np.triu_indices(self.n_samples, 1)
+        data = (np.square(X[rows] - X[cols]), rows, cols, Y, self.nugget)
+
+        bounds = [THETA_BOUNDS] * self.n_dims
+        starts = [1e-1*np.ones(self.n_dims)]
+        rng = np.random.RandomState(0)
+        for i in range(self.num_restarts):
+            starts.append(rng.uniform(np.log(1e-3), np.log(1e3), self.n_dims))
+
+        if self.num_procs > 1 and len(starts) > 1:
+            pool = Pool(min(self.num_procs, len(starts)), initializer=_init_pool,
+                        initargs=(data,))
+            try:
+                results = pool.map(_pool_minimize, [(x0, bounds) for x0 in starts])
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [_minimize_likelihood(x0, data, bounds) for x0 in starts]
+
+        successes = [res for res in results if res.success]
+        if not successes:
+            raise ValueError('Kriging Hyper-parameter optimization failed: {0}'.format(
+                results[0].message))
+        best = min(successes, key=lambda res: res.fun)
+
+        self.thetas = np.exp(best.x)
+        L, alpha, sigma2 = _cholesky_likelihood(best.x, *data)[1:]
+        self.L = L
+        self.alpha = alpha
+        self.sigma2 = sigma2 * np.square(self.Y_std)
+        self.U = self.S_inv = self.Vh = None
+
     def _calculate_reduced_likelihood_params(self, thetas=None):
         """
         Calculates a quantity with the same maximum location as the log-likelihood for a given theta.
@@ -157,6 +239,72 @@ class KrigingSurrogate(SurrogateModel):
 
         return reduced_likelihood, params
 
+    def update(self, x, y):
+        """
+        Adds training points without optimizing the correlation coefficients again. The
+        Cholesky factor of the correlation matrix is extended with the rows of the new points,
+        which costs O(n^2) per point instead of a full training. The normalization of the data
+        is not changed. A model trained with the 'svd' method is factored once with the current
+        coefficients first.
+
+        Args
+        ----
+        x : array-like
+            New training input locations
+
+        y : array-like
+            Model responses at the new inputs.
+
+        Returns
+        -------
+        bool
+            True if the surrogate was updated, or False if it has not been trained or has a
+            nugget for each training point.
+        """
+        if not self.trained or np.ndim(self.nugget) > 0:
+            return False
+
+        x, y = np.atleast_2d(x, y)
+        X_new = (x - self.X_mean) / self.X_std
+        Y_new = (y - self.Y_mean) / self.Y_std
+        X = np.vstack((self.X, X_new))
+        Y = np.vstack((self.Y, Y_new))
+        n_old = self.n_samples
+        n = X.shape[0]
+
+        if self.Vh is None:
+            R = self._correlation_matrix(X, n_old)
+            # R = L L^T, so the new rows of L solve L11 L21^T = R12 and L22 is the factor of
+            # the Schur complement R22 - L21 L21^T.
+            L = np.zeros((n, n))
+            L[:n_old, :n_old] = self.L
+            L21 = linalg.solve_triangular(self.L, R[:n_old, n_old:], lower=True,
+                                          check_finite=False).T
+            L[n_old:, :n_old] = L21
+            L[n_old:, n_old:] = _cholesky(R[n_old:, n_old:] - L21.dot(L21.T))
+        else:
+            L = _cholesky(self._correlation_matrix(X, 0))
+
+        self.X, self.Y = X, Y
+        self.n_samples = n
+        self.L = L
+        self.alpha = linalg.cho_solve((L, True), Y, check_finite=False)
+        self.sigma2 = np.sum(Y * self.alpha, axis=0) / n * np.square(self.Y_std)
+        self.U = self.S_inv = self.Vh = None
+        return True
+
+    def _correlation_matrix(self, X, start):
+        """ Returns the correlation matrix of the normalized points X, filling in only the
+        columns from `start` on, and the full matrix if start is 0."""
+        n = X.shape[0]
+        R = np.zeros((n, n))
+        for k in range(self.n_dims):
+            R[:, start:] += self.thetas[k] * np.square(np.subtract.outer(X[:, k], X[start:, k]))
+        np.exp(-R[:, start:], out=R[:, start:])
+        R[start:, :start] = R[:start, start:].T
+        R[np.diag_indices(n)] = 1. + self.nugget
+        return R
+
     def predict(self, x):
         """
         Calculates a predicted value of the response based on the current
@@ -165,34 +313,29 @@ class KrigingSurrogate(SurrogateModel):
         Args
         ----
         x : array-like
-            Point at which the surrogate is evaluated.
+            Point at which the surrogate is evaluated, or an (n_eval, n_dims) array of points.
         """
 
         super(KrigingSurrogate, self).predict(x)
 
-        X, Y = self.X, self.Y
-        thetas = self.thetas
-        if isinstance(x, list):
-            x = np.array(x)
-        x = np.atleast_2d(x)
-        n_eval = x.shape[0]
-
-        # Normalize input
-        x_n = (x - self.X_mean) / self.X_std
+        x_n = self._normalize(x)
+        n_eval = x_n.shape[0]
 
-        r = np.zeros((n_eval, self.n_samples), dtype=x.dtype)
-        for r_i, x_i in zip(r, x_n):
-            r_i[:] = np.exp(-thetas.dot(np.square((x_i - X).T)))
+        y = np.empty((n_eval, self.Y.shape[1]), dtype=x_n.dtype)
+        if self.eval_rmse:
+            mse = np.empty((n_eval, self.Y.shape[1]))
 
-        # Scaled Predictor
-        y_t = np.dot(r, self.alpha)
+        for start, stop, r in self._correlations(x_n):
+            # Scaled Predictor
+            y[start:stop] = r.dot(self.alpha)
+            if self.eval_rmse:
+                mse[start:stop] = self._mse(r)
 
         # Predictor
-        y = self.Y_mean + self.Y_std * y_t
+        y *= self.Y_std
+        y += self.Y_mean
 
         if self.eval_rmse:
-            mse = (1. - np.dot(np.dot(r, self.Vh.T), np.einsum('j,kj,lk->jl', self.S_inv, self.U, r))) * self.sigma2
-
             # Forcing negative RMSE to zero if negative due to machine precision
             mse[mse < 0.] = 0.
             return y, np.sqrt(mse)
@@ -206,22 +349,222 @@ class KrigingSurrogate(SurrogateModel):
         Args
         ----
         x : array-like
-            Point at which the surrogate Jacobian is evaluated.
+            Point at which the surrogate Jacobian is evaluated, or an (n_eval, n_dims) array of
+            points.
+
+        Returns
+        -------
+        ndarray
+            Jacobian of shape (n_outputs, n_dims), or (n_eval, n_outputs, n_dims) if more than
+            one point was given.
+        """
+        x_n = self._normalize(x)
+        jac = np.empty((x_n.shape[0], self.Y.shape[1], self.n_dims), dtype=x_n.dtype)
+
+        for start, stop, r in self._correlations(x_n):
+            self._jacobian(x_n[start:stop], r, jac[start:stop])
+
+        jac *= np.outer(self.Y_std, 1. / self.X_std)
+        return jac[0] if jac.shape[0] == 1 else jac
+
+    def predict_with_jacobian(self, x):
+        """
+        Calculates the predicted mean and the Jacobian of the Kriging surface together, sharing
+        the correlations between the points and the training data. The RMSE is not computed.
+
+        Args
+        ----
+        x : array-like
+            Point at which the surrogate is evaluated, or an (n_eval, n_dims) array of points.
+
+        Returns
+        -------
+        tuple
+            Predicted values of shape (n_eval, n_outputs) and the Jacobian, with the same shape
+            as returned by `linearize`.
+        """
+        super(KrigingSurrogate, self).predict(x)
+
+        x_n = self._normalize(x)
+        n_eval = x_n.shape[0]
+        y = np.empty((n_eval, self.Y.shape[1]), dtype=x_n.dtype)
+        jac = np.empty((n_eval, self.Y.shape[1], self.n_dims), dtype=x_n.dtype)
+
+        for start, stop, r in self._correlations(x_n):
+            y[start:stop] = r.dot(self.alpha)
+            self._jacobian(x_n[start:stop], r, jac[start:stop])
+
+        y *= self.Y_std
+        y += self.Y_mean
+        jac *= np.outer(self.Y_std, 1. / self.X_std)
+
+        return y, (jac[0] if n_eval == 1 else jac)
+
+    def _normalize(self, x):
+        """ Returns the normalized evaluation points as an (n_eval, n_dims) array."""
+        x = np.atleast_2d(np.asarray(x))
+        return (x - self.X_mean) / self.X_std
+
+    def _work(self, name, n_rows, dtype):
+        """ Returns a work buffer of shape (n_rows, n_samples), reusing the one from the previous
+        call when it is big enough."""
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape[0] < n_rows or buf.shape[1] != self.n_samples or \
+           buf.dtype != dtype:
+            buf = self._buffers[name] = np.empty((n_rows, self.n_samples), dtype=dtype)
+        return buf[:n_rows]
+
+    def _correlations(self, x_n):
         """
+        Yields the correlations between chunks of the evaluation points and the training points,
+        so that the work arrays hold at most `max_work_size` entries.
+
+        Yields
+        ------
+        tuple
+            Start and stop indices of the chunk, and its correlations. The correlation array is
+            reused for the next chunk.
+        """
+        n_eval = x_n.shape[0]
+        dtype = np.result_type(x_n.dtype, float)
+        chunk = max(1, min(n_eval, self.max_work_size // self.n_samples))
+        X, thetas = self.X, self.thetas
+
+        for start in range(0, n_eval, chunk):
+            stop = min(start + chunk, n_eval)
+            x_c = x_n[start:stop]
+
+            r = self._work('r', stop - start, dtype)
+            diff = self._work('diff', stop - start, dtype)
+
+            r[:] = 0.
+            for k in range(self.n_dims):
+                np.subtract.outer(x_c[:, k], X[:, k], out=diff)
+                np.square(diff, out=diff)
+                diff *= thetas[k]
+                r += diff
+            np.negative(r, out=r)
+            np.exp(r, out=r)
+
+            yield start, stop, r
+
+    def _mse(self, r):
+        """ Returns the mean squared error at the points with the given correlations."""
+        if self.Vh is None:
+            # Trained with a Cholesky factorization
+            q = np.einsum('ij,ji->i', r, linalg.cho_solve((self.L, True), r.T))
+        else:
+            q = np.einsum('ij,ij->i', r.dot(self.Vh.T) * self.S_inv, r.dot(self.U))
+        return np.outer(1. - q, self.sigma2)
+
+    def _jacobian(self, x_c, r, jac):
+        """ Fills in the normalized Jacobian at a chunk of points from their correlations."""
+        diff = self._work('diff', x_c.shape[0], r.dtype)
+        for k in range(self.n_dims):
+            np.subtract.outer(x_c[:, k], self.X[:, k], out=diff)
+            diff *= r
+            jac[:, :, k] = diff.dot(self.alpha) * (-2. * self.thetas[k])
+
+
+def _cholesky(R):
+    """ Returns the lower Cholesky factor of a correlation matrix. If the matrix is not
+    numerically positive definite, a growing nugget is added to the diagonal until it is."""
+    try:
+        return linalg.cholesky(R, lower=True, check_finite=False)
+    except linalg.LinAlgError:
+        pass
+
+    diag = np.diag_indices_from(R)
+    nugget = 1e-12
+    while True:
+        R[diag] += nugget
+        try:
+            return linalg.cholesky(R, lower=True, check_finite=False)
+        except linalg.LinAlgError:
+            if nugget > 1e-4:
+                raise
+            nugget *= 10.
+
+
+def _cholesky_likelihood(log_thetas, sq_dists, rows, cols, Y, nugget, grad=False):
+    """
+    Calculates the reduced likelihood of `KrigingSurrogate` using a Cholesky
+    factorization of the correlation matrix.
+
+    Args
+    ----
+    log_thetas : ndarray
+        Log of the correlation coefficients.
+    sq_dists : ndarray
+        Squared distances between the pairs of normalized training points, one row per pair.
+    rows, cols : ndarray of int
+        Indices of the training points of each pair, in the upper triangle.
+    Y : ndarray
+        Normalized training outputs.
+    nugget : double or ndarray
+        Nugget smoothing parameter.
+    grad : bool, optional
+        If True, also return the gradient of the reduced likelihood with respect to the log
+        of the correlation coefficients.
+
+    Returns
+    -------
+    tuple
+        The reduced likelihood, the Cholesky factor, alpha and sigma2, and the gradient if
+        requested.
+    """
+    thetas = np.exp(log_thetas)
+    n = Y.shape[0]
+
+    r = np.exp(-sq_dists.dot(thetas))
+    R = np.empty((n, n))
+    R[rows, cols] = r
+    R[cols, rows] = r
+    R[np.diag_indices(n)] = 1. + nugget
+
+    L = _cholesky(R)
+    alpha = linalg.cho_solve((L, True), Y, check_finite=False)
+    logdet = 2.0 * np.sum(np.log(np.diag(L)))
+    sigma2 = np.sum(Y * alpha, axis=0) / n
+    sum_sigma2 = np.sum(sigma2)
+    reduced_likelihood = -(np.log(sum_sigma2) + logdet / n)
+
+    if not grad:
+        return reduced_likelihood, L, alpha, sigma2
+
+    # d(logdet)/dR = R^-1 and d(sigma2)/dR = -alpha alpha^T / n, and each correlation depends
+    # on theta through exp(-theta . d^2).
+    Rinv = linalg.cho_solve((L, True), np.eye(n), check_finite=False)
+    W = Rinv[rows, cols] - np.einsum('ij,ij->i', alpha[rows], alpha[cols]) / sum_sigma2
+    gradient = 2.0 * thetas * (W * r).dot(sq_dists) / n
+
+    return reduced_likelihood, L, alpha, sigma2, gradient
+
+
+def _neg_likelihood(log_thetas, *data):
+    """ Objective of the hyper-parameter optimization, with its gradient."""
+    res = _cholesky_likelihood(log_thetas, *data, grad=True)
+    return -res[0], -res[4]
+
+
+def _minimize_likelihood(x0, data, bounds):
+    """ Runs one hyper-parameter optimization from the given starting point."""
+    return minimize(_neg_likelihood, x0, args=data, jac=True, method='slsqp',
+                    bounds=bounds)
+
+
+# Training data of the hyper-parameter optimizations that run in a process pool.
+_pool_data = None
 
-        thetas = self.thetas
 
-        # Normalize Input
-        x_n = (x - self.X_mean) / self.X_std
+def _init_pool(data):
+    global _pool_data
+    _pool_data = data
 
-        r = np.exp(-thetas.dot(np.square((x_n - self.X).T)))
 
-        # Z = einsum('i,ij->ij', X, Y) is equivalent to, but much faster and
-        # memory efficient than, diag(X).dot(Y) for vector X and 2D array Y.
-        # I.e. Z[i,j] = X[i]*Y[i,j]
-        gradr = r * -2 * np.einsum('i,ij->ij', thetas, (x_n - self.X).T)
-        jac = np.einsum('i,j,ij->ij', self.Y_std, 1./self.X_std, gradr.dot(self.alpha).T)
-        return jac
+def _pool_minimize(args):
+    x0, bounds = args
+    return _minimize_likelihood(x0, _pool_data, bounds)
 
 
 class FloatKrigingSurrogate(KrigingSurrogate):
@@ -230,4 +573,8 @@ class FloatKrigingSurrogate(KrigingSurrogate):
 
     def predict(self, x):
         dist = super(FloatKrigingSurrogate, self).predict(x)
+        mean = dist[0] if self.eval_rmse else dist
+        if mean.shape[0] > 1:
+            # A batch of points
+            return mean
         return dist[0]  # mean value
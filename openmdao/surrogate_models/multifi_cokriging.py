@@ -823,6 +823,8 @@ class MultiFiCoKrigingSurrogate(MultiFiSurrogateModel):
     in [LeGratiet2013]. See MultiFiCoKriging class.
     """
 
+    _option_names = ('tolerance', 'initial_range', '_model_args')
+
     def __init__(self, regr='constant', rho_regr='constant',
                  theta=None, theta0=None, thetaL=None, thetaU=None,
                  tolerance=TOLERANCE_DEFAULT, initial_range=INITIAL_RANGE_DEFAULT):
@@ -830,8 +832,9 @@ class MultiFiCoKrigingSurrogate(MultiFiSurrogateModel):
 
         self.tolerance=tolerance
         self.initial_range=initial_range
-        self.model = MultiFiCoKriging(regr=regr,rho_regr=rho_regr, theta=theta,
-                                      theta0=theta0, thetaL=thetaL, thetaU=thetaU)
+        self._model_args = dict(regr=regr, rho_regr=rho_regr, theta=theta,
+                                theta0=theta0, thetaL=thetaL, thetaU=thetaU)
+        self.model = MultiFiCoKriging(**self._model_args)
 
     def predict(self, new_x):
         """Calculates a predicted value of the response based on the current
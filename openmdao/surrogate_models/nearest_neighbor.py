@@ -33,6 +33,9 @@ class NearestNeighbor(SurrogateModel):
         interpolant.
 
     """
+
+    _option_names = ('interpolant_type', 'interpolant_init_args')
+
     def __init__(self, interpolant_type='rbf', **kwargs):
         super(NearestNeighbor, self).__init__()
 
@@ -63,6 +66,29 @@ class NearestNeighbor(SurrogateModel):
         super(NearestNeighbor, self).train(x, y)
         self.interpolant = _interpolators[self.interpolant_type](x, y, **self.interpolant_init_args)
 
+    def update(self, x, y):
+        """
+        Adds training points to the interpolant, keeping the scaling of the
+        original training data.
+
+        Args
+        ----
+        x : array-like
+            New training input locations
+
+        y : array-like
+            Model responses at the new inputs.
+
+        Returns
+        -------
+        bool
+            True if the surrogate was updated.
+        """
+        if self.interpolant is None:
+            return False
+        self.interpolant.add_points(x, y)
+        return True
+
     def predict(self, x, **kwargs):
         """
         Calculates a predicted value of the response based on the current
@@ -1,7 +1,6 @@
 import numpy as np
 
 from openmdao.surrogate_models.nn_interpolators.nn_base import NNBase
-from six.moves import range
 
 
 class LinearInterpolator(NNBase):
@@ -11,40 +10,35 @@ class LinearInterpolator(NNBase):
     """
 
     def _find_hyperplane(self, nloc):
-        # Extra Inputs for Finding the normal are found below
-        # Number of row vectors needed always dimensions - 1
+        # Finds the hyperplane through the neighbors of every prediction
+        # point, for all of the dependent dimensions at once.
         indep_dims = self._indep_dims
         dep_dims = self._dep_dims
 
         # Number of Prediction Points
         nppts = nloc.shape[0]
 
-        # Preallocate storage
-        pc = np.empty((nppts, dep_dims), dtype='float')
-        normal = np.empty((nppts, indep_dims + 1, dep_dims), dtype='float')
-        nvect = np.empty((nppts, indep_dims, indep_dims + 1), dtype='float')
-        trnd = np.concatenate((self._tp[nloc, :],
-                               self._tv[nloc, 0].reshape(nppts, indep_dims + 1, 1)),
-                              axis=2)
-        nvect[:, :, :-1] = trnd[:, 1:, :-1] - trnd[:, :-1, :-1]
-
-        for i in range(dep_dims):
-            # Planar vectors need both dep and ind dimensions
-            trnd[:, :, -1] = self._tv[nloc, i]
-
-            # Go through each neighbor
-            # Creates array[neighbor, dimension] from NN results
-            nvect[:, :, -1] = trnd[:, 1:, -1] - trnd[:, :-1, -1]
-
-            # Normal vector is in the null space of nvect.
-            # Since nvect is of size indep x (indep + 1),
-            # the normal vector will be the last entry in
-            # V in the U, Sigma, V = svd(nvect).
-            normal[:, :, i] = np.linalg.svd(nvect)[2][:, -1, :]
-
-            # Use the point of the closest neighbor to
-            # solve for pc - the constant of the n-dimensional plane.
-            pc[:, i] = np.einsum('ij,ij->i', trnd[:, 0, :], normal[:, :, i])
+        # Coordinates and values of the neighbors
+        pts = self._tp[nloc]
+        vals = self._tv[nloc]
+
+        # Vectors between consecutive neighbors, in both the independent and
+        # the dependent dimension, for each prediction point and each
+        # dependent dimension. There are always indep_dims of them.
+        nvect = np.empty((nppts, dep_dims, indep_dims, indep_dims + 1), dtype='float')
+        nvect[:, :, :, :-1] = (pts[:, 1:, :] - pts[:, :-1, :])[:, np.newaxis]
+        nvect[:, :, :, -1] = np.swapaxes(vals[:, 1:, :] - vals[:, :-1, :], 1, 2)
+
+        # Normal vector is in the null space of nvect.
+        # Since nvect is of size indep x (indep + 1),
+        # the normal vector will be the last entry in
+        # V in the U, Sigma, V = svd(nvect).
+        normal = np.swapaxes(np.linalg.svd(nvect)[2][:, :, -1, :], 1, 2)
+
+        # Use the point of the closest neighbor to
+        # solve for pc - the constant of the n-dimensional plane.
+        pc = np.einsum('ij,ijk->ik', pts[:, 0, :], normal[:, :-1, :]) + \
+            vals[:, 0, :] * normal[:, -1, :]
 
         return normal, pc
 
@@ -61,9 +55,9 @@ class LinearInterpolator(NNBase):
         # Linear interp only uses as many neighbors as it has dimensions
         points_needed = self._indep_dims + 1
 
-        # KData query takes (data, #ofneighbors) to determine closest
+        # The query takes (data, #ofneighbors) to determine closest
         # training points to predicted data
-        ndist, nloc = self._KData.query(normalized_pts.real, points_needed)
+        ndist, nloc = self._query(normalized_pts, points_needed)
 
         normal, pc = self._find_hyperplane(nloc)
 
@@ -72,8 +66,9 @@ class LinearInterpolator(NNBase):
                                 normal[:, :self._indep_dims, :]) - pc
 
         # Check to see if there are any collinear points and replace them
-        n0 = np.where(normal[:, -1, :] == 0)
-        predictions[n0, :] = self._tv[nloc[0, n0], :]
+        # with the value of the closest neighbor
+        rows, cols = np.where(normal[:, -1, :] == 0)
+        predictions[rows, cols] = self._tv[nloc[rows, 0], cols]
 
         # Finish computation for the good normals
         n = np.where(normal[:, -1, :] != 0)
@@ -82,8 +77,6 @@ class LinearInterpolator(NNBase):
         # Rescale to original units
         predictions = (predictions * self._tvr) + self._tvm
 
-        self._pt_cache = (normalized_pts, ndist, nloc)
-
         return predictions
 
     def gradient(self, PredPoints):
@@ -95,21 +88,18 @@ class LinearInterpolator(NNBase):
             PredPoints.shape = (1, PredPoints.shape[0])
 
         normPredPts = (PredPoints - self._tpm) / self._tpr
-        nppts = normPredPts.shape[0]
-        gradient = np.zeros((nppts, self._dep_dims, self._indep_dims), dtype="float")
         # Linear interp only uses as many neighbors as it has dimensions
         dims = self._indep_dims + 1
-        # Find the neighbors
-        if self._pt_cache is not None and \
-                np.allclose(self._pt_cache[0], normPredPts):
-            ndist, nloc = self._pt_cache[1:]
-        else:
-                ndist, nloc = self._KData.query(normPredPts.real, dims)
+        # Find the neighbors, shared with a prediction at the same points.
+        ndist, nloc = self._query(normPredPts, dims)
 
         normal, pc = self._find_hyperplane(nloc)
-        if np.any(normal[:, -1, :]) == 0:
-            return gradient
-        gradient[:] = (-normal[:, :-1, :] / normal[:, -1, :]).squeeze().T
+
+        # Slopes of each hyperplane, zero where it is vertical.
+        last = normal[:, -1:, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gradient = np.where(last != 0, -normal[:, :-1, :] / last, 0.)
+        gradient = np.swapaxes(gradient, 1, 2)
 
         grad = gradient * (self._tvr[:, np.newaxis] / self._tpr)
         return grad
@@ -1,8 +1,22 @@
 import numpy as np
 
+from collections import OrderedDict
 from math import ceil
 from scipy.spatial import cKDTree
 
+# Keyword that makes a cKDTree query use all of the cores. It was renamed in
+# scipy 1.6.
+try:
+    cKDTree(np.zeros((1, 1))).query(np.zeros((1, 1)), workers=1)
+    _ALL_CORES = {'workers': -1}
+except TypeError:
+    _ALL_CORES = {'n_jobs': -1}
+
+# Queries of fewer points than this run in a single thread, where starting
+# the threads would cost more than it saves.
+PARALLEL_QUERY_SIZE = 256
+
+
 class NNBase(object):
     """
     Base class for common functionality between nearest neighbor interpolants.
@@ -46,8 +60,88 @@ class NNBase(object):
         self._ntpts = training_points.shape[0]
 
         # Make training data into a Tree
+        self._num_leaves = num_leaves
         leavesz = ceil(self._ntpts / float(num_leaves))
         self._KData = cKDTree(self._tp, leafsize=leavesz)
 
-        # Cache for gradients
-        self._pt_cache = None
+        # Neighbors of recently queried points, so that a prediction and a
+        # gradient at the same points share the query.
+        self._query_cache = OrderedDict()
+        self._query_cache_size = 8
+
+    def add_points(self, training_points, training_values):
+        """
+        Adds training points to the interpolant. They are scaled like the
+        original training points, and the tree is rebuilt.
+
+        Args
+        ----
+        training_points : ndarray
+            ndarray of shape (num_points x independent dims) containing
+            new training input locations.
+
+        training_values : ndarray
+            ndarray of shape (num_points x dependent dims) containing
+            new training output values.
+        """
+        self._tp = np.vstack((self._tp, (training_points - self._tpm) / self._tpr))
+        self._tv = np.vstack((self._tv, (training_values - self._tvm) / self._tvr))
+        self._ntpts = self._tp.shape[0]
+
+        leavesz = ceil(self._ntpts / float(self._num_leaves))
+        self._KData = cKDTree(self._tp, leafsize=leavesz)
+        self._query_cache.clear()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_query_cache'] = OrderedDict()
+        return state
+
+    def _query(self, normalized_pts, k):
+        """
+        Finds the k nearest training points of each of the given points.
+
+        Args
+        ----
+        normalized_pts : ndarray
+            ndarray of shape (num_points x independent dims) containing
+            normalized prediction points. Only the real part is used.
+
+        k : int
+            Number of neighbors.
+
+        Returns
+        -------
+        tuple of ndarray
+            The distances to the neighbors and their indices, both of shape
+            (num_points x k), sorted by distance. They are shared with later
+            calls, so they are read-only.
+        """
+        pts = np.ascontiguousarray(normalized_pts.real)
+        key = (k, pts.shape, pts.tobytes())
+
+        cache = self._query_cache
+        try:
+            found = cache.pop(key)
+        except KeyError:
+            found = self._tree_query(pts, k)
+            for arr in found:
+                arr.flags.writeable = False
+
+            while cache and len(cache) >= self._query_cache_size:
+                cache.popitem(last=False)
+
+        cache[key] = found
+        return found
+
+    def _tree_query(self, pts, k):
+        """ Queries the tree for the k nearest neighbors of each of the real
+        points pts, in parallel for big batches. Returns the distances and
+        indices, both of shape (num_points x k)."""
+        if pts.shape[0] >= PARALLEL_QUERY_SIZE:
+            ndist, nloc = self._KData.query(pts, k, **_ALL_CORES)
+        else:
+            ndist, nloc = self._KData.query(pts, k)
+
+        # A single neighbor comes back without its own axis.
+        return ndist.reshape((pts.shape[0], k)), nloc.reshape((pts.shape[0], k))
@@ -1,15 +1,15 @@
 import numpy as np
 
 from openmdao.surrogate_models.nn_interpolators.nn_base import NNBase
-from six.moves import range
-from scipy.sparse import csc_matrix
+from scipy.sparse import csc_matrix, csr_matrix
 from scipy.sparse.linalg import spsolve
 
 
 class RBFInterpolator(NNBase):
     # Compactly Supported Radial Basis Function
     def _find_R(self, npp, T, loc):
-        R = np.zeros((npp, self._ntpts), dtype="float")
+        # Returns the sparse matrix of the correlations of the npp points with
+        # the training points.
         # Choose type of CRBF R matrix
         if self.comp == -1:
             # Comp #1 - a
@@ -131,10 +131,10 @@ class RBFInterpolator(NNBase):
 
         Cb = np.polyval(cb_poly, T)
 
-        for i in range(npp):
-            R[i, loc[i, :-1]] = Cf[i, :] * Cb[i, :]
-
-        return R
+        # Each point only correlates with its neighbors, except the farthest
+        rows = np.repeat(np.arange(npp), loc.shape[1] - 1)
+        return csr_matrix(((Cf * Cb).ravel(), (rows, loc[:, :-1].ravel())),
+                          shape=(npp, self._ntpts))
 
     def _find_dR(self, PrdPts, ploc, pdist):
         T = (pdist[:, :-1] / pdist[:, -1:])
@@ -275,16 +275,23 @@ class RBFInterpolator(NNBase):
 
         # Comp is an arbitrary value that picks a function to use
         self.comp = comp
+        self.N = n
+        self._find_weights()
 
+    def _find_weights(self):
         # For weights, first find the training points radial neighbors
-        tdist, tloc = self._KData.query(self._tp, n)
+        tdist, tloc = self._tree_query(self._tp, self.N)
         Tt = tdist[:, :-1] / tdist[:, -1:]
         # Next determine weight matrix
         Rt = self._find_R(self._ntpts, Tt, tloc)
-        weights = (spsolve(csc_matrix(Rt), self._tv))[..., np.newaxis]
+        self.weights = (spsolve(csc_matrix(Rt), self._tv)).reshape(
+            (self._ntpts, self._dep_dims, 1))
 
-        self.N = n
-        self.weights = weights
+    def add_points(self, training_points, training_values):
+        super(RBFInterpolator, self).add_points(training_points, training_values)
+
+        # The neighbors of the old points may have changed too.
+        self._find_weights()
 
     def __call__(self, prediction_points):
 
@@ -295,7 +302,7 @@ class RBFInterpolator(NNBase):
         normalized_pts = (prediction_points - self._tpm) / self._tpr
         nppts = normalized_pts.shape[0]
         # Setup prediction points and find their radial neighbors
-        ndist, nloc = self._KData.query(normalized_pts, self.N)
+        ndist, nloc = self._query(normalized_pts, self.N)
         # Check if complex step is being run
         if np.any(np.abs(normalized_pts[0, :].imag)) > 0:
             dimdiff = np.subtract(normalized_pts.reshape((nppts, 1, self._indep_dims)),
@@ -307,9 +314,7 @@ class RBFInterpolator(NNBase):
         Tp = ndist[:, :-1] / ndist[:, -1:]
 
         Rp = self._find_R(nppts, Tp, nloc)
-        predz = ((np.dot(Rp, self.weights[..., 0]) * self._tvr) + self._tvm).reshape(nppts, self._dep_dims)
-
-        self._pt_cache = (normalized_pts, ndist, nloc)
+        predz = ((Rp.dot(self.weights[..., 0]) * self._tvr) + self._tvm).reshape(nppts, self._dep_dims)
 
         return predz
 
@@ -321,11 +326,8 @@ class RBFInterpolator(NNBase):
 
         normalized_pts = (prediction_points - self._tpm) / self._tpr
         # Setup prediction points and find their radial neighbors
-        if self._pt_cache is not None and \
-                np.allclose(self._pt_cache[0], normalized_pts):
-            pdist, ploc = self._pt_cache[1:]
-        else:
-            pdist, ploc = self._KData.query(normalized_pts, self.N)
+        # Shares the neighbors found by a prediction at the same points.
+        pdist, ploc = self._query(normalized_pts, self.N)
 
         # Find Gradient
         grad = self._find_dR(normalized_pts[:, np.newaxis, :], ploc,
@@ -42,16 +42,9 @@ class WeightedInterpolator(NNBase):
         normalized_pts = (prediction_points - self._tpm) / self._tpr
         nppts = normalized_pts.shape[0]
         # Find them neigbors
-        # KData query takes (data, #ofneighbors) to determine closest
+        # The query takes (data, #ofneighbors) to determine closest
         # training points to predicted data
-        ndist, nloc = self._KData.query(normalized_pts.real, n)
-
-        # Setup problem
-
-        # Reshape ndist for 1D problems.
-        if len(ndist.shape) == 1:
-            ndist.shape = (1, ndist.shape[0])
-            nloc.shape = (1, nloc.shape[0])
+        ndist, nloc = self._query(normalized_pts, n)
 
         weights = self._get_weights(ndist, dist_eff)
 
@@ -60,8 +53,6 @@ class WeightedInterpolator(NNBase):
         wt = np.einsum('ijk,ij->ik', vals, weights)
         predz = ((wt / weight_sum[:, np.newaxis]) * self._tvr) + self._tvm
 
-        self._pt_cache = (normalized_pts, ndist, nloc)
-
         return predz
 
     def gradient(self, prediction_points, n=5, dist_eff=0):
@@ -81,29 +72,22 @@ class WeightedInterpolator(NNBase):
 
         normalized_pts = (prediction_points - self._tpm) / self._tpr
 
-        if self._pt_cache is not None and \
-                np.allclose(self._pt_cache[0], normalized_pts):
-            ndist, nloc = self._pt_cache[1:]
-        else:
-            ndist, nloc = self._KData.query(normalized_pts, n)
+        # Shares the neighbors found by a prediction at the same points.
+        ndist, nloc = self._query(normalized_pts, n)
 
-        # Reshape ndist for 1D problems.
-        if len(ndist.shape) == 1:
-            ndist.shape = (1, ndist.shape[0])
-            nloc.shape = (1, nloc.shape[0])
-
-        dimdiff = normalized_pts - self._tp[nloc]
+        dimdiff = normalized_pts[:, np.newaxis, :] - self._tp[nloc]
 
         weights = np.power(ndist, -dist_eff)
         dweights = -dist_eff * np.power(ndist[..., np.newaxis], -(dist_eff + 2)) * dimdiff
 
-        weight_sum = np.sum(weights, axis=1)
+        # One row per prediction point
+        weight_sum = np.sum(weights, axis=1)[:, np.newaxis, np.newaxis]
 
         vals = self._tv[nloc]
 
         gradient = (weight_sum * np.einsum('ikj,ikl->ilj', dweights, vals)
                     - (np.einsum('ij,ijk->ik', weights, vals)[..., np.newaxis]
-                    * np.sum(dweights, axis=1))) / np.power(weight_sum, 2)
+                    * np.sum(dweights, axis=1)[:, np.newaxis, :])) / np.power(weight_sum, 2)
 
         grad = gradient * (self._tvr[..., np.newaxis] / self._tpr)
 
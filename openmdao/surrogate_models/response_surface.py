@@ -1,7 +1,7 @@
 """Surrogate Model based on second order response surface equations."""
 
-from numpy import zeros, einsum, squeeze
-from numpy.dual import lstsq
+from numpy import zeros, einsum, squeeze, eye, atleast_2d, result_type
+from numpy.dual import lstsq, inv, solve
 from openmdao.surrogate_models.surrogate_model import SurrogateModel
 from six.moves import range
 
@@ -14,6 +14,10 @@ class ResponseSurface(SurrogateModel):
         self.n = 0  # number of independents
         self.betas = zeros(0)  # vector of response surface equation coefficients
 
+        # Inverse of X^T X, for recursive least squares updates. None if X
+        # doesn't have full column rank.
+        self._P = None
+
     def train(self, x, y):
         """ Calculate response surface equation coefficients using least
         squares regression.
@@ -29,30 +33,52 @@ class ResponseSurface(SurrogateModel):
 
         super(ResponseSurface, self).train(x, y)
 
-        m = self.m = x.shape[0]
-        n = self.n = x.shape[1]
+        self.m = x.shape[0]
+        self.n = x.shape[1]
 
-        X = zeros((m, ((n + 1) * (n + 2)) // 2))
+        X = _terms(x)
 
-        # Modify X to include constant, squared terms and cross terms
+        # Determine response surface equation coefficients (betas) using least squares
+        self.betas, rs, r, s = lstsq(X, y)
 
-        # Constant Terms
-        X[:, 0] = 1.0
+        if r == X.shape[1]:
+            self._P = inv(X.T.dot(X))
+        else:
+            self._P = None
 
-        # Linear Terms
-        X[:, 1:n+1] = x
+    def update(self, x, y):
+        """ Adds training points using recursive least squares, which gives
+        the same coefficients as training on all of the points.
 
-        # Quadratic Terms
-        X_offset = X[:, n + 1:]
-        for i in range(n):
-            # Z = einsum('i,ij->ij', X, Y) is equivalent to, but much faster and
-            # memory efficient than, diag(X).dot(Y) for vector X and 2D array Y.
-            # I.e. Z[i,j] = X[i]*Y[i,j]
-            X_offset[:, :n - i] = einsum('i,ij->ij', x[:, i], x[:, i:])
-            X_offset = X_offset[:, n-i:]
+        Args
+        ----
+        x : array-like
+            New training input locations
 
-        # Determine response surface equation coefficients (betas) using least squares
-        self.betas, rs, r, s = lstsq(X, y)
+        y : array-like
+            Model responses at the new inputs.
+
+        Returns
+        -------
+        bool
+            True if the surrogate was updated, or False if it has not been
+            trained on enough points to determine all of the coefficients.
+        """
+        if self._P is None:
+            return False
+
+        x, y = atleast_2d(x, y)
+        X = _terms(x)
+        P = self._P
+
+        # Gain for the new rows: P X^T (I + X P X^T)^-1
+        PXt = P.dot(X.T)
+        K = solve(eye(X.shape[0]) + X.dot(PXt), PXt.T).T
+
+        self.betas = self.betas + K.dot(y - X.dot(self.betas))
+        self._P = P - K.dot(PXt.T)
+        self.m += x.shape[0]
+        return True
 
     def predict(self, x):
         """
@@ -62,11 +88,15 @@ class ResponseSurface(SurrogateModel):
         Args
         ----
         x : array-like
-            Point at which the surrogate is evaluated.
+            Point at which the surrogate is evaluated, or an (n_eval, n_dims)
+            array of points.
         """
 
         super(ResponseSurface, self).predict(x)
 
+        if x.ndim == 2 and x.shape[0] > 1:
+            return _terms(x).dot(self.betas)
+
         n = x.size
 
         X = zeros(((self.n + 1) * (self.n + 2)) // 2)
@@ -95,11 +125,16 @@ class ResponseSurface(SurrogateModel):
         Args
         ----
         x : array-like
-            Point at which the surrogate Jacobian is evaluated.
+            Point at which the surrogate Jacobian is evaluated, or an
+            (n_eval, n_dims) array of points, for which an
+            (n_eval, n_outputs, n_dims) array is returned.
         """
         n = self.n
         betas = self.betas
 
+        if x.ndim == 2 and x.shape[0] > 1:
+            return einsum('mtk,to->mok', _terms_jacobian(x), betas)
+
         x = x.flat
 
         jac = betas[1:n + 1, :].copy()
@@ -110,3 +145,52 @@ class ResponseSurface(SurrogateModel):
             beta_offset = beta_offset[n - i:, :]
 
         return jac.T
+
+
+def _terms(x):
+    """ Returns the constant, linear and quadratic terms of the response
+    surface equation for each row of x."""
+    m, n = x.shape
+
+    X = zeros((m, ((n + 1) * (n + 2)) // 2), dtype=result_type(x, float))
+
+    # Modify X to include constant, squared terms and cross terms
+
+    # Constant Terms
+    X[:, 0] = 1.0
+
+    # Linear Terms
+    X[:, 1:n+1] = x
+
+    # Quadratic Terms
+    X_offset = X[:, n + 1:]
+    for i in range(n):
+        # Z = einsum('i,ij->ij', X, Y) is equivalent to, but much faster and
+        # memory efficient than, diag(X).dot(Y) for vector X and 2D array Y.
+        # I.e. Z[i,j] = X[i]*Y[i,j]
+        X_offset[:, :n - i] = einsum('i,ij->ij', x[:, i], x[:, i:])
+        X_offset = X_offset[:, n-i:]
+
+    return X
+
+
+def _terms_jacobian(x):
+    """ Returns the derivatives of the terms of the response surface
+    equation with respect to x, for each row of x."""
+    m, n = x.shape
+
+    dX = zeros((m, ((n + 1) * (n + 2)) // 2, n), dtype=result_type(x, float))
+
+    # Linear Terms
+    for i in range(n):
+        dX[:, i + 1, i] = 1.0
+
+    # Quadratic Terms, x[i]*x[j] for j >= i
+    t = n + 1
+    for i in range(n):
+        for j in range(i, n):
+            dX[:, t, i] += x[:, j]
+            dX[:, t, j] += x[:, i]
+            t += 1
+
+    return dX
@@ -2,14 +2,71 @@
 Class definition for SurrogateModel, the base class for all surrogate models.
 """
 
+from six.moves import cPickle as pickle
+
+
 class SurrogateModel(object):
     """
     Base class for surrogate models.
     """
 
+    # Names of the attributes, set from the constructor arguments, that change
+    # the trained state. They are part of the key of the surrogates cached by
+    # `MetaModel`, so subclasses with settings must list them.
+    _option_names = ()
+
     def __init__(self):
         self.trained = False
 
+    def __getstate__(self):
+        return self.__dict__.copy()
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def _options(self):
+        """ Returns a dict of the settings listed in `_option_names`."""
+        return dict((name, getattr(self, name)) for name in self._option_names)
+
+    def save(self, filename):
+        """
+        Saves the trained state of this surrogate, along with its settings,
+        so that it can be restored with `load` instead of training again.
+
+        Args
+        ----
+        filename : str
+            Name of the file to write.
+        """
+        if not self.trained:
+            msg = "{0} has not been trained, so it can't be saved."\
+                .format(type(self).__name__)
+            raise RuntimeError(msg)
+
+        with open(filename, 'wb') as f:
+            pickle.dump((_type_name(self), self.__getstate__()), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, filename):
+        """
+        Restores the trained state and the settings of this surrogate from a
+        file written by `save`.
+
+        Args
+        ----
+        filename : str
+            Name of the file to read.
+        """
+        with open(filename, 'rb') as f:
+            type_name, state = pickle.load(f)
+
+        if type_name != _type_name(self):
+            msg = "'{0}' holds a trained {1}, not a {2}."\
+                .format(filename, type_name, _type_name(self))
+            raise ValueError(msg)
+
+        self.__setstate__(state)
+
     def train(self, x, y):
         self.trained = True
 
@@ -19,6 +76,28 @@ class SurrogateModel(object):
                 .format(type(self).__name__)
             raise RuntimeError(msg)
 
+    def update(self, x, y):
+        """
+        Adds training points to a trained surrogate without training it again
+        from scratch. Surrogates that support this keep their
+        hyper-parameters fixed.
+
+        Args
+        ----
+        x : array-like
+            New training input locations
+
+        y : array-like
+            Model responses at the new inputs.
+
+        Returns
+        -------
+        bool
+            True if the surrogate was updated. The base class returns False,
+            so the caller has to train it again on all of the points.
+        """
+        return False
+
     def linearize(self, x):
 
         msg = "{0} has not defined a jacobian method." \
@@ -26,6 +105,11 @@ class SurrogateModel(object):
         raise RuntimeError(msg)
 
 
+def _type_name(obj):
+    """ Returns the full name of the class of obj."""
+    return '{0}.{1}'.format(type(obj).__module__, type(obj).__name__)
+
+
 class MultiFiSurrogateModel(SurrogateModel):
     """
     Base class for surrogate models using multi-fiddelity training data
@@ -1,11 +1,15 @@
 
 # pylint: disable-msg=C0111,C0103
 
+import os
+import shutil
+import tempfile
 import unittest
 import itertools
 import numpy as np
 
-from openmdao.api import KrigingSurrogate
+from openmdao.api import KrigingSurrogate, FloatKrigingSurrogate, ResponseSurface
+from openmdao.surrogate_models.kriging import _cholesky_likelihood
 from openmdao.test.util import assert_rel_error
 from six.moves import zip
 
@@ -148,5 +152,238 @@ class TestKrigingSurrogate(unittest.TestCase):
         jac = surrogate.linearize(np.array([[0.5, 0.5]]))
         assert_rel_error(self, jac, np.array([[1, 1], [1, -1], [1, 2]]), 5e-4)
 
+class TestKrigingBatches(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(3)
+        x = rng.uniform([-5., 0.], [10., 15.], (40, 2))
+        y = np.array([[branin(case), np.sin(case[0])*case[1]] for case in x])
+        self.x_eval = rng.uniform([-5., 0.], [10., 15.], (25, 2))
+        self.x, self.y = x, y
+
+        self.surrogates = []
+        for method in ('svd', 'cholesky'):
+            surrogate = KrigingSurrogate(eval_rmse=True, method=method)
+            surrogate.train(x, y)
+            self.surrogates.append(surrogate)
+
+    def test_predict(self):
+        for surrogate in self.surrogates:
+            mu, sigma = surrogate.predict(self.x_eval)
+            self.assertEqual(mu.shape, (25, 2))
+            self.assertEqual(sigma.shape, (25, 2))
+
+            for x0, mu0, sigma0 in zip(self.x_eval, mu, sigma):
+                mu1, sigma1 = surrogate.predict(x0)
+                assert_rel_error(self, mu1[0], mu0, 1e-6)
+                # The MSE is 1 - r R^-1 r scaled by sigma2, so it loses digits.
+                assert_rel_error(self, (sigma1[0]**2 - sigma0**2) / surrogate.sigma2, 0., 1e-9)
+
+            # Small chunks, with a shorter one at the end.
+            surrogate.max_work_size = 7 * surrogate.n_samples
+            mu1, sigma1 = surrogate.predict(self.x_eval)
+            assert_rel_error(self, mu1, mu, 1e-8)
+            assert_rel_error(self, (sigma1**2 - sigma**2) / surrogate.sigma2, 0., 1e-9)
+
+    def test_linearize(self):
+        step = 1e-20
+        for surrogate in self.surrogates:
+            jac = surrogate.linearize(self.x_eval)
+            self.assertEqual(jac.shape, (25, 2, 2))
+
+            surrogate.max_work_size = 7 * surrogate.n_samples
+            assert_rel_error(self, surrogate.linearize(self.x_eval), jac, 1e-8)
+
+            # Complex step
+            surrogate.eval_rmse = False
+            for k in range(2):
+                x = self.x_eval.astype(complex)
+                x[:, k] += step*1j
+                cs = surrogate.predict(x).imag / step
+                assert_rel_error(self, jac[:, :, k], cs, 1e-8)
+
+            assert_rel_error(self, surrogate.linearize(self.x_eval[3]), jac[3], 1e-8)
+
+    def test_predict_with_jacobian(self):
+        for surrogate in self.surrogates:
+            mu, jac = surrogate.predict_with_jacobian(self.x_eval)
+            assert_rel_error(self, mu, surrogate.predict(self.x_eval)[0], 1e-8)
+            assert_rel_error(self, jac, surrogate.linearize(self.x_eval), 1e-8)
+
+            mu, jac = surrogate.predict_with_jacobian(self.x_eval[0])
+            self.assertEqual(jac.shape, (2, 2))
+
+    def test_float_kriging(self):
+        surrogate = FloatKrigingSurrogate()
+        surrogate.train(self.x, self.y)
+
+        mu = surrogate.predict(self.x_eval)
+        self.assertEqual(mu.shape, (25, 2))
+        assert_rel_error(self, mu, self.surrogates[0].predict(self.x_eval)[0], 1e-8)
+        assert_rel_error(self, surrogate.predict(self.x_eval[0]), mu[0], 1e-8)
+
+
+class TestKrigingUpdate(unittest.TestCase):
+
+    def test_update(self):
+        rng = np.random.RandomState(7)
+        x = rng.uniform([-5., 0.], [10., 15.], (30, 2))
+        y = np.array([[branin(case), np.sin(case[0])] for case in x])
+
+        for method in ('svd', 'cholesky'):
+            surrogate = KrigingSurrogate(method=method, eval_rmse=True)
+            surrogate.train(x[:20], y[:20])
+            thetas = surrogate.thetas.copy()
+
+            self.assertTrue(surrogate.update(x[20:21], y[20:21]))
+            self.assertTrue(surrogate.update(x[21:], y[21:]))
+            self.assertEqual(surrogate.n_samples, 30)
+            assert_rel_error(self, surrogate.thetas, thetas, 0.)
+
+            # The factor matches the correlation matrix of all of the points.
+            L = surrogate.L
+            assert_rel_error(self, L.dot(L.T),
+                             surrogate._correlation_matrix(surrogate.X, 0), 1e-10)
+
+            # All points are interpolated.
+            mu, sigma = surrogate.predict(x)
+            assert_rel_error(self, mu, y, 1e-6)
+
+    def test_no_update(self):
+        x = np.array([[0.], [1.], [2.]])
+        y = np.sin(x)
+
+        surrogate = KrigingSurrogate()
+        self.assertFalse(surrogate.update(x, y))
+
+        surrogate = KrigingSurrogate(nugget=np.ones(3)*1e-10)
+        surrogate.train(x, y)
+        self.assertFalse(surrogate.update([[3.]], [[0.]]))
+
+
+def _likelihood(surrogate):
+    """ Reduced likelihood of a trained surrogate."""
+    X = surrogate.X
+    rows, cols = np.triu_indices(X.shape[0], 1)
+    return _cholesky_likelihood(np.log(surrogate.thetas), np.square(X[rows] - X[cols]),
+                                rows, cols, surrogate.Y, surrogate.nugget)[0]
+
+
+class TestKrigingCholesky(unittest.TestCase):
+
+    def test_training_data(self):
+        x = np.array([[-2., 0.], [-0.5, 1.5], [1., 3.], [8.5, 4.5], [-3.5, 6.], [4., 7.5], [-5., 9.], [5.5, 10.5],
+                   [10., 12.], [7., 13.5], [2.5, 15.]])
+        y = np.array([[branin(case), 2.0*case[0]] for case in x])
+
+        surrogate = KrigingSurrogate(nugget=0., eval_rmse=True, method='cholesky')
+        surrogate.train(x, y)
+
+        for x0, y0 in zip(x, y):
+            mu, sigma = surrogate.predict(x0)
+            assert_rel_error(self, mu, y0, 1e-8)
+            assert_rel_error(self, sigma, 0, 1e-4)
+
+    def test_1d_ill_conditioned(self):
+        x = np.array([[case] for case in np.linspace(0., 1., 40)])
+        y = np.sin(x)
+        surrogate = KrigingSurrogate(eval_rmse=True, method='cholesky')
+        surrogate.train(x, y)
+        mu, sigma = surrogate.predict(np.array([0.5]))
+        self.assertTrue(sigma < 1.e-5)
+        assert_rel_error(self, mu, np.sin(0.5), 1e-5)
+
+    def test_likelihood_gradient(self):
+        rng = np.random.RandomState(11)
+        X = rng.rand(20, 3)
+        Y = np.array([np.sin(3.0*X).sum(axis=1), X[:, 0]**2]).T
+        rows, cols = np.triu_indices(20, 1)
+        data = (np.square(X[rows] - X[cols]), rows, cols, Y, 1e-10)
+
+        log_thetas = np.array([0.3, -0.5, 1.2])
+        res = _cholesky_likelihood(log_thetas, *data, grad=True)
+
+        step = 1e-6
+        fd = [(_cholesky_likelihood(log_thetas + step*e, *data)[0] - res[0]) / step
+              for e in np.eye(3)]
+        assert_rel_error(self, res[4], np.array(fd), 1e-4)
+
+    def test_restarts(self):
+        rng = np.random.RandomState(0)
+        x = rng.uniform([-5., 0.], [10., 15.], (60, 2))
+        y = np.array([[branin(case)] for case in x])
+
+        surrogate = KrigingSurrogate(method='cholesky')
+        surrogate.train(x, y)
+
+        serial = KrigingSurrogate(method='cholesky', num_restarts=2)
+        serial.train(x, y)
+        parallel = KrigingSurrogate(method='cholesky', num_restarts=2, num_procs=2)
+        parallel.train(x, y)
+
+        assert_rel_error(self, parallel.thetas, serial.thetas, 1e-10)
+        assert_rel_error(self, parallel.predict([5., 5.]), branin([5., 5.]), 1e-2)
+
+        # Restarting can't do worse than the default starting point.
+        self.assertTrue(_likelihood(serial) >= _likelihood(surrogate) - 1e-10)
+
+    def test_bad_method(self):
+        with self.assertRaises(ValueError) as cm:
+            KrigingSurrogate(method='qr')
+        self.assertEqual(str(cm.exception),
+                         "KrigingSurrogate method must be 'svd' or 'cholesky', not 'qr'.")
+
+
+class TestKrigingSaveLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp(prefix='omdao-')
+        self.filename = os.path.join(self.tempdir, 'kriging.pkl')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_save_load(self):
+        x = np.array([[a, b] for a, b in
+                      itertools.product(np.linspace(-5., 10., 5), np.linspace(0., 15., 5))])
+        y = np.array([[branin(case)] for case in x])
+        x_eval = np.array([[1., 2.], [7.5, 11.]])
+
+        for method in ('svd', 'cholesky'):
+            surrogate = KrigingSurrogate(eval_rmse=True, method=method)
+            surrogate.train(x, y)
+            mu, sigma = surrogate.predict(x_eval)
+            surrogate.save(self.filename)
+
+            loaded = KrigingSurrogate()
+            loaded.load(self.filename)
+            self.assertTrue(loaded.trained)
+            self.assertEqual(loaded.method, method)
+            assert_rel_error(self, loaded.thetas, surrogate.thetas, 1e-15)
+
+            mu1, sigma1 = loaded.predict(x_eval)
+            assert_rel_error(self, mu1, mu, 1e-15)
+            assert_rel_error(self, sigma1, sigma, 1e-15)
+            assert_rel_error(self, loaded.linearize(x_eval), surrogate.linearize(x_eval), 1e-15)
+
+    def test_errors(self):
+        with self.assertRaises(RuntimeError) as cm:
+            KrigingSurrogate().save(self.filename)
+        self.assertEqual(str(cm.exception),
+                         "KrigingSurrogate has not been trained, so it can't be saved.")
+
+        surrogate = ResponseSurface()
+        surrogate.train(np.array([[0.], [1.], [2.]]), np.array([[0.], [1.], [4.]]))
+        surrogate.save(self.filename)
+
+        with self.assertRaises(ValueError) as cm:
+            KrigingSurrogate().load(self.filename)
+        self.assertEqual(str(cm.exception),
+                         "'%s' holds a trained "
+                         "openmdao.surrogate_models.response_surface.ResponseSurface, "
+                         "not a openmdao.surrogate_models.kriging.KrigingSurrogate."
+                         % self.filename)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import numpy as np
 import unittest
 
@@ -17,6 +20,27 @@ class TestNearestNeighbor(unittest.TestCase):
 
         self.assertEqual(expected_msg, str(cm.exception))
 
+    def test_save_load(self):
+        tempdir = tempfile.mkdtemp(prefix='omdao-')
+        self.addCleanup(shutil.rmtree, tempdir)
+        filename = os.path.join(tempdir, 'nn.pkl')
+
+        x = np.array([[a, b] for a in np.linspace(0., 1., 5) for b in np.linspace(0., 1., 5)])
+        y = np.sin(x[:, :1]) + x[:, 1:]**2
+        x_eval = np.array([[.3, .7], [.61, .12]])
+
+        for interpolant_type in ('linear', 'weighted', 'rbf'):
+            surrogate = NearestNeighbor(interpolant_type=interpolant_type)
+            surrogate.train(x, y)
+            surrogate.save(filename)
+
+            loaded = NearestNeighbor()
+            loaded.load(filename)
+            self.assertEqual(loaded.interpolant_type, interpolant_type)
+            assert_rel_error(self, loaded.predict(x_eval), surrogate.predict(x_eval), 1e-15)
+            assert_rel_error(self, loaded.linearize(x_eval[0]),
+                             surrogate.linearize(x_eval[0]), 1e-15)
+
 
 class TestLinearInterpolator1D(unittest.TestCase):
     def setUp(self):
@@ -420,3 +444,89 @@ class TestRBFInterpolatorND(unittest.TestCase):
         for x0, y0 in zip(test_x, expected_deriv):
             mu = self.surrogate.linearize(x0)
             assert_rel_error(self, mu, y0, 1e-6)
+
+
+class TestNearestNeighborBatches(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.x = rng.uniform(size=(60, 3))
+        self.y = np.column_stack([np.sin(self.x[:, 0]) + self.x[:, 1]*self.x[:, 2],
+                                  np.sum(self.x, axis=1)**2])
+        self.x_eval = rng.uniform(size=(20, 3))
+
+    def test_batch(self):
+        for interpolant_type in ('linear', 'weighted', 'rbf'):
+            surrogate = NearestNeighbor(interpolant_type=interpolant_type)
+            surrogate.train(self.x, self.y)
+
+            mu = surrogate.predict(self.x_eval.copy())
+            jac = surrogate.linearize(self.x_eval.copy())
+            self.assertEqual(mu.shape, (20, 2))
+            self.assertEqual(jac.shape, (20, 2, 3))
+
+            for i, x0 in enumerate(self.x_eval):
+                assert_rel_error(self, surrogate.predict(x0.copy())[0], mu[i], 1e-12)
+                assert_rel_error(self, surrogate.linearize(x0.copy()), jac[i], 1e-12)
+
+    def test_query_cache(self):
+        surrogate = NearestNeighbor(interpolant_type='rbf')
+        surrogate.train(self.x, self.y)
+        interpolant = surrogate.interpolant
+
+        calls = []
+        query = interpolant._tree_query
+
+        def counted(pts, k):
+            calls.append(pts.shape[0])
+            return query(pts, k)
+
+        interpolant._tree_query = counted
+
+        # The gradient at the points of the last prediction uses the same
+        # neighbors.
+        surrogate.predict(self.x_eval.copy())
+        surrogate.linearize(self.x_eval.copy())
+        self.assertEqual(calls, [20])
+
+        surrogate.predict(self.x_eval[:3].copy())
+        surrogate.linearize(self.x_eval.copy())
+        self.assertEqual(calls, [20, 3])
+
+        # Least recently used entries are dropped.
+        interpolant._query_cache_size = 1
+        surrogate.predict(self.x_eval[3:6].copy())
+        surrogate.linearize(self.x_eval.copy())
+        self.assertEqual(calls, [20, 3, 3, 20])
+
+        # New training points clear the cache.
+        surrogate.update(self.x_eval[:5], np.zeros((5, 2)))
+        surrogate.linearize(self.x_eval.copy())
+        self.assertEqual(calls[-1], 20)
+        self.assertEqual(len(calls), 6)
+
+
+class TestNearestNeighborUpdate(unittest.TestCase):
+
+    def test_update(self):
+        x = np.array([[a, b] for a in np.linspace(0., 2., 5)
+                      for b in np.linspace(0., 2., 5)])
+        y = np.array([np.sin(x[:, 0]) + x[:, 1], x[:, 0]*x[:, 1]]).T
+        x_eval = np.array([[0.3, 0.7], [1.2, 1.9], [0.5, 0.5]])
+
+        # Keep the corners in the first batch, so the scaling is the same.
+        first = [0, 4, 20, 24] + list(range(5, 15))
+        rest = [i for i in range(25) if i not in first]
+
+        for interpolant_type in ('linear', 'weighted', 'rbf'):
+            surrogate = NearestNeighbor(interpolant_type=interpolant_type)
+            surrogate.train(x[first], y[first])
+            self.assertTrue(surrogate.update(x[rest], y[rest]))
+
+            expected = NearestNeighbor(interpolant_type=interpolant_type)
+            expected.train(x[first + rest], y[first + rest])
+
+            assert_rel_error(self, surrogate.predict(x_eval.copy()),
+                             expected.predict(x_eval.copy()), 1e-10)
+
+        self.assertFalse(NearestNeighbor().update(x, y))
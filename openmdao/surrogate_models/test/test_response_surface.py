@@ -137,6 +137,46 @@ class TestResponseSurfaceSurrogate(unittest.TestCase):
         jac = surrogate.linearize(array([[0.5, 0.5]]))
         assert_rel_error(self, jac, array([[1, 1], [1, -1]]), 1e-5)
 
+    def test_batch(self):
+        surrogate = ResponseSurface()
+
+        x = array([[a, b] for a, b in
+                   itertools.product(linspace(-1, 1, 5), repeat=2)])
+        y = array([[branin(case), case[0]*case[1]] for case in x])
+        surrogate.train(x, y)
+
+        x_eval = array([[0.1, 0.3], [-0.6, 0.9], [0.75, -0.2]])
+        mu = surrogate.predict(x_eval)
+        jac = surrogate.linearize(x_eval)
+        self.assertEqual(mu.shape, (3, 2))
+        self.assertEqual(jac.shape, (3, 2, 2))
+
+        for i, point in enumerate(x_eval):
+            assert_rel_error(self, mu[i], surrogate.predict(point), 1e-12)
+            assert_rel_error(self, jac[i], surrogate.linearize(point), 1e-12)
+
+    def test_update(self):
+        x = array([[a, b] for a, b in
+                   itertools.product(linspace(-1, 1, 4), repeat=2)])
+        x = x[[0, 5, 10, 15, 3, 12, 1, 6, 2, 4, 7, 8, 9, 11, 13, 14]]
+        y = array([[branin(case), case[0]*case[1]] for case in x])
+
+        surrogate = ResponseSurface()
+        surrogate.train(x[:8], y[:8])
+        self.assertTrue(surrogate.update(x[8:9], y[8:9]))
+        self.assertTrue(surrogate.update(x[9:], y[9:]))
+
+        expected = ResponseSurface()
+        expected.train(x, y)
+
+        assert_rel_error(self, surrogate.betas, expected.betas, 1e-10)
+        self.assertEqual(surrogate.m, 16)
+
+        # Too few points to start from.
+        surrogate = ResponseSurface()
+        surrogate.train(x[:3], y[:3])
+        self.assertFalse(surrogate.update(x[3:], y[3:]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -5,6 +5,8 @@ import math
 import os
 import unittest
 
+import numpy as np
+
 from openmdao.test.util import assert_rel_error
 from openmdao.units.units import PhysicalUnit, PhysicalQuantity, NumberDict
 from openmdao.api import convert_units, get_conversion_tuple
@@ -204,6 +206,40 @@ class test__PhysicalQuantity(unittest.TestCase):
 
         assert_rel_error(self, factor*(100.0 + offset), 212.0, 1e-6)
 
+    def test_conversion_cache(self):
+        from openmdao.units import units
+
+        conv = get_conversion_tuple('ft/s', 'km/h')
+        self.assertTrue(units._CONVERSION_CACHE[('ft/s', 'km/h')] is conv)
+        self.assertTrue(get_conversion_tuple('ft/s', 'km/h') is conv)
+        assert_rel_error(self, conv[0], 0.3048*3.6, 1e-12)
+
+        # errors aren't cached
+        for i in range(2):
+            try:
+                get_conversion_tuple('ft', 'kg')
+            except TypeError as err:
+                self.assertEqual(str(err), 'Incompatible units')
+            else:
+                self.fail("Expecting TypeError")
+        self.assertTrue(('ft', 'kg') not in units._CONVERSION_CACHE)
+
+    def test_convert_units_array(self):
+        vals = np.array([[0.0, 100.0], [-40.0, 37.0]])
+        converted = convert_units(vals, 'degC', 'degF')
+
+        self.assertEqual(converted.shape, (2, 2))
+        for val, conv in zip(vals.flat, converted.flat):
+            assert_rel_error(self, conv, convert_units(val, 'degC', 'degF'),
+                             1e-12)
+        assert_rel_error(self, converted[1, 0], -40.0, 1e-12)
+
+        # the input is left alone
+        self.assertEqual(vals[0, 1], 100.0)
+
+        np.testing.assert_allclose(convert_units([1.0, 2.0], 'm', 'cm'),
+                                   [100.0, 200.0])
+
     def test_add_known_Values(self):
         #addition should give known result with known input.
         #he resulting unit should be the same as the unit of the calling instance
@@ -25,6 +25,8 @@ from six.moves.configparser import RawConfigParser as ConfigParser
 # pylint: disable=E0611, F0401
 from math import sin, cos, tan, floor, pi
 
+import numpy
+
 #public symbols
 __all__ = ['get_conversion_tuple', 'convert_units']
 
@@ -417,6 +419,9 @@ class PhysicalUnit(object):
         self.offset = float(offset)
         self.powers = powers
 
+        # fixed length bytes of the powers, for fast compatibility checks
+        self._dims = numpy.array(powers, dtype=numpy.int8).tobytes()
+
     def __repr__(self):
         return 'PhysicalUnit(%s,%s,%s,%s)'% (self.names, self.factor,
                                              self.powers, self.offset)
@@ -425,14 +430,14 @@ class PhysicalUnit(object):
         return '<PhysicalUnit ' + self.name() + '>'
 
     def __cmp__(self, other):
-        if self.powers != other.powers:
+        if self._dims != other._dims:
             raise TypeError('Incompatible units')
         return cmp(self.factor, other.factor)
 
     def __eq__(self, other):
         return self.factor == other.factor and \
                self.offset == other.offset and \
-               self.powers == other.powers
+               self._dims == other._dims
 
     def __mul__(self, other):
         if self.offset != 0 or (isinstance(other, PhysicalUnit) and \
@@ -516,7 +521,7 @@ class PhysicalUnit(object):
             If the units are not compatible.
         """
 
-        if self.powers != other.powers:
+        if self._dims != other._dims:
             raise TypeError('Incompatible units')
 
         if self.offset != other.offset and self.factor != other.factor:
@@ -545,7 +550,7 @@ class PhysicalUnit(object):
             If the units are not compatible.
         """
 
-        if self.powers != other.powers:
+        if self._dims != other._dims:
             raise TypeError('Incompatible units')
 
         # let (s1,d1) be the conversion tuple from 'self' to base units
@@ -576,7 +581,7 @@ class PhysicalUnit(object):
         @returns: C{True} If the units are compatible, i.e., if the powers of the base units are the same.
         @rtype: C{bool}.
         """
-        return self.powers == other.powers
+        return self._dims == other._dims
 
     def is_dimensionless(self):
         """Dimensionless PQ."""
@@ -616,6 +621,9 @@ class PhysicalUnit(object):
 
 _UNIT_CACHE = {}
 
+# conversion tuples keyed on (src_units, target_units) strings
+_CONVERSION_CACHE = {}
+
 def _find_unit(unit):
     """Find unit helper function."""
     if isinstance(unit, str):
@@ -723,7 +731,9 @@ def import_library(libfilepointer):
     """Imports a units library, replacing any existing definitions."""
     global _UNIT_LIB
     global _UNIT_CACHE
+    global _CONVERSION_CACHE
     _UNIT_CACHE = {}
+    _CONVERSION_CACHE = {}
     _UNIT_LIB = ConfigParser()
     _UNIT_LIB.optionxform = _do_nothing
     _UNIT_LIB.readfp(libfilepointer)
@@ -839,8 +849,9 @@ def convert_units(value, units, convunits):
 
     Args
     ----
-    value : float
-        Quantity you would like to convert.
+    value : float or ndarray
+        Quantity you would like to convert. Arrays are converted all at
+        once.
 
     units : string
         Valid unit string that declares the source units.
@@ -850,20 +861,20 @@ def convert_units(value, units, convunits):
 
     Returns
     -------
-    float : Converted quantity.
+    float or ndarray : Converted quantity.
     """
-    pq = PhysicalQuantity(value, units)
-    pq.convert_to_unit(convunits)
-    return pq.value
+    factor, offset = get_conversion_tuple(units, convunits)
+    if isinstance(value, (list, tuple)):
+        value = numpy.asarray(value, dtype=float)
+    return (value + offset) * factor
 
 def get_conversion_tuple(src_units, target_units):
     """Return the factor and offset between the 2 compatible units.
+    Conversion tuples are cached, so each pair of unit strings is only
+    parsed once.
 
     Args
     ----
-    value : float
-        Quantity you would like to convert.
-
     src_units : string
         Valid unit string that declares the source units.
 
@@ -874,9 +885,18 @@ def get_conversion_tuple(src_units, target_units):
     -------
     tuple(float, float) : Tuple containing the conversion factor and offset.
     """
-    pq = PhysicalQuantity(1.0, src_units)
-    target = _find_unit(target_units)
-    return pq.unit.conversion_tuple_to(target)
+    key = (src_units, target_units)
+    try:
+        return _CONVERSION_CACHE[key]
+    except (KeyError, TypeError):
+        pass
+
+    conv = _find_unit(src_units).conversion_tuple_to(_find_unit(target_units))
+
+    if isinstance(src_units, str) and isinstance(target_units, str):
+        _CONVERSION_CACHE[key] = conv
+
+    return conv
 
 
 # Load in the default unit library
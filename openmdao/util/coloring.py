@@ -0,0 +1,57 @@
+""" Column coloring of sparse Jacobians, so that groups of structurally
+orthogonal columns can be computed with a single perturbation or linear
+solve. """
+
+import numpy as np
+from scipy.sparse import csc_matrix
+
+
+def color_columns(rows, cols, shape):
+    """
+    Greedily colors the columns of a sparse matrix so that no two columns of
+    the same color have a nonzero in the same row. Columns are colored in
+    order of decreasing number of nonzeros.
+
+    Args
+    ----
+    rows : ndarray of int
+        Row indices of the nonzero entries.
+
+    cols : ndarray of int
+        Column indices of the nonzero entries.
+
+    shape : tuple
+        Shape of the matrix.
+
+    Returns
+    -------
+    list of ndarray
+        One sorted array of column indices per color. Columns that have no
+        nonzero entries are left out.
+    """
+    ncols = shape[1]
+    A = csc_matrix((np.ones(len(rows)), (rows, cols)), shape=shape)
+
+    # Columns are adjacent when they share a row.
+    adj = (A.T * A).tocsr()
+
+    nnz = np.diff(A.indptr)
+    colors = -np.ones(ncols, dtype=int)
+    ncolors = 0
+
+    for col in np.argsort(-nnz, kind='mergesort'):
+        if nnz[col] == 0:
+            break
+
+        used = colors[adj.indices[adj.indptr[col]:adj.indptr[col+1]]]
+        used = used[used >= 0]
+
+        # Smallest color not used by any neighbor.
+        taken = np.zeros(ncolors + 1, dtype=bool)
+        taken[used] = True
+        color = np.argmin(taken)
+
+        colors[col] = color
+        ncolors = max(ncolors, color + 1)
+
+    return [np.flatnonzero(colors == c) for c in range(ncolors)]
@@ -1,11 +1,13 @@
 
+import time
 import traceback
 
-def concurrent_eval_lb(func, cases, comm, broadcast=False):
+def concurrent_eval_lb(func, cases, comm, broadcast=False, chunk_size=1,
+                       chunk_time=None, max_chunk_size=100, stats=None):
     """
     Runs a load balanced version of the given function, with the master
-    rank (0) sending a new case to each worker rank as soon as it
-    has finished its last case.
+    rank (0) sending a new chunk of cases to each worker rank as soon as it
+    has finished its last chunk.
 
     Args
     ----
@@ -25,10 +27,28 @@ def concurrent_eval_lb(func, cases, comm, broadcast=False):
         If True, the results will be broadcast out to the worker procs so
         that the return value of concurrent_eval_lb will be the full result
         list in every process.
+
+    chunk_size : int, optional
+        The number of cases sent to a worker at a time. Defaults to 1.
+
+    chunk_time : float, optional
+        If given, the size of each chunk is chosen so that it takes about
+        this many seconds to run, based on the time per case measured by the
+        worker on its last chunk. chunk_size is then only the size of the
+        first chunks.
+
+    max_chunk_size : int, optional
+        The largest chunk that is sent when chunk_time is given.
+
+    stats : dict, optional
+        If given, the master fills it with the throughput of each worker,
+        keyed by rank.
     """
     if comm is not None:
         if comm.rank == 0:  # master rank
-            results = _concurrent_eval_lb_master(cases, comm)
+            results = _concurrent_eval_lb_master(cases, comm, chunk_size,
+                                                 chunk_time, max_chunk_size,
+                                                 stats)
         else:
             results = _concurrent_eval_lb_worker(func, comm)
 
@@ -36,26 +56,72 @@ def concurrent_eval_lb(func, cases, comm, broadcast=False):
             results = comm.bcast(results, root=0)
 
     else: # serial execution
-        results = []
-        for args, kwargs in cases:
-            try:
-                if kwargs:
-                    retval = func(*args, **kwargs)
-                else:
-                    retval = func(*args)
-            except:
-                err = traceback.format_exc()
-                retval = None
+        start = time.time()
+        results = _eval_chunk(func, cases)
+        if stats is not None:
+            update_throughput(stats, 0, len(results), time.time() - start)
+
+    return results
+
+def update_throughput(stats, worker, ncases, elapsed):
+    """
+    Adds a chunk of ncases that took elapsed seconds to the throughput
+    statistics of the given worker.
+    """
+    wstats = stats.setdefault(worker, {'cases': 0, 'chunks': 0, 'time': 0.0,
+                                       'cases_per_sec': 0.0})
+    wstats['cases'] += ncases
+    wstats['chunks'] += 1
+    wstats['time'] += elapsed
+    if wstats['time'] > 0.0:
+        wstats['cases_per_sec'] = wstats['cases'] / wstats['time']
+
+def next_chunk_size(chunk_size, ncases, elapsed, chunk_time, max_chunk_size):
+    """
+    Returns the size of the next chunk, so that it takes about chunk_time
+    seconds given that the last ncases took elapsed seconds. If chunk_time
+    is None, chunk_size is returned.
+    """
+    if chunk_time is None or ncases == 0:
+        return chunk_size
+    if elapsed <= 0.0:
+        return max_chunk_size
+    return max(1, min(max_chunk_size, int(chunk_time * ncases / elapsed)))
+
+def _eval_chunk(func, chunk):
+    """
+    Runs func for each (args, kwargs) in chunk and returns a list of
+    (retval, err) tuples.
+    """
+    results = []
+    for args, kwargs in chunk:
+        try:
+            if kwargs:
+                retval = func(*args, **kwargs)
             else:
-                err = None
-            results.append((retval, err))
+                retval = func(*args)
+        except:
+            err = traceback.format_exc()
+            retval = None
+        else:
+            err = None
+        results.append((retval, err))
 
     return results
 
-def _concurrent_eval_lb_master(cases, comm):
+def _next_chunk(case_iter, size):
+    chunk = []
+    for case in case_iter:
+        chunk.append(case)
+        if len(chunk) == size:
+            break
+    return chunk
+
+def _concurrent_eval_lb_master(cases, comm, chunk_size=1, chunk_time=None,
+                               max_chunk_size=100, stats=None):
     """
-    This runs only on rank 0.  It sends cases to all of the workers and
-    collects their results.
+    This runs only on rank 0.  It sends chunks of cases to all of the
+    workers and collects their results.
     """
     received = 0
     sent = 0
@@ -66,63 +132,56 @@ def _concurrent_eval_lb_master(cases, comm):
 
     # seed the workers
     for i in range(1, comm.size):
-        try:
-            case = next(case_iter)
-        except StopIteration:
+        chunk = _next_chunk(case_iter, chunk_size)
+        if not chunk:
             break
 
-        comm.send(case, i, tag=1)
+        comm.send(chunk, i, tag=1)
         sent += 1
 
     # send the rest of the cases
     if sent > 0:
         while True:
             # wait for any worker to finish
-            worker, retval, err = comm.recv(tag=2)
+            worker, chunk_results, elapsed = comm.recv(tag=2)
 
             received += 1
 
             # store results
-            results.append((retval, err))
+            results.extend(chunk_results)
 
-            # don't stop until we hear back from every worker process
-            # we sent a case to
-            if received == sent:
-                break
+            if stats is not None:
+                update_throughput(stats, worker, len(chunk_results), elapsed)
 
-            try:
-                case = next(case_iter)
-            except StopIteration:
-                pass
-            else:
-                # send new case to the last worker that finished
-                comm.send(case, worker, tag=1)
+            chunk_size = next_chunk_size(chunk_size, len(chunk_results),
+                                         elapsed, chunk_time, max_chunk_size)
+
+            chunk = _next_chunk(case_iter, chunk_size)
+            if chunk:
+                # send new chunk to the last worker that finished
+                comm.send(chunk, worker, tag=1)
                 sent += 1
+            elif received == sent:
+                # don't stop until we hear back from every worker process
+                # we sent a chunk to
+                break
 
     # tell all workers to stop
     for rank in range(1, comm.size):
-        comm.send((None, None), rank, tag=1)
+        comm.send(None, rank, tag=1)
 
     return results
 
 def _concurrent_eval_lb_worker(func, comm):
     while True:
-        # wait on a case from the master
-        args, kwargs = comm.recv(source=0, tag=1)
+        # wait on a chunk of cases from the master
+        chunk = comm.recv(source=0, tag=1)
 
-        if args is None: # we're done
+        if chunk is None: # we're done
             break
 
-        try:
-            if kwargs:
-                retval = func(*args, **kwargs)
-            else:
-                retval = func(*args)
-        except:
-            err = traceback.format_exc()
-            retval = None
-        else:
-            err = None
+        start = time.time()
+        chunk_results = _eval_chunk(func, chunk)
 
-        # tell the master we're done with that case
-        comm.send((comm.rank, retval, err), 0, tag=2)
+        # tell the master we're done with that chunk
+        comm.send((comm.rank, chunk_results, time.time() - start), 0, tag=2)
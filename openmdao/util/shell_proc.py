@@ -8,6 +8,9 @@ PIPE = subprocess.PIPE
 STDOUT = subprocess.STDOUT
 DEV_NULL = 'nul:' if sys.platform == 'win32' else '/dev/null'
 
+# Python 3.3+ can wait on a child with a timeout.
+_WAIT_HAS_TIMEOUT = hasattr(subprocess, 'TimeoutExpired')
+
 
 class CalledProcessError(subprocess.CalledProcessError):
     """ :class:`subprocess.CalledProcessError` plus `errormsg` attribute. """
@@ -118,13 +121,17 @@ class ShellProc(subprocess.Popen):
 
     def wait(self, poll_delay=0., timeout=0.):
         """
-        Polls for command completion or timeout.
+        Waits for command completion or timeout.
         Closes any files implicitly opened.
         Returns ``(return_code, error_msg)``.
 
+        The wait blocks on the child process rather than sleeping a fixed
+        interval, so short running commands return as soon as they exit.
+
         poll_delay: float (seconds)
-            Time to delay between polling for command completion.
-            A value of zero uses an internal default.
+            Maximum time to delay between polls for command completion
+            when a timeout must be enforced and the interpreter can't wait
+            with a timeout. A value of zero uses an internal default.
 
         timeout: float (seconds)
             Maximum time to wait for command completion.
@@ -132,30 +139,48 @@ class ShellProc(subprocess.Popen):
         """
         return_code = None
         try:
-            if poll_delay <= 0:
-                poll_delay = max(0.1, timeout/100.)
-                poll_delay = min(10., poll_delay)
-            npolls = int(timeout / poll_delay) + 1
-
-            time.sleep(poll_delay)
-            return_code = self.poll()
-            while return_code is None:
-                npolls -= 1
-                if (timeout > 0) and (npolls < 0):
+            if timeout <= 0:
+                return_code = subprocess.Popen.wait(self)
+            elif _WAIT_HAS_TIMEOUT:
+                try:
+                    return_code = subprocess.Popen.wait(self, timeout=timeout)
+                except subprocess.TimeoutExpired:
                     self.terminate()
-                    break
-                time.sleep(poll_delay)
-                return_code = self.poll()
+            else:
+                return_code = self._poll_wait(poll_delay, timeout)
         finally:
             self.close_files()
 
-        # self.returncode set by self.poll().
+        # self.returncode set by Popen.wait() or self.poll().
         if return_code is not None:
             self.errormsg = self.error_message(return_code)
         else:
             self.errormsg = 'Timed out'
         return (return_code, self.errormsg)
 
+    def _poll_wait(self, poll_delay, timeout):
+        """
+        Polls for completion with an increasing delay, starting small so
+        that quick commands aren't penalized. Terminates the process and
+        returns None if `timeout` is exceeded.
+        """
+        if poll_delay <= 0:
+            poll_delay = max(0.1, timeout/100.)
+            poll_delay = min(10., poll_delay)
+
+        deadline = time.time() + timeout
+        delay = 0.0005
+        return_code = self.poll()
+        while return_code is None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self.terminate()
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, poll_delay)
+            return_code = self.poll()
+        return return_code
+
     def error_message(self, return_code):
         """
         Return error message for `return_code`.
@@ -0,0 +1,54 @@
+""" Tests for the Jacobian column coloring utility."""
+
+import unittest
+
+import numpy as np
+from scipy.sparse import diags, random
+
+from openmdao.util.coloring import color_columns
+
+
+class TestColorColumns(unittest.TestCase):
+
+    def _check_orthogonal(self, A, groups):
+        A = A.tocsc()
+        for group in groups:
+            counts = np.asarray((A[:, group] != 0).sum(axis=1)).ravel()
+            self.assertTrue(np.all(counts <= 1))
+
+    def test_diagonal(self):
+        n = 10
+        idx = np.arange(n)
+        groups = color_columns(idx, idx, (n, n))
+        self.assertEqual(len(groups), 1)
+        np.testing.assert_array_equal(groups[0], idx)
+
+    def test_tridiagonal(self):
+        A = diags([1., 1., 1.], [-1, 0, 1], shape=(12, 12)).tocoo()
+        groups = color_columns(A.row, A.col, A.shape)
+        self.assertEqual(len(groups), 3)
+        self._check_orthogonal(A, groups)
+
+    def test_dense_row(self):
+        n = 5
+        rows = np.zeros(n, dtype=int)
+        cols = np.arange(n)
+        groups = color_columns(rows, cols, (1, n))
+        self.assertEqual(len(groups), n)
+
+    def test_empty_columns(self):
+        groups = color_columns(np.array([0, 2]), np.array([1, 3]), (3, 5))
+        self.assertEqual(len(groups), 1)
+        np.testing.assert_array_equal(groups[0], [1, 3])
+
+    def test_random(self):
+        A = random(40, 30, density=0.05, random_state=11).tocoo()
+        groups = color_columns(A.row, A.col, A.shape)
+        self._check_orthogonal(A, groups)
+
+        colored = np.sort(np.concatenate(groups))
+        np.testing.assert_array_equal(colored, np.unique(A.col))
+
+
+if __name__ == "__main__":
+    unittest.main()